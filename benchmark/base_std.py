@@ -0,0 +1,49 @@
+"""base.std / base.mean 在大列表和生成器上的耗时
+
+旧的实现逐个元素计算 :math:`E[x^2] - E[x]^2`，作为对照
+
+用法::
+
+    python benchmark/base_std.py --size 10000000
+"""
+import argparse
+
+import numpy as np
+
+from pythontools.modeling.base import mean, std
+from pythontools.utils.contextmanager import Timer
+
+
+def naive_std(data: list, ddof: int = 0) -> float:
+    """旧的实现：逐元素的生成器和相消的公式"""
+    n = len(data)
+    return np.sqrt(sum(x ** 2 for x in data) / (n - ddof) - (sum(data) / n) ** 2)
+
+
+def measure(name: str, function, repeat: int):
+    times = []
+    for _ in range(repeat):
+        with Timer(printer=lambda *_: None) as timer:
+            result = function()
+        times.append(timer.end - timer.start)
+    print(f"{name:<24} {min(times):8.3f}s  {result!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # 均值远大于标准差 (1)，旧的公式在这里失去精度
+    data = (1e6 + np.random.default_rng(0).normal(size=args.size)).tolist()
+
+    measure("naive std(list)", lambda: naive_std(data), args.repeat)
+    measure("std(list)", lambda: std(data), args.repeat)
+    measure("std(generator)", lambda: std(x for x in data), args.repeat)
+    measure("mean(list)", lambda: mean(data), args.repeat)
+    measure("mean(generator)", lambda: mean(x for x in data), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""按列并行标准化的扩展性测试
+
+用法::
+
+    python benchmark/normalization_scaling.py --rows 20000 --columns 20000 --backend thread
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from pythontools.modeling import ZScoreNormalizer
+from pythontools.utils.contextmanager import Timer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--columns", type=int, default=10_000)
+    parser.add_argument("--backend", choices=["thread", "process"], default="thread")
+    parser.add_argument("--max-jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(rng.normal(size=(args.rows, args.columns)))
+    normalizer = ZScoreNormalizer(data)
+    normalizer.statistics  # 训练不计入时间
+    expected = normalizer.normalize()
+
+    jobs = 1
+    while jobs <= args.max_jobs:
+        normalizer.set_parallel(jobs, args.backend)
+        times = []
+        for _ in range(args.repeat):
+            with Timer(printer=lambda *_: None) as timer:
+                result = normalizer.normalize()
+            times.append(timer.end - timer.start)
+        assert result.equals(expected), "并行结果与串行不同"
+        print(f"n_jobs={jobs:<3} {min(times):.3f}s")
+        jobs *= 2
+
+
+if __name__ == "__main__":
+    main()
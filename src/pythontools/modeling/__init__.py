@@ -1,11 +1,21 @@
+from __future__ import annotations
+
 from numbers import Real
 
+import numpy as np
 from pandas import DataFrame, Series
-from scipy.stats import t
 
 from pythontools.modeling import base
 from pythontools.modeling.base import *
 from pythontools.modeling.normalization import *
+from pythontools.modeling.statistics import *
+from pythontools.modeling.sketch import *
+from pythontools.modeling.correlation import *
+from pythontools.modeling.linear import *
+from pythontools.modeling.linear import _r2, _as_matrix, _coef_statistics
+from pythontools.modeling.bootstrap import *
+from pythontools.modeling.chunked import *
+from pythontools.modeling.grouped import *
 
 from pythontools.types.modeling import Model, LinearModel
 from pythontools.modeling.normalization import *
@@ -40,47 +50,69 @@ def remove_na(data: DataFrame) -> None:
     data.dropna(inplace=True)
 
 
-def r_squared(model: Model, X, y) -> Real:
-    """决定系数 R 方"""
-    return model.score(X, y)
+def r_squared(model: Model, X, y) -> Real | np.ndarray:
+    """决定系数 R 方
+
+    y 是二维时（多个因变量）只预测一次，返回每个因变量的 R 方
+    """
+    if np.ndim(y) != 2:
+        return model.score(X, y)
+    y = np.asarray(y, dtype=np.float64)
+    return _r2(y, np.asarray(model.predict(X), dtype=np.float64).reshape(y.shape))
 
 
-def adjusted_r_squared(r2: Real, X: DataFrame) -> Real:
+def adjusted_r_squared(r2: Real, X: DataFrame | tuple[int, int]) -> Real:
     """
     调整 R 方
 
     Args:
-        r2 (Real): 决定系数 R 方
-        X (DataFrame): 模型拟合时用的数据
+        r2 (Real): 决定系数 R 方，多个因变量时可以是数组
+        X (DataFrame | tuple[int, int]): 模型拟合时用的数据，或它的形状 (样本数, 特征数)，
+            数据放不进内存时可以只传形状
     """
     # 计算调整R²
-    n, p = X.shape  # 样本数和特征数
+    n, p = X if isinstance(X, tuple) else X.shape  # 样本数和特征数
     adjusted_r2 = 1 - (1 - r2) * (n - 1) / (n - p - 1)
 
     return adjusted_r2
 
 
-def p_values(model: LinearModel, X, y):
-    """p值"""
-    coefficients = model.coef_
-    y_pred = model.predict(X)
+def p_values(model: LinearModel, X=None, y=None):
+    """回归系数（不包括截距）的双侧 p 值
 
-    residuals = y - y_pred
-    dof = len(X) - len(coefficients) - 1  # 自由度
-    mse = np.sum(residuals ** 2) / dof
+    t 统计量用 ``model.coef_``，残差方差由 ``model.predict`` 的残差得到（只预测一次），
+    :math:`(X^T X)^{-1}` 的对角线来自 X 的一次 QR 分解，不构造加一列常数的矩阵或求 :math:`X^T X` 的逆。
+    有截距时（``model.fit_intercept``，默认为有）先中心化 X，结果与加一列常数后的回归相同。
+    p 值总是对应模型自己的系数，模型不是普通最小二乘（如岭回归）时也是如此。
+    y 是二维时所有因变量共用这一个分解，需要系数、R 方等其他结果时用 ``regression_statistics``
 
-    X_with_const = np.column_stack([np.ones(len(X)), X])  # 添加截距项
-    cov_matrix = np.linalg.pinv(X_with_const.T @ X_with_const) * mse
-    std_errors = np.sqrt(np.diag(cov_matrix))[1:]  # 忽略截距的标准误差
+    X 和 y 为 None 时使用模型训练时累积的统计量（如 ``OLS.p_values_``），不需要再读数据
 
-    # 计算t统计量和P值
-    t_stats = coefficients / std_errors
-    p_value = 2 * (1 - t.cdf(np.abs(t_stats), df=dof))
-
-    return p_value
+    Args:
+        model (LinearModel): 训练好的线性回归模型
+        X: 自变量数据
+        y: 因变量数据，(样本数,) 或 (样本数, 因变量数)
 
+    Returns:
+        每个自变量的 p 值，y 是二维时形状为 (因变量数, 自变量数)；
+        自变量线性相关时去掉的列为 NaN
 
-def corr(x: Series, y: Series) -> Real:
+    Raises:
+        ValueError: X 和 y 的行数不同
+    """
+    if X is None and y is None:
+        return model.p_values_
+    y = np.asarray(y, dtype=np.float64)
+    if len(X) != len(y):
+        raise ValueError(f"X 和 y 的行数不同: {len(X)} 和 {len(y)}")
+    target = _as_matrix(y)
+    residuals = target - np.asarray(model.predict(X), dtype=np.float64).reshape(target.shape)
+    coef = np.asarray(model.coef_, dtype=np.float64).reshape(target.shape[1], -1)
+    result = _coef_statistics(coef, residuals, _as_matrix(X), getattr(model, "fit_intercept", True))["p_values"]
+    return result if y.ndim == 2 else result[0]
+
+
+def corr(x: Series, y: Series, weights=None) -> Real:
     r"""
     样本相关系数
 
@@ -89,9 +121,13 @@ def corr(x: Series, y: Series) -> Real:
     .. math::
         corr = \frac{ \sum_{i=1}^{n} (x_i - \bar{x})(y_i - \bar{y}) }{ \sqrt{ \frac{1}{n}\sum_{i=1}^{n} (x_i - \bar{x})^2 } \sqrt{ \frac{1}{n}\sum_{i=1}^{n} (y_i - \bar{y})^2}}
 
+    有权重时均值、方差和协方差都按权重计算，与把每行重复 w 次后的结果相同；
+    相关系数与权重的缩放无关，频数权重和可靠性权重的结果相同
+
     Args:
         x (Series): 变量 1
         y (Series): 变量 2
+        weights: 每行的权重，非负，长度与 x 相同
 
     Returns:
         Real: 一个 [0, 1] 之间的数
@@ -101,6 +137,8 @@ def corr(x: Series, y: Series) -> Real:
         ValueError: 数据长度必须相同
         ValueError: 数据有空
     """
+    if weights is not None:
+        return _weighted_corr(x, y, weights)
     length = len(x)
 
     if length <= 1:
@@ -115,30 +153,64 @@ def corr(x: Series, y: Series) -> Real:
     return np.sum((x - base.mean(x)) * (y - base.mean(y))) / (length * base.std(x) * base.std(y))
 
 
-def related_r(x: Series, y: Series) -> Real:
+def _weighted_corr(x, y, weights) -> Real:
+    """加权的 ``corr``，一次计算所有加权的离差"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    w = np.asarray(weights, dtype=np.float64)
+    if len(x) <= 1:
+        raise ValueError("数据长度必须大于1")
+    if len(x) != len(y) or len(x) != len(w):
+        raise ValueError("数据长度必须相同")
+    if np.isnan(x).any() or np.isnan(y).any():
+        raise ValueError("数据有空")
+    if np.any(w < 0) or w.sum() == 0:
+        raise ValueError("权重必须非负且不全为 0")
+
+    total = w.sum()
+    dx = x - (w @ x) / total
+    dy = y - (w @ y) / total
+    wx = w * dx
+    sxx, syy, sxy = wx @ dx, (w * dy) @ dy, wx @ dy
+    if np.isclose(np.sqrt(sxx / total), 0) or np.isclose(np.sqrt(syy / total), 0):
+        return 0  # 常数据不存在相关性
+    return sxy / np.sqrt(sxx * syy)
+
+
+def related_r(x: Series, y: Series, weights=None) -> Real:
     """``corr`` 的别名"""
-    return corr(x, y)
+    return corr(x, y, weights)
 
 
-def print_result_for_lm(model: LinearModel, x, y) -> None:
-    print("变量:", *x.columns.values)
-    print("回归系数:", *model.coef_)
-    print(f"截距: {model.intercept_}")
-    print(f"决定R方: {model.score(x, y)}")
-    print(f"调整R方: {adjusted_r_squared(model.score(x, y), x)}")
-    print("P值:", *p_values(model, x, y))
+def print_result_for_lm(model: LinearModel, x=None, y=None) -> None:
+    """打印线性回归的结果
+
+    结果由 ``RegressionReport`` 计算，只预测一次；需要再使用这些结果时直接用 ``RegressionReport``。
+    x 和 y 为 None 时使用 ``OLS`` 训练时累积的统计量，不需要再读数据
+    """
+    print(RegressionReport(model, x, y))
 
 
 __all__: list[str] = [
     # data handle
     "remove", "remove_na",
+    "read_chunks", "write_chunks",
     # calc
     "mean", "std",
     "related_r", "corr", "r_squared", "adjusted_r_squared", "p_values",
+    "corr_matrix", "spearman", "spearman_matrix", "kendall_tau", "kendall_matrix",
+    "RollingCorrelation",
+    # regression
+    "OLS", "regression_statistics", "RegressionReport",
+    "bootstrap_coef", "BootstrapResult",
     # Normalizer
     "Normalizer",
     "ZScoreNormalizer", "ZScoreScaler", "StandardScaler",
     "MinMaxNormalizer", "MinMaxScaler",
+    "QuantileNormalizer", "QuantileScaler",
+    "RobustNormalizer", "RobustScaler",
+    "GroupedNormalizer",
+    "ColumnStatistics", "KLLSketch",
     # other
     "print_result_for_lm",
     # types
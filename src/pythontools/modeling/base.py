@@ -1,21 +1,163 @@
-from typing import Literal
+from itertools import islice
+from typing import Iterable, Literal
 
 import numpy as np
 
+CHUNK_SIZE: int = 65_536
+"""生成器按块读取时每块的元素个数"""
 
-def std(data, ddof: Literal[0, 1] = 0):
-    if hasattr(data, "std"):
+WeightType = Literal["frequency", "reliability"]
+"""权重的含义：频数权重（一行代表 w 个相同的样本）或可靠性权重（表示样本的相对重要程度）"""
+
+
+def _as_array(data) -> np.ndarray | None:
+    """有长度的数据一次转换为 float64 数组，生成器等没有长度的返回 None"""
+    if hasattr(data, "__len__"):
+        return np.asarray(data, dtype=np.float64).ravel()
+    return None
+
+
+def _chunks(data: Iterable) -> Iterable[np.ndarray]:
+    """把迭代器按 ``CHUNK_SIZE`` 切成 float64 数组，只遍历一次"""
+    iterator = iter(data)
+    while True:
+        chunk = np.fromiter(islice(iterator, CHUNK_SIZE), dtype=np.float64)
+        if chunk.size == 0:
+            return
+        yield chunk
+
+
+def _weighted_chunks(data, weights) -> Iterable[tuple[np.ndarray, np.ndarray]]:
+    """按块成对取出数据和权重，有长度的数据只有一块
+
+    Raises:
+        ValueError: 长度不同，或权重为负数
+    """
+    array = _as_array(data)
+    if array is not None:
+        w = None if weights is None else _as_array(weights)
+        if w is None and weights is not None:
+            w = np.fromiter(weights, dtype=np.float64)
+        pairs = [(array, w)]
+    elif weights is None:
+        pairs = ((chunk, None) for chunk in _chunks(data))
+    else:
+        pairs = zip(_chunks(data), _chunks(weights))
+    for values, w in pairs:
+        if w is not None:
+            if w.shape != values.shape:
+                raise ValueError("数据和权重的长度必须相同")
+            if np.any(w < 0):
+                raise ValueError("权重不能为负数")
+        yield values, w
+
+
+def _moments(data, weights=None) -> tuple[int, float, float, float, float]:
+    """样本数、权重和、权重平方和、均值和离差平方和 ``(n, W, V2, mean, m2)``
+
+    没有权重时 W 和 V2 都等于 n。每块先求均值再求离差平方和（两遍），
+    避免 :math:`E[x^2] - E[x]^2` 的相消误差；块之间按 Welford/Chan 的方法合并，
+    生成器只遍历一次
+
+    Raises:
+        ValueError: 数据为空，长度不同，或权重为负数
+    """
+    n, total, total2, mean, m2 = 0, 0.0, 0.0, 0.0, 0.0
+    for values, w in _weighted_chunks(data, weights):
+        if values.size == 0:
+            continue
+        if w is None:
+            size = size2 = float(values.size)
+            chunk_mean = values.mean()
+            deviation = values - chunk_mean
+            chunk_m2 = deviation @ deviation
+        else:
+            size, size2 = w.sum(), w @ w
+            if size == 0:
+                n += values.size
+                continue
+            chunk_mean = (w @ values) / size
+            deviation = values - chunk_mean
+            chunk_m2 = w @ (deviation * deviation)
+        weight = total + size
+        delta = chunk_mean - mean
+        mean += delta * size / weight
+        m2 += chunk_m2 + delta ** 2 * total * size / weight
+        n, total, total2 = n + values.size, weight, total2 + size2
+    if n == 0:
+        raise ValueError("数据不能为空")
+    if total == 0:
+        raise ValueError("权重之和不能为 0")
+    return n, float(total), float(total2), float(mean), float(m2)
+
+
+def std(data, ddof: Literal[0, 1] = 0, weights=None, weight_type: WeightType = "frequency"):
+    """标准差
+
+    有 ``std`` 方法的数据（如 Series、ndarray）直接调用它；列表、元组一次转换为数组计算；
+    生成器等没有长度的可迭代对象只遍历一次，按块合并，不需要先转换为列表
+
+    有权重时方差为 :math:`\\sum w_i (x_i - \\bar{x}_w)^2 / d`，W 为权重之和：
+
+    - 频数权重 (frequency)：:math:`d = W - ddof`，与把每行重复 w 次后计算的结果相同
+    - 可靠性权重 (reliability)：:math:`d = W - ddof \\cdot \\sum w_i^2 / W`，
+      ddof=1 时是方差的无偏估计，结果与权重的缩放无关
+
+    Args:
+        data: 数据
+        ddof (Literal[0, 1]): 自由度增量
+        weights: 每个数据的权重，非负，长度与 data 相同，也可以是生成器
+        weight_type (Literal["frequency", "reliability"]): 权重的含义
+
+    Returns:
+        标准差，只有一个数据时为 0
+
+    Raises:
+        ValueError: 数据为空，或不是数值
+    """
+    if weights is None and hasattr(data, "std"):
         return data.std(ddof=ddof)
-    n = len(data)
+    n, total, total2, _, m2 = _moments(data, weights)
     if n == 1:
         return 0
-    return np.sqrt(
-        (np.sum(x ** 2 for x in data))
-        / (n - ddof) - mean(data) ** 2
-    )
+    if weight_type == "frequency":
+        dof = total - ddof
+    elif weight_type == "reliability":
+        dof = total - ddof * total2 / total
+    else:
+        raise ValueError(f"无效的权重类型: {weight_type}")
+    return np.sqrt(m2 / dof)
+
+
+def mean(data, weights=None):
+    """算术平均数
 
+    处理方式与 ``std`` 相同
 
-def mean(data):
-    if hasattr(data, "mean"):
+    Args:
+        data: 数据
+        weights: 每个数据的权重，为 None 时不加权
+
+    Returns:
+        算术平均数，有权重时为加权平均数
+
+    Raises:
+        ValueError: 数据为空，或不是数值
+    """
+    if weights is None and hasattr(data, "mean"):
         return data.mean()
-    return np.sum(data) / len(data)
+    if weights is not None:
+        return _moments(data, weights)[3]
+    array = _as_array(data)
+    if array is not None:
+        if array.size == 0:
+            raise ValueError("数据不能为空")
+        return array.mean()
+
+    n, total = 0, 0.0
+    for chunk in _chunks(data):
+        n += chunk.size
+        total += chunk.sum()
+    if n == 0:
+        raise ValueError("数据不能为空")
+    return total / n
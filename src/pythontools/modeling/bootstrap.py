@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional, Literal, Iterable
+
+import numpy as np
+import pandas as pd
+from numpy.typing import ArrayLike
+
+from pythontools.modeling.linear import OLS
+from pythontools.modeling.statistics import block_rows
+from pythontools.types.modeling import LinearModel
+
+DEFAULT_BATCH_SIZE: int = 64
+"""每批的重抽样次数，每批有自己的随机种子，是并行的最小单位"""
+
+
+def _block_sizes(n: int, p: int) -> np.ndarray:
+    """按行分块时每块的行数，只由数据的形状决定，与 worker 数无关"""
+    # 每块要计算 p(p+1)/2 + p 个乘积列
+    rows = block_rows(p * (p + 3) // 2)
+    return np.minimum(rows, n - np.arange(0, n, rows))
+
+
+def _resample_counts(rng: np.random.Generator, sizes: np.ndarray, batch: int) -> Iterable[np.ndarray]:
+    """按块生成 batch 次重抽样中每行被抽到的次数，每块为 (batch, 块的行数)
+
+    先按多项分布把 n 次抽样分到各块，再在块内均匀抽取行号并计数，
+    与有放回地抽 n 行等价，但一次只需要一块的计数矩阵
+    """
+    n = int(sizes.sum())
+    per_block = rng.multinomial(n, sizes / n, size=batch)
+    for k, m in enumerate(sizes):
+        draws = rng.integers(0, m, size=per_block[:, k].sum())
+        owners = np.repeat(np.arange(batch), per_block[:, k])
+        yield np.bincount(owners * m + draws, minlength=batch * m).reshape(batch, m).astype(np.float64)
+
+
+def _gram_coef(data: np.ndarray, fit_intercept: bool, seed: np.random.SeedSequence, batch: int) -> np.ndarray:
+    r"""用加权的 Gram 矩阵求一批重抽样的系数
+
+    一次重抽样等价于按每行被抽到的次数 c 加权，:math:`X^T C X` 和 :math:`X^T C y`
+    等于计数矩阵乘以每行的乘积 :math:`x_i x_j`、:math:`x_i y`，一批重抽样只需要一次矩阵乘法，
+    最后对 (batch, p, p) 的方程组批量求解
+
+    Args:
+        data (np.ndarray): ``[X, y]``，有截距时已经按整体均值中心化，重抽样的均值接近 0，没有相消误差
+        fit_intercept (bool): 是否有截距
+        seed (np.random.SeedSequence): 这一批的随机种子
+        batch (int): 这一批的重抽样次数
+
+    Returns:
+        np.ndarray: (batch, 自变量数) 的系数
+    """
+    n, q = data.shape
+    p = q - 1
+    rng = np.random.default_rng(seed)
+    left, right = np.triu_indices(p, m=q)
+    sums = np.zeros((batch, q))
+    products = np.zeros((batch, len(left)))
+    sizes = _block_sizes(n, p)
+    # 按列存放，每个 x_i 与 x_i, ..., y 的乘积是连续的一段
+    buffer = np.empty((len(left), sizes[0]))
+    for start, counts in zip(np.cumsum(sizes) - sizes, _resample_counts(rng, sizes, batch)):
+        columns = data[start:start + counts.shape[1]].T.copy()
+        rows = buffer[:, :columns.shape[1]]
+        offset = 0
+        for i in range(p):
+            np.multiply(columns[i], columns[i:], out=rows[offset:offset + q - i])
+            offset += q - i
+        sums += counts @ columns.T
+        products += counts @ rows.T
+    if fit_intercept:
+        means = sums / n
+        products -= n * means[:, left] * means[:, right]
+
+    gram = np.zeros((batch, q, q))
+    gram[:, left, right] = products
+    gram[:, right, left] = products
+    xx, xy = gram[:, :p, :p], gram[:, :p, p:]
+    try:
+        return np.linalg.solve(xx, xy)[..., 0]
+    except np.linalg.LinAlgError:
+        # 某次重抽样的自变量线性相关，取最小范数解
+        return (np.linalg.pinv(xx, hermitian=True) @ xy)[..., 0]
+
+
+def _gram_shared(name: str, shape: tuple[int, int], fit_intercept: bool, seed: np.random.SeedSequence, batch: int) -> np.ndarray:
+    """在 worker 进程中对共享内存里的数据求一批重抽样的系数"""
+    memory = SharedMemory(name=name)
+    try:
+        data = np.ndarray(shape, dtype=np.float64, buffer=memory.buf)
+        result = _gram_coef(data, fit_intercept, seed, batch)
+        del data
+        return result
+    finally:
+        memory.close()
+
+
+def _refit_coef(model: LinearModel, X, y, seed: np.random.SeedSequence, batch: int) -> np.ndarray:
+    """复制模型，在一批重抽样上分别训练，重抽样与 ``_gram_coef`` 相同"""
+    rng = np.random.default_rng(seed)
+    n = len(X)
+    counts = np.hstack(list(_resample_counts(rng, _block_sizes(n, np.shape(X)[1]), batch))).astype(np.int64)
+    result = []
+    for row in counts:
+        indices = np.repeat(np.arange(n), row)
+        fitted = copy.deepcopy(model)
+        if isinstance(X, pd.DataFrame):
+            fitted.fit(X.iloc[indices], y.iloc[indices] if isinstance(y, pd.Series) else np.asarray(y)[indices])
+        else:
+            fitted.fit(np.asarray(X)[indices], np.asarray(y)[indices])
+        result.append(np.asarray(fitted.coef_, dtype=np.float64).ravel())
+    return np.array(result)
+
+
+_refit_state: Optional[tuple] = None
+"""worker 进程中的 ``(model, X, y)``，由进程池的 initializer 设置，每个进程只接收一次"""
+
+
+def _init_refit(model: LinearModel, X, y) -> None:
+    """进程池的 initializer，保存逐次训练用的模型和数据"""
+    global _refit_state
+    _refit_state = model, X, y
+
+
+def _refit_worker(seed: np.random.SeedSequence, batch: int) -> np.ndarray:
+    """在 worker 进程中用 ``_init_refit`` 保存的模型和数据求一批重抽样的系数"""
+    return _refit_coef(*_refit_state, seed, batch)
+
+
+class BootstrapResult:
+    """回归系数的 bootstrap 结果
+
+    Attributes:
+        estimate (np.ndarray): 原始数据上的回归系数
+        samples (np.ndarray): 每次重抽样的回归系数，(重抽样次数, 自变量数)
+        variables (list[str]): 自变量的名称
+    """
+
+    def __init__(self, estimate: np.ndarray, samples: np.ndarray, variables: list[str]) -> None:
+        self.estimate: np.ndarray = estimate
+        self.samples: np.ndarray = samples
+        self.variables: list[str] = variables
+
+    @property
+    def standard_errors(self) -> np.ndarray:
+        """系数的 bootstrap 标准误差"""
+        return self.samples.std(axis=0, ddof=1)
+
+    def confidence_interval(
+            self,
+            confidence_level: float = 0.95,
+            method: Literal["percentile", "basic"] = "percentile",
+    ) -> np.ndarray:
+        """系数的置信区间
+
+        Args:
+            confidence_level (float): 置信水平
+            method (Literal["percentile", "basic"]): "percentile" 直接取重抽样系数的分位数，
+                "basic" 为 :math:`2\\hat\\beta` 减去分位数
+
+        Returns:
+            np.ndarray: (自变量数, 2)，每行为下限和上限
+
+        Raises:
+            ValueError: 无效的置信水平或方法
+        """
+        if not 0 < confidence_level < 1:
+            raise ValueError(f"置信水平必须在 (0, 1) 之间: {confidence_level}")
+        alpha = (1 - confidence_level) / 2
+        low, high = np.quantile(self.samples, [alpha, 1 - alpha], axis=0)
+        if method == "percentile":
+            return np.column_stack([low, high])
+        if method == "basic":
+            return np.column_stack([2 * self.estimate - high, 2 * self.estimate - low])
+        raise ValueError(f"无效的方法: {method}")
+
+    def to_frame(self, confidence_level: float = 0.95, method: Literal["percentile", "basic"] = "percentile") -> pd.DataFrame:
+        """导出为每个自变量一行的 DataFrame，列为 ``coef``、``standard_errors``、``low`` 和 ``high``"""
+        interval = self.confidence_interval(confidence_level, method)
+        return pd.DataFrame(
+            {"coef": self.estimate, "standard_errors": self.standard_errors, "low": interval[:, 0], "high": interval[:, 1]},
+            index=pd.Index(self.variables, name="variable"),
+        )
+
+    def __repr__(self) -> str:
+        return f"BootstrapResult(n_resamples={len(self.samples)}, variables={self.variables})"
+
+
+def bootstrap_coef(
+        model: LinearModel,
+        X: pd.DataFrame | np.ndarray,
+        y: ArrayLike,
+        n_resamples: int = 1000,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        n_jobs: int = 1,
+        random_state: Optional[int | np.random.SeedSequence] = None,
+        refit: Optional[bool] = None,
+) -> BootstrapResult:
+    """线性回归系数的 bootstrap（有放回地重抽样 n 行）
+
+    普通最小二乘（``OLS``）不需要逐次训练：一次重抽样等价于按每行被抽到的次数加权，
+    一批重抽样的 :math:`X^T C X`、:math:`X^T C y` 由计数矩阵与每行乘积的一次矩阵乘法得到，
+    再批量求解。其他模型（``refit=True``）复制后在每次重抽样上调用 ``fit``。
+
+    重抽样按 ``batch_size`` 分批，第 i 批的随机种子是 ``SeedSequence(random_state)`` 派生的第 i 个，
+    各批在进程池中并行计算后按顺序拼接，结果与 ``n_jobs`` 无关；
+    ``random_state`` 和 ``batch_size`` 相同时结果相同
+
+    Args:
+        model (LinearModel): 训练好的线性回归模型，``fit_intercept`` 属性决定是否有截距（默认为有）
+        X (DataFrame | np.ndarray): 自变量
+        y (ArrayLike): 因变量，只有一个
+        n_resamples (int): 重抽样次数
+        batch_size (int): 每批的重抽样次数，加权计算时内存约为 ``batch_size`` 乘以每块的行数
+        n_jobs (int): 进程数，-1 表示使用全部核心，默认 1 不并行
+        random_state (Optional[int | SeedSequence]): 随机种子
+        refit (Optional[bool]): 是否在每次重抽样上重新训练模型，默认 ``OLS`` 以外的模型重新训练；
+            普通最小二乘的模型（如 sklearn 的 ``LinearRegression``）可以设为 False 以使用加权的矩阵乘法
+
+    Returns:
+        BootstrapResult: 每次重抽样的系数，可以计算置信区间和标准误差
+
+    Raises:
+        ValueError: 参数无效，形状不一致，或数据有空
+
+    Examples:
+        >>> model = OLS().fit(X, y)
+        >>> result = bootstrap_coef(model, X, y, n_resamples=2000, n_jobs=-1, random_state=0)
+        >>> result.confidence_interval(0.95)
+    """
+    if n_resamples < 1 or batch_size < 1:
+        raise ValueError(f"无效的重抽样次数或批大小: {n_resamples}, {batch_size}")
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs < 1:
+        raise ValueError(f"无效的 n_jobs: {n_jobs}")
+    if refit is None:
+        refit = not isinstance(model, OLS)
+    x, target = np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    if x.ndim != 2 or target.ndim != 1 or len(x) != len(target):
+        raise ValueError(f"X 必须是二维的，y 必须是一维的，且行数相同: {x.shape} 和 {target.shape}")
+    if np.isnan(x).any() or np.isnan(target).any():
+        raise ValueError("数据有空")
+
+    sizes = [min(batch_size, n_resamples - start) for start in range(0, n_resamples, batch_size)]
+    seeds = np.random.SeedSequence(random_state).spawn(len(sizes))
+    fit_intercept = getattr(model, "fit_intercept", True)
+    workers = min(n_jobs, len(sizes))
+
+    if refit:
+        if workers <= 1:
+            parts = [_refit_coef(model, X, y, seed, size) for seed, size in zip(seeds, sizes)]
+        else:
+            # 模型和数据通过 initializer 发给每个进程一次，每批只传随机种子和批大小
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_refit, initargs=(model, X, y)) as executor:
+                parts = list(executor.map(_refit_worker, seeds, sizes))
+    else:
+        shape = (len(x), x.shape[1] + 1)
+        memory = SharedMemory(create=True, size=max(shape[0] * shape[1] * 8, 1)) if workers > 1 else None
+        try:
+            data = np.ndarray(shape, dtype=np.float64, buffer=memory.buf) if memory else np.empty(shape)
+            data[:, :-1], data[:, -1] = x, target
+            if fit_intercept:
+                data -= data.mean(axis=0)
+            if memory is None:
+                parts = [_gram_coef(data, fit_intercept, seed, size) for seed, size in zip(seeds, sizes)]
+            else:
+                del data
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    parts = list(executor.map(
+                        _gram_shared, [memory.name] * len(sizes), [shape] * len(sizes),
+                        [fit_intercept] * len(sizes), seeds, sizes,
+                    ))
+        finally:
+            if memory is not None:
+                memory.close()
+                memory.unlink()
+
+    if isinstance(X, pd.DataFrame):
+        variables = list(X.columns)
+    else:
+        variables = [f"x{i}" for i in range(x.shape[1])]
+    return BootstrapResult(np.asarray(model.coef_, dtype=np.float64).ravel(), np.vstack(parts), variables)
+
+
+__all__ = [
+    "bootstrap_coef",
+    "BootstrapResult",
+]
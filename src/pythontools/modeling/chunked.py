@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, Literal
+
+import pandas as pd
+
+DEFAULT_CHUNKSIZE: int = 100_000
+"""分块读写时每块的默认行数"""
+
+FileFormat = Literal["csv", "parquet"]
+
+
+def file_format(path: str | os.PathLike) -> FileFormat:
+    """根据扩展名判断文件格式
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        "csv" 或 "parquet"
+
+    Raises:
+        ValueError: 不支持的文件格式
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix in (".csv", ".txt"):
+        return "csv"
+    if suffix in (".parquet", ".pq"):
+        return "parquet"
+    raise ValueError(f"不支持的文件格式: {suffix}")
+
+
+def _import_parquet():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("读写 Parquet 文件需要安装 pyarrow") from e
+    return pa, pq
+
+
+def read_chunks(path: str | os.PathLike, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+    """分块读取 CSV/Parquet 文件，内存中同时只有一块
+
+    Args:
+        path: 文件路径
+        chunksize (int): 每块的行数
+
+    Yields:
+        DataFrame: 数据块
+    """
+    if file_format(path) == "csv":
+        with pd.read_csv(path, chunksize=chunksize) as reader:
+            yield from reader
+        return
+
+    _, pq = _import_parquet()
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+        yield batch.to_pandas()
+
+
+def write_chunks(chunks: Iterable[pd.DataFrame], path: str | os.PathLike) -> None:
+    """把数据块依次写入 CSV/Parquet 文件，不保留索引
+
+    Args:
+        chunks (Iterable[DataFrame]): 数据块
+        path: 输出文件路径，已存在时会被覆盖
+    """
+    if file_format(path) == "csv":
+        header = True
+        with open(path, "w", newline="") as file:
+            for chunk in chunks:
+                chunk.to_csv(file, index=False, header=header)
+                header = False
+        return
+
+    pa, pq = _import_parquet()
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+__all__ = [
+    "read_chunks", "write_chunks",
+]
@@ -0,0 +1,494 @@
+from __future__ import annotations
+
+import math
+import os
+from numbers import Real
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from numpy.typing import ArrayLike
+from scipy.stats import rankdata
+
+from pythontools.modeling.statistics import ColumnStatistics, block_rows, iter_blocks
+
+
+def _standardizer(statistics: ColumnStatistics) -> tuple[np.ndarray, np.ndarray]:
+    r"""把数据块变为 :math:`(x - \bar{x}) / (\sqrt{n} \sigma)` 的 ``(center, scale)``
+
+    这样标准化后两列的内积就是相关系数。常数列(标准差接近 0)的 scale 为 0，
+    与 ``corr`` 一样相关系数为 0
+
+    Raises:
+        ValueError: 数据长度不大于 1，或数据有空
+    """
+    if np.any(statistics.missing > 0):
+        raise ValueError("数据有空")
+    n = statistics.count.max(initial=0)
+    if n <= 1:
+        raise ValueError("数据长度必须大于1")
+    std = statistics.std(ddof=0)
+    with np.errstate(divide="ignore"):
+        scale = np.where(np.isclose(std, 0), 0.0, 1 / (np.sqrt(n) * std))
+    return statistics.mean, scale
+
+
+def _check_statistics(statistics: ColumnStatistics, shape: tuple[int, int]) -> None:
+    """传入的统计量必须是 data 每一行都计入、没有权重的统计量
+
+    Raises:
+        ValueError: 列数不同、有权重，或样本数与 data 的行数不同（如只统计非零元素）
+    """
+    n, p = shape
+    if len(statistics.columns) != p:
+        raise ValueError(f"统计量有 {len(statistics.columns)} 列，数据有 {p} 列")
+    if not np.array_equal(statistics.weight2, statistics.count):
+        raise ValueError("不能使用有权重的统计量")
+    if np.any(statistics.count + statistics.missing != n):
+        raise ValueError(f"统计量的样本数与数据的行数 {n} 不同")
+
+
+def corr_matrix(
+        data: pd.DataFrame | np.ndarray | str | os.PathLike,
+        block_size: Optional[int] = None,
+        out: Optional[np.ndarray | str | os.PathLike] = None,
+        statistics: Optional[ColumnStatistics] = None,
+) -> pd.DataFrame | np.ndarray:
+    r"""所有列两两之间的样本相关系数
+
+    与逐对调用 ``corr`` 的结果相同，但每列只标准化一次，
+    所有列对通过一次矩阵乘法 :math:`Z^T Z` (BLAS) 得到。
+    数据按行分块读取，内存中只有结果和一个数据块；
+    均值和标准差来自 ``ColumnStatistics``，可以传入已有的统计量（如 ``normalizer.statistics``）
+    以省去一次扫描
+
+    特殊情况:
+    1. 常数列(标准差接近 0)：与所有列（包括自身）的相关系数为 0
+
+    Args:
+        data (DataFrame | np.ndarray | str): 二维数据，为路径时以只读内存映射打开 ``.npy`` 文件
+        block_size (Optional[int]): 分块模式，每次只计算这么多列与其余列的相关系数，
+            中间结果的大小为 ``block_size`` 乘列数，每块扫描一次数据。为 None 时一次计算全部
+        out (Optional[np.ndarray | str]): 结果写入的 (列数, 列数) 数组，
+            为路径时写入新建的 ``.npy`` 内存映射文件，适合结果本身放不进内存的情况
+        statistics (Optional[ColumnStatistics]): data 当前值的统计量，为 None 时扫描一次数据计算。
+            必须没有权重，并且计入了每一行（稀疏数据不能是 ``include_zeros=False`` 的统计量）
+
+    Returns:
+        相关系数矩阵，data 是 DataFrame 且没有 out 时返回以列名为行列索引的 DataFrame，否则返回 ndarray
+
+    Raises:
+        ValueError: 数据长度必须大于 1
+        ValueError: 数据有空
+        ValueError: out 的形状不对
+        ValueError: statistics 有权重，或与 data 的形状不符
+
+    Examples:
+        >>> corr_matrix(features)
+        >>> corr_matrix("features.npy", block_size=500, out="corr.npy")
+    """
+    if isinstance(data, (str, os.PathLike)):
+        data = np.load(data, mmap_mode="r")
+    if data.ndim != 2:
+        raise ValueError(f"数据必须是二维的，得到的是 {data.ndim} 维")
+
+    p = data.shape[1]
+    shape = (p, p)
+    if out is None:
+        result = np.empty(shape)
+    elif isinstance(out, (str, os.PathLike)):
+        result = np.lib.format.open_memmap(out, mode="w+", dtype=np.float64, shape=shape)
+    elif out.shape != shape:
+        raise ValueError(f"out 的形状应为 {shape}，得到的是 {out.shape}")
+    else:
+        result = out
+
+    if statistics is None:
+        statistics = ColumnStatistics.from_data(data)
+    else:
+        _check_statistics(statistics, data.shape)
+    center, scale = _standardizer(statistics)
+    step = p if block_size is None else max(1, block_size)
+    rows = block_rows(p)
+    for start in range(0, p, step):
+        stop = min(start + step, p)
+        # 只计算上三角: [start, stop) 列与 [start, p) 列
+        product = np.zeros((stop - start, p - start))
+        for block in iter_blocks(data, rows):
+            z = (block[:, start:] - center[start:]) * scale[start:]
+            product += z[:, :stop - start].T @ z
+        np.clip(product, -1, 1, out=product)
+        result[start:stop, start:] = product
+        result[start:, start:stop] = product.T
+
+    if isinstance(result, np.memmap):
+        result.flush()
+    if out is None and isinstance(data, pd.DataFrame):
+        return pd.DataFrame(result, index=data.columns, columns=data.columns)
+    return result
+
+
+def _check_pair(x: np.ndarray, y: np.ndarray) -> None:
+    """与 ``corr`` 相同的检查
+
+    Raises:
+        ValueError: 数据长度必须大于 1
+        ValueError: 数据长度必须相同
+        ValueError: 数据有空
+    """
+    if len(x) <= 1:
+        raise ValueError("数据长度必须大于1")
+    if len(x) != len(y):
+        raise ValueError("数据长度必须相同")
+    if np.isnan(x).any() or np.isnan(y).any():
+        raise ValueError("数据有空")
+
+
+def _as_float(data: ArrayLike) -> np.ndarray:
+    return np.asarray(data, dtype=np.float64)
+
+
+def _pearson(x: np.ndarray, y: np.ndarray) -> float:
+    """两个没有缺失值的一维数组的相关系数，常数列为 0"""
+    if np.isclose(x.std(), 0) or np.isclose(y.std(), 0):
+        return 0.0  # 常数据不存在相关性
+    x = x - x.mean()
+    y = y - y.mean()
+    return float(np.clip(np.dot(x, y) / np.sqrt(np.dot(x, x) * np.dot(y, y)), -1, 1))
+
+
+def spearman(x: ArrayLike, y: ArrayLike) -> Real:
+    """Spearman 秩相关系数
+
+    即平均秩（相同的值取平均秩）的样本相关系数，常数列为 0
+
+    Args:
+        x (ArrayLike): 变量 1
+        y (ArrayLike): 变量 2
+
+    Returns:
+        Real: 一个 [-1, 1] 之间的数
+
+    Raises:
+        ValueError: 数据长度必须大于 1
+        ValueError: 数据长度必须相同
+        ValueError: 数据有空
+    """
+    x, y = _as_float(x), _as_float(y)
+    _check_pair(x, y)
+    return _pearson(rankdata(x), rankdata(y))
+
+
+def spearman_matrix(
+        data: pd.DataFrame | np.ndarray,
+        block_size: Optional[int] = None,
+        out: Optional[np.ndarray | str | os.PathLike] = None,
+) -> pd.DataFrame | np.ndarray:
+    """所有列两两之间的 Spearman 秩相关系数
+
+    每列只排序一次，再对秩调用 ``corr_matrix``
+
+    Args:
+        data (DataFrame | np.ndarray): 二维数据
+        block_size (Optional[int]): 见 ``corr_matrix``
+        out (Optional[np.ndarray | str]): 见 ``corr_matrix``
+
+    Returns:
+        相关系数矩阵，data 是 DataFrame 且没有 out 时返回 DataFrame
+
+    Raises:
+        ValueError: 数据长度必须大于 1
+        ValueError: 数据有空
+    """
+    values = _as_float(data)
+    if np.isnan(values).any():
+        raise ValueError("数据有空")
+    result = corr_matrix(rankdata(values, axis=0), block_size=block_size, out=out)
+    if out is None and isinstance(data, pd.DataFrame):
+        return pd.DataFrame(result, index=data.columns, columns=data.columns)
+    return result
+
+
+def _dense_ranks(values: np.ndarray) -> tuple[np.ndarray, int, int]:
+    """``(从 0 开始的稠密秩, 不同值的个数, 相同值的对数)``"""
+    unique, ranks, counts = np.unique(values, return_inverse=True, return_counts=True)
+    return ranks.astype(np.int64), len(unique), int(np.sum(counts * (counts - 1) // 2))
+
+
+def _count_inversions(ranks: np.ndarray, m: int) -> int:
+    """逆序对 (i < j 且 ranks[i] > ranks[j]) 的个数，O(n log m)
+
+    与归并排序计数逆序对是同一种分治：按值的二进制位从高到低，
+    把每组稳定地分成该位为 0 和为 1 的两半，组内排在 0 之前的 1 各构成一个逆序对。
+    每一位只需要几次 cumsum 和一次散射，全部是向量化的 O(n) 操作
+
+    Args:
+        ranks (np.ndarray): [0, m) 之间的整数
+        m (int): 值的上界
+    """
+    n = len(ranks)
+    current = ranks
+    index = np.arange(n)
+    inversions = 0
+    for bit in range(max(int(m - 1).bit_length(), 1) - 1, -1, -1):
+        ones = (current >> bit) & 1
+        prefix = current >> (bit + 1)  # 已经按更高位分好组，同组的元素相邻
+        first = np.empty(n, dtype=bool)
+        first[0] = True
+        np.not_equal(prefix[1:], prefix[:-1], out=first[1:])
+        starts = np.flatnonzero(first)
+        group = np.cumsum(first) - 1
+        start = starts[group]
+
+        ones_before = np.cumsum(ones) - ones  # 不包括自身
+        ones_before_in_group = ones_before - ones_before[start]
+        inversions += int(ones_before_in_group[ones == 0].sum())
+
+        zeros_in_group = np.diff(np.append(starts, n)) - np.add.reduceat(ones, starts)
+        position = np.where(
+            ones == 0,
+            index - ones_before_in_group,
+            start + zeros_in_group[group] + ones_before_in_group,
+        )
+        partitioned = np.empty_like(current)
+        partitioned[position] = current
+        current = partitioned
+    return inversions
+
+
+def _kendall(x: tuple[np.ndarray, int, int], y: tuple[np.ndarray, int, int]) -> float:
+    """用 ``_dense_ranks`` 的结果计算 tau-b"""
+    (x_ranks, _, x_ties), (y_ranks, y_m, y_ties) = x, y
+    n = len(x_ranks)
+    pairs = n * (n - 1) // 2
+    denominator = np.sqrt(float(pairs - x_ties) * float(pairs - y_ties))
+    if denominator == 0:
+        return 0.0  # 常数据不存在相关性
+
+    # 按 (x, y) 排序后，y 的逆序对就是不一致的对；x 相同的对按 y 升序，不会被计入
+    key = np.sort(x_ranks * y_m + y_ranks)
+    _, joint = np.unique(key, return_counts=True)
+    joint_ties = int(np.sum(joint * (joint - 1) // 2))
+    discordant = _count_inversions(key % y_m, y_m)
+    concordant = pairs - x_ties - y_ties + joint_ties - discordant
+    return float(np.clip((concordant - discordant) / denominator, -1, 1))
+
+
+def kendall_tau(x: ArrayLike, y: ArrayLike) -> Real:
+    r"""Kendall 秩相关系数 (tau-b)，O(n log n)
+
+    .. math::
+        \tau_b = \frac{n_c - n_d}{\sqrt{(n_0 - n_1)(n_0 - n_2)}}
+
+    :math:`n_c, n_d` 为一致和不一致的对数，:math:`n_0 = n(n-1)/2`，
+    :math:`n_1, n_2` 为 x、y 中相同值的对数。不一致的对数通过按 x 排序后
+    计数 y 的逆序对得到，不需要枚举所有的对。常数列为 0
+
+    Args:
+        x (ArrayLike): 变量 1
+        y (ArrayLike): 变量 2
+
+    Returns:
+        Real: 一个 [-1, 1] 之间的数
+
+    Raises:
+        ValueError: 数据长度必须大于 1
+        ValueError: 数据长度必须相同
+        ValueError: 数据有空
+    """
+    x, y = _as_float(x), _as_float(y)
+    _check_pair(x, y)
+    return _kendall(_dense_ranks(x), _dense_ranks(y))
+
+
+def kendall_matrix(data: pd.DataFrame | np.ndarray) -> pd.DataFrame | np.ndarray:
+    """所有列两两之间的 Kendall 秩相关系数 (tau-b)
+
+    每列的秩和相同值的对数只计算一次，每对列的代价为 O(n log n)
+
+    Args:
+        data (DataFrame | np.ndarray): 二维数据
+
+    Returns:
+        相关系数矩阵，data 是 DataFrame 时返回 DataFrame
+
+    Raises:
+        ValueError: 数据长度必须大于 1
+        ValueError: 数据有空
+    """
+    values = _as_float(data)
+    if len(values) <= 1:
+        raise ValueError("数据长度必须大于1")
+    if np.isnan(values).any():
+        raise ValueError("数据有空")
+
+    columns = [_dense_ranks(values[:, j]) for j in range(values.shape[1])]
+    result = np.empty((len(columns), len(columns)))
+    for i, x in enumerate(columns):
+        result[i, i] = 0.0 if x[1] == 1 else 1.0
+        for j in range(i + 1, len(columns)):
+            result[i, j] = result[j, i] = _kendall(x, columns[j])
+
+    if isinstance(data, pd.DataFrame):
+        return pd.DataFrame(result, index=data.columns, columns=data.columns)
+    return result
+
+
+_ATOL: float = 1e-8
+"""``np.isclose`` 的默认绝对误差，判断常数数据"""
+
+
+class RollingCorrelation:
+    r"""流式数据上的滚动相关系数，每个新样本 O(1) 更新
+
+    维护均值和协矩 :math:`\sum (x - \bar{x})(y - \bar{y})` 等，
+    加入和移除样本都用 Welford 的方法更新，不需要重新扫描窗口。
+
+    - 滑动窗口模式 (``window``)：只使用最近 ``window`` 个样本，结果与对同一窗口调用 ``corr`` 相同。
+      每 ``window`` 次更新按窗口重新计算一次协矩，消除长时间加减累积的舍入误差，均摊仍为 O(1)
+    - 指数衰减模式 (``alpha``)：第 k 个旧样本的权重为 :math:`(1 - \alpha)^k`，
+      与 ``pandas`` 的 ``ewm(alpha=alpha).corr()`` 相同
+
+    与 ``corr`` 一样，常数数据的相关系数为 0
+
+    Attributes:
+        window (Optional[int]): 窗口长度
+        alpha (Optional[float]): 衰减系数
+        count (int): 窗口中（衰减模式下为累计）的样本数
+
+    Examples:
+        >>> rolling = RollingCorrelation(window=1000)
+        >>> for x, y in stream:
+        ...     r = rolling.update(x, y)
+    """
+
+    def __init__(self, window: Optional[int] = None, alpha: Optional[float] = None) -> None:
+        """
+        Args:
+            window (Optional[int]): 窗口长度，至少为 2
+            alpha (Optional[float]): (0, 1] 之间的衰减系数，与 window 只能指定一个
+
+        Raises:
+            ValueError: 参数无效
+        """
+        if (window is None) == (alpha is None):
+            raise ValueError("window 和 alpha 必须且只能指定一个")
+        if window is not None and window < 2:
+            raise ValueError(f"window 至少为 2，得到的是 {window}")
+        if alpha is not None and not 0 < alpha <= 1:
+            raise ValueError(f"alpha 必须在 (0, 1] 之间，得到的是 {alpha}")
+        self.window: Optional[int] = window
+        self.alpha: Optional[float] = alpha
+        self.__buffer: list[tuple[float, float]] = []
+        self.reset()
+
+    def reset(self) -> None:
+        """清空所有样本"""
+        self.count: int = 0
+        self.__buffer.clear()
+        self.__position = 0
+        self.__weight = 0.0
+        self.__mean_x = self.__mean_y = 0.0
+        self.__xx = self.__yy = self.__xy = 0.0
+
+    def __add(self, x: float, y: float, decay: float = 1.0) -> None:
+        self.__weight = decay * self.__weight + 1
+        dx = x - self.__mean_x
+        dy = y - self.__mean_y
+        self.__mean_x += dx / self.__weight
+        self.__mean_y += dy / self.__weight
+        self.__xx = decay * self.__xx + dx * (x - self.__mean_x)
+        self.__yy = decay * self.__yy + dy * (y - self.__mean_y)
+        self.__xy = decay * self.__xy + dx * (y - self.__mean_y)
+
+    def __remove(self, x: float, y: float) -> None:
+        """``__add`` 的逆运算"""
+        self.__weight -= 1
+        dx = x - self.__mean_x
+        dy = y - self.__mean_y
+        self.__mean_x -= dx / self.__weight
+        self.__mean_y -= dy / self.__weight
+        self.__xx -= dx * (x - self.__mean_x)
+        self.__yy -= dy * (y - self.__mean_y)
+        self.__xy -= dx * (y - self.__mean_y)
+
+    def __refresh(self) -> None:
+        """按窗口中的样本重新计算均值和协矩"""
+        x, y = np.array(self.__buffer).T
+        self.__mean_x, self.__mean_y = float(x.mean()), float(y.mean())
+        dx, dy = x - self.__mean_x, y - self.__mean_y
+        self.__xx, self.__yy, self.__xy = float(dx @ dx), float(dy @ dy), float(dx @ dy)
+
+    def update(self, x: Real, y: Real) -> float:
+        """加入一个样本，窗口已满时移除最旧的样本
+
+        Args:
+            x (Real): 变量 1 的新值
+            y (Real): 变量 2 的新值
+
+        Returns:
+            float: 更新后的相关系数
+
+        Raises:
+            ValueError: 数据有空
+        """
+        x, y = float(x), float(y)
+        if math.isnan(x) or math.isnan(y):
+            raise ValueError("数据有空")
+
+        if self.window is None:
+            self.__add(x, y, 1 - self.alpha)
+            self.count += 1
+            return self.corr
+
+        if self.count == self.window:
+            self.__remove(*self.__buffer[self.__position])
+            self.__buffer[self.__position] = x, y
+        else:
+            self.count += 1
+            self.__buffer.append((x, y))
+        self.__position = (self.__position + 1) % self.window
+        self.__add(x, y)
+        if self.__position == 0:
+            self.__refresh()
+        return self.corr
+
+    def extend(self, x: ArrayLike, y: ArrayLike) -> np.ndarray:
+        """依次加入多个样本
+
+        Args:
+            x (ArrayLike): 变量 1 的新值
+            y (ArrayLike): 变量 2 的新值
+
+        Returns:
+            np.ndarray: 每加入一个样本后的相关系数
+
+        Raises:
+            ValueError: 数据长度必须相同
+        """
+        x, y = _as_float(x).ravel(), _as_float(y).ravel()
+        if len(x) != len(y):
+            raise ValueError("数据长度必须相同")
+        return np.array([self.update(a, b) for a, b in zip(x.tolist(), y.tolist())])
+
+    @property
+    def corr(self) -> float:
+        """当前的相关系数，样本数不大于 1 时为 NaN"""
+        if self.count <= 1:
+            return math.nan
+        # 与 np.isclose(std, 0) 相同，每次更新都会调用，避免 numpy 标量的开销
+        if min(self.__xx, self.__yy) <= _ATOL ** 2 * self.__weight:
+            return 0.0  # 常数据不存在相关性
+        return max(-1.0, min(1.0, self.__xy / math.sqrt(self.__xx * self.__yy)))
+
+    def __repr__(self) -> str:
+        mode = f"window={self.window}" if self.window is not None else f"alpha={self.alpha}"
+        return f"RollingCorrelation({mode}, count={self.count}, corr={self.corr:.4g})"
+
+
+__all__ = [
+    "corr_matrix",
+    "spearman", "spearman_matrix",
+    "kendall_tau", "kendall_matrix",
+    "RollingCorrelation",
+]
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from typing import Hashable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from pythontools.modeling.normalization import Normalizer, ZScoreNormalizer
+from pythontools.modeling.statistics import ColumnStatistics, block_rows, iter_blocks
+
+
+class GroupedNormalizer:
+    """
+    按组标准化，每组使用自己的统计量
+
+    所有组的统计量在一次按块扫描中同时得到，变换时按组的键把统计量广播回每一行，
+    不需要为每个组创建一个 Normalizer
+
+    Attributes:
+        by (list): 分组的列
+        columns (pd.Index): 被标准化的列
+        groups (pd.Index): 训练时出现的组
+        normalizer (Normalizer): 保存所有组统计量的 Normalizer
+
+    Example:
+        >>> data = pd.DataFrame({
+        ...     "sensor": ["a", "a", "b", "b"],
+        ...     "value": [1, 3, 10, 30],
+        ... })
+        >>> GroupedNormalizer(data, by="sensor").normalize()
+          sensor  value
+        0      a   -1.0
+        1      a    1.0
+        2      b   -1.0
+        3      b    1.0
+    """
+
+    def __init__(
+            self,
+            data: pd.DataFrame,
+            by: Hashable | Sequence[Hashable],
+            normalizer: type[Normalizer] = ZScoreNormalizer,
+            *args, **kwargs
+    ) -> None:
+        """
+        Args:
+            data (DataFrame): 训练数据，包括分组的列
+            by: 分组的列名
+            normalizer (type[Normalizer]): 每组使用的标准化方法，必须是仿射变换，
+                例如 ``ZScoreNormalizer``、``MinMaxNormalizer``
+            *args: 传给 normalizer 的参数
+            **kwargs: 传给 normalizer 的参数
+        """
+        if not isinstance(data, pd.DataFrame):
+            raise NotImplementedError("暂不支持 data 不是 pandas DataFrame 的情形")
+
+        self.__data = data
+        self.by: list = list(by) if isinstance(by, (list, tuple)) else [by]
+        self.columns: pd.Index = data.columns.drop(self.by)
+
+        # 分组的键只用来得到每行所在组的下标，被标准化的列按块只读一遍
+        grouper = data.groupby(self.by, sort=False)
+        codes = grouper.ngroup().to_numpy(dtype=np.float64, na_value=-1).astype(np.intp)
+        self.groups: pd.Index = grouper.size().index
+
+        values = data[self.columns]
+        n_groups = len(self.groups)
+        statistics = _group_statistics(np.empty((0, len(self.columns))), codes[:0], n_groups, self.columns)
+        rows = block_rows(len(self.columns))
+        for start, block in zip(range(0, len(values), rows), iter_blocks(values, rows)):
+            statistics = statistics.merge(
+                _group_statistics(block, codes[start:start + rows], n_groups, self.columns)
+            )
+        statistics.passes = 1
+        self.normalizer: Normalizer = normalizer.from_statistics(statistics, *args, **kwargs)
+
+    def __statistic(self, name: str) -> pd.DataFrame:
+        return pd.DataFrame(self.normalizer._statistic(name), index=self.groups, columns=self.columns)
+
+    @property
+    def max(self) -> pd.DataFrame:
+        """每组的最大值"""
+        return self.__statistic("max")
+
+    @property
+    def min(self) -> pd.DataFrame:
+        """每组的最小值"""
+        return self.__statistic("min")
+
+    @property
+    def std(self) -> pd.DataFrame:
+        """每组的标准差"""
+        return self.__statistic("std")
+
+    @property
+    def mean(self) -> pd.DataFrame:
+        """每组的算术平均数"""
+        return self.__statistic("mean")
+
+    def __codes(self, data: pd.DataFrame) -> np.ndarray:
+        """每一行所在组的下标，训练时没有出现的组为 -1"""
+        if len(self.by) == 1:
+            keys = pd.Index(data[self.by[0]])
+        else:
+            keys = pd.MultiIndex.from_frame(data[self.by])
+        return self.groups.get_indexer(keys)
+
+    def __transform(self, data: Optional[pd.DataFrame], inverse: bool) -> pd.DataFrame:
+        if data is None:
+            data = self.__data
+        if not isinstance(data, pd.DataFrame):
+            raise NotImplementedError("暂不支持 data 不是 pandas DataFrame 的情形")
+
+        codes = self.__codes(data)
+        # 多加一行 NaN 参数，没有出现过的组 (-1) 正好取到这一行
+        params = tuple(
+            np.vstack([param, np.full((1, len(self.columns)), np.nan)])
+            for param in self.normalizer._params()
+        )
+
+        values = data[self.columns]
+        out = np.empty(values.shape, dtype=self.normalizer.dtype)
+        rows = block_rows(len(self.columns))
+        for start, block in zip(range(0, len(values), rows), iter_blocks(values, rows)):
+            block_params = tuple(param[codes[start:start + rows]] for param in params)
+            self.normalizer._transform_block(block, out[start:start + rows], block_params, inverse)
+
+        result = data.copy(deep=False)
+        result[self.columns] = out
+        return result
+
+    def normalize(self, data: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """按组标准化
+
+        Args:
+            data (Optional[DataFrame]): 需要标准化的数据，必须包括分组的列
+
+        Returns:
+            DataFrame: 分组的列不变，其他列按所在组标准化；训练时没有出现的组结果为 NaN
+        """
+        return self.__transform(data, inverse=False)
+
+    def denormalize(self, data: pd.DataFrame) -> pd.DataFrame:
+        """按组反标准化
+
+        Args:
+            data (DataFrame): 标准化后的数据，必须包括分组的列
+
+        Returns:
+            DataFrame: 反标准化后的数据
+        """
+        return self.__transform(data, inverse=True)
+
+    def transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        """``normalize`` 的别名"""
+        return self.normalize(data)
+
+
+def _group_statistics(block: np.ndarray, codes: np.ndarray, n_groups: int, columns: pd.Index) -> ColumnStatistics:
+    """一个数据块中每组的统计量，每行是一组
+
+    数据块足够小，可以常驻缓存，块内的几次分组聚合不需要再从内存读取数据。
+    下标为 -1（分组的键缺失）的行不属于任何组
+
+    Args:
+        block (np.ndarray): 数据块
+        codes (np.ndarray): 每行所在组的下标
+        n_groups (int): 组的个数
+        columns (pd.Index): 列名
+    """
+    shape = (n_groups, block.shape[1])
+    count, m2, missing = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+    mean, min_, max_ = np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan)
+
+    keep = codes >= 0
+    if not keep.all():
+        block, codes = block[keep], codes[keep]
+    grouped = pd.DataFrame(block).groupby(codes)
+    block_count = grouped.count()
+    groups = block_count.index.to_numpy()
+    count[groups] = block_count.to_numpy(dtype=np.float64)
+    mean[groups] = grouped.mean().to_numpy(dtype=np.float64)
+    variance = grouped.var(ddof=0).to_numpy(dtype=np.float64)
+    m2[groups] = np.where(count[groups] > 0, variance * count[groups], 0)
+    min_[groups] = grouped.min().to_numpy(dtype=np.float64)
+    max_[groups] = grouped.max().to_numpy(dtype=np.float64)
+    missing[groups] = grouped.size().to_numpy(dtype=np.float64)[:, None] - count[groups]
+    return ColumnStatistics(count, mean, m2, min_, max_, columns=columns, passes=1, missing=missing)
+
+
+__all__ = [
+    "GroupedNormalizer",
+]
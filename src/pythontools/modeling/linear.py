@@ -0,0 +1,653 @@
+from __future__ import annotations
+
+from functools import cached_property
+from typing import Self, Optional, Iterable, Callable
+
+import numpy as np
+import pandas as pd
+from numpy.typing import ArrayLike
+from scipy import linalg
+from scipy.linalg import lapack
+from scipy.stats import t
+
+from pythontools.modeling.statistics import block_rows
+from pythontools.types.modeling import LinearModel
+
+
+def _as_matrix(data: ArrayLike) -> np.ndarray:
+    """转换为二维 float64 数组，一维数据视为一列"""
+    data = np.asarray(data, dtype=np.float64)
+    return data[:, None] if data.ndim == 1 else data
+
+
+_REFINE_CONDITION: float = 1e4
+"""Cholesky QR 得到的 R 的条件数超过这个值时再做一次（CholeskyQR2），结果的相对误差约为 eps·条件数²"""
+
+_CHOLESKY_CONDITION: float = 1e7
+"""R 的条件数超过这个值时 Cholesky QR 不可靠，改用 Householder QR"""
+
+
+def _centered_blocks(x: np.ndarray, y: np.ndarray, mean_x: np.ndarray, mean_y: np.ndarray) -> Iterable[np.ndarray]:
+    """按块取出中心化的 ``[X, y]``，每块在同一个缓冲区里计算，不复制整个矩阵"""
+    p = x.shape[1]
+    rows = block_rows(p + y.shape[1])
+    buffer = np.empty((min(rows, len(x)), p + y.shape[1]))
+    for start in range(0, len(x), rows):
+        block = buffer[:len(x[start:start + rows])]
+        np.subtract(x[start:start + rows], mean_x, out=block[:, :p])
+        np.subtract(y[start:start + rows], mean_y, out=block[:, p:])
+        yield block
+
+
+def _cholesky_qr(blocks: Callable[[], Iterable[np.ndarray]], p: int) -> tuple[np.ndarray, np.ndarray]:
+    r"""X 的 Cholesky QR：:math:`X^T X = R^T R`，返回 ``(R, Q^T y)``
+
+    只需要 :math:`X^T [X, y]` 这一个矩阵乘法（不需要 :math:`y^T y`，因变量很多时也很快），
+    :math:`Q^T y = R^{-T} X^T y`。条件数大时用 :math:`Z = X R^{-1}` 再做一次 (CholeskyQR2)，
+    R 与 Householder QR 的精度相同
+
+    Raises:
+        LinAlgError: X 的条件数太大
+    """
+    gram = sum(block.T @ block[:, :p] for block in blocks())
+    r = linalg.cholesky(gram[:p])
+    qty = linalg.solve_triangular(r, gram[p:].T, trans="T")
+    condition = np.linalg.cond(r)
+    if condition > _CHOLESKY_CONDITION:
+        raise linalg.LinAlgError(f"条件数太大: {condition:.3g}")
+    if condition > _REFINE_CONDITION:
+        inverse = linalg.solve_triangular(r, np.eye(p))
+        zz, zy = np.zeros((p, p)), np.zeros(qty.shape)
+        for block in blocks():
+            z = block[:, :p] @ inverse
+            zz += z.T @ z
+            zy += z.T @ block[:, p:]
+        refined = linalg.cholesky(zz)
+        qty = linalg.solve_triangular(refined, zy, trans="T")
+        r = refined @ r
+    return r, qty
+
+
+def _householder_qr(blocks: Callable[[], Iterable[np.ndarray]]) -> np.ndarray:
+    """逐块做 ``[X, y]`` 的 Householder QR，每块与之前的 R 叠在一起再分解，适用于任意条件数"""
+    r = None
+    for block in blocks():
+        stacked = block if r is None else np.vstack([r, block])
+        r = linalg.qr(stacked, mode="r", check_finite=False)[0][:block.shape[1]]
+    return r
+
+
+def _least_squares(
+        X: ArrayLike, y: ArrayLike, fit_intercept: bool = True,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, int]:
+    r"""用一次 QR 分解求最小二乘的 ``(beta, intercept, sse, tss, unscaled, dof)``
+
+    有截距时先把 X 和 y 按块中心化，斜率与加一列常数后的回归相同，但不需要构造增广矩阵。
+    求 X 的 QR 分解中的 R 和 :math:`Q^T y`（不需要 Q），
+    则 :math:`\beta = R^{-1} Q^T y`，:math:`(X^T X)^{-1}` 的对角线是 :math:`R^{-1}` 各行的平方和，
+    系数和标准误差都来自同一个分解，不需要求 :math:`X^T X` 的逆。
+    y 可以有多列，所有因变量共用这一个分解，都是矩阵乘法
+
+    R 先用 Cholesky QR 求，条件数大时做第二遍 (CholeskyQR2)，再扫描一遍数据，
+    由 :math:`y - X \beta` 得到残差平方和（同时得到总平方和），没有 :math:`y^T y - \beta^T X^T y` 的相消误差；
+    Cholesky 分解失败时（自变量线性相关等）逐块做 :math:`[X, y]` 的 Householder QR，
+    残差平方和为 R 右下角各列的平方和。最后对 R 做带列主元的 QR 确定秩
+
+    Returns:
+        beta 为 (自变量数, 因变量数) 的系数，intercept 为每个因变量的截距（没有截距时为 0），
+        sse 和 tss 为每个因变量的残差平方和与总平方和，unscaled 为 :math:`(X^T X)^{-1}` 的对角线，
+        dof 为残差的自由度。
+        自变量线性相关时无法确定的系数及其 unscaled 为 NaN
+
+    Raises:
+        ValueError: X 和 y 的行数不同
+    """
+    x, y = _as_matrix(X), _as_matrix(y)
+    if len(x) != len(y):
+        raise ValueError(f"X 和 y 的行数不同: {len(x)} 和 {len(y)}")
+    n, p = x.shape
+    if fit_intercept:
+        mean_x, mean_y = x.mean(axis=0), y.mean(axis=0)
+    else:
+        mean_x, mean_y = np.zeros(p), np.zeros(y.shape[1])
+
+    def blocks():
+        return _centered_blocks(x, y, mean_x, mean_y)
+
+    try:
+        r, qty = _cholesky_qr(blocks, p)
+        r22 = None
+    except linalg.LinAlgError:
+        r = _householder_qr(blocks)
+        r, qty, r22 = r[:p, :p], r[:p, p:], r[p:, p:]
+
+    q, r, pivots = linalg.qr(r, pivoting=True)
+    qty = q.T @ qty
+    diagonal = np.abs(np.diag(r))
+    tolerance = diagonal[0] * max(n, p) * np.finfo(np.float64).eps if diagonal.size else 0
+    rank = int(np.sum(diagonal > tolerance))
+
+    r_inverse = linalg.solve_triangular(r[:rank, :rank], np.eye(rank))
+    beta = np.full((p, y.shape[1]), np.nan)
+    beta[pivots[:rank]] = r_inverse @ qty[:rank]
+    unscaled = np.full(p, np.nan)
+    unscaled[pivots[:rank]] = np.einsum("ij,ij->i", r_inverse, r_inverse)
+    solution = np.nan_to_num(beta)
+    # 总平方和按 y 的均值计算，没有截距时也是如此，与 ``score`` 一致
+    offset = mean_y - y.mean(axis=0)
+    sse, tss = np.zeros(y.shape[1]), np.zeros(y.shape[1])
+    for block in blocks():
+        if r22 is None:
+            residuals = block[:, p:] - block[:, :p] @ solution
+            sse += np.einsum("ij,ij->j", residuals, residuals)
+        centered = block[:, p:] if fit_intercept else block[:, p:] + offset
+        tss += np.einsum("ij,ij->j", centered, centered)
+    if r22 is not None:
+        # 去掉的自变量方向上的分量也属于残差
+        residuals = np.vstack([qty[rank:], r22])
+        sse = np.einsum("ij,ij->j", residuals, residuals)
+    intercept = mean_y - mean_x @ solution
+    return beta, intercept, sse, tss, unscaled, n - rank - int(fit_intercept)
+
+
+def _r2(y: np.ndarray, predictions: np.ndarray) -> np.ndarray:
+    """每个因变量的决定系数，y 和 predictions 都是 (样本数, 因变量数)"""
+    residuals = y - predictions
+    centered = y - y.mean(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 1 - np.einsum("ij,ij->j", residuals, residuals) / np.einsum("ij,ij->j", centered, centered)
+
+
+def regression_statistics(X: ArrayLike, y: ArrayLike, fit_intercept: bool = True) -> dict[str, np.ndarray]:
+    """一次计算线性回归的系数、R 方、调整 R 方、标准误差和 p 值
+
+    y 可以有多列（多个因变量），所有因变量共用 X 的一次 QR 分解，
+    计算都是矩阵乘法，比对每个因变量分别调用 ``p_values``、``r_squared`` 快得多
+
+    Args:
+        X (ArrayLike): 自变量，(样本数, 自变量数)
+        y (ArrayLike): 因变量，(样本数,) 或 (样本数, 因变量数)
+        fit_intercept (bool): 是否有截距
+
+    Returns:
+        dict[str, np.ndarray]: ``coef``、``intercept``、``r2``、``adjusted_r2``、
+        ``standard_errors``、``t_values``、``p_values`` 和 ``dof``。
+        y 是二维时系数等的形状为 (因变量数, 自变量数)，R 方等的形状为 (因变量数,)，
+        与 ``OLS`` 的属性相同；y 是一维时去掉因变量的维度
+
+    Raises:
+        ValueError: X 和 y 的行数不同
+
+    Examples:
+        >>> statistics = regression_statistics(X, returns)  # returns 有几百列
+        >>> statistics["p_values"][:, 0]  # 每个因变量第一个自变量的 p 值
+    """
+    multi_target = np.ndim(y) == 2
+    x, y = _as_matrix(X), _as_matrix(y)
+    beta, intercept, sse, tss, unscaled, dof = _least_squares(x, y, fit_intercept)
+    n, p = x.shape
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r2 = 1 - sse / tss
+        standard_errors = np.sqrt(np.outer(sse / dof, unscaled))
+        t_values = beta.T / standard_errors
+    result = {
+        "coef": beta.T,
+        "intercept": intercept,
+        "r2": r2,
+        "adjusted_r2": 1 - (1 - r2) * (n - 1) / (n - p - 1),
+        "standard_errors": standard_errors,
+        "t_values": t_values,
+        "p_values": 2 * t.sf(np.abs(t_values), df=dof),
+    }
+    if not multi_target:
+        result = {key: value[0] for key, value in result.items()}
+    result["dof"] = dof
+    return result
+
+
+class OLS:
+    r"""普通最小二乘线性回归，实现 ``LinearModel`` 协议
+
+    训练时只累积充分统计量：样本数、X 和 y 的均值、中心化的 :math:`X^T X`、:math:`X^T y`
+    和 y 的离差平方和。数据可以分块传入 ``partial_fit``，内存为 :math:`O(p^2)`，与行数无关。
+    各块按 Chan 的方法合并中心化的统计量，比直接累加 :math:`X^T X` 的舍入误差小得多。
+    求解时对 (中心化的) :math:`X^T X` 做带主元的 Cholesky 分解，每步选剩余离差平方和最大的列，
+    与 ``regression_statistics`` 中带列主元的 QR 选出相同的列。自变量线性相关时去掉其余的列：
+    它们的系数、标准误差和 p 值为 NaN，残差自由度按秩计算，约定与 ``regression_statistics`` 相同。
+    由 :math:`X^T X` 判断秩的精度低于 QR，容差相应放宽为 :math:`\max(n, p) \epsilon` 倍的最大对角元，
+    只在几乎线性相关的数据上两者可能得到不同的秩。
+
+    R 方、标准误差和 p 值都可以由充分统计量得到，不需要再读一遍数据。
+    y 可以是二维的（多个因变量），此时 ``coef_`` 的形状为 (因变量数, 自变量数)
+
+    Attributes:
+        fit_intercept (bool): 是否有截距
+        n_samples_ (int): 训练的样本数
+        feature_names_in_ (Optional[pd.Index]): 训练数据是 DataFrame 时的列名
+
+    Examples:
+        >>> model = OLS()
+        >>> for chunk in pd.read_csv("data.csv", chunksize=1_000_000):
+        ...     model.partial_fit(chunk[features], chunk["y"])
+        >>> model.coef_, model.p_values_
+    """
+
+    def __init__(self, fit_intercept: bool = True) -> None:
+        """
+        Args:
+            fit_intercept (bool): 是否有截距
+        """
+        self.fit_intercept: bool = fit_intercept
+        self.reset()
+
+    def reset(self) -> None:
+        """丢弃已经累积的统计量"""
+        self.n_samples_: int = 0
+        self.feature_names_in_: Optional[pd.Index] = None
+        self.__multi_target: bool = False
+        self.__mean_x: Optional[np.ndarray] = None
+        self.__mean_y: Optional[np.ndarray] = None
+        self.__xx: Optional[np.ndarray] = None
+        self.__xy: Optional[np.ndarray] = None
+        self.__yy: Optional[np.ndarray] = None
+        self.__solution: Optional[tuple] = None
+
+    def partial_fit(self, X: ArrayLike, y: ArrayLike) -> Self:
+        """用一块数据增量训练
+
+        多次调用后的结果与在拼接后的数据上训练相同（在浮点误差内）
+
+        Args:
+            X (ArrayLike): 自变量，(样本数, 自变量数)
+            y (ArrayLike): 因变量，(样本数,) 或 (样本数, 因变量数)
+
+        Returns:
+            Self: 返回实例本身，便于链式调用
+
+        Raises:
+            ValueError: 形状不一致，或有缺失值
+        """
+        if isinstance(X, pd.DataFrame) and self.feature_names_in_ is None:
+            self.feature_names_in_ = X.columns
+        x = _as_matrix(X)
+        multi_target = np.ndim(y) == 2
+        y = _as_matrix(y)
+        if len(x) != len(y):
+            raise ValueError(f"X 和 y 的行数不同: {len(x)} 和 {len(y)}")
+        if self.__xx is not None and (x.shape[1] != len(self.__mean_x) or y.shape[1] != len(self.__mean_y)):
+            raise ValueError("列数与之前的数据不同")
+        if np.isnan(x).any() or np.isnan(y).any():
+            raise ValueError("数据有空")
+        n = len(x)
+        if n == 0:
+            return self
+
+        mean_x, mean_y = x.mean(axis=0), y.mean(axis=0)
+        x = x - mean_x
+        y = y - mean_y
+        xx, xy, yy = x.T @ x, x.T @ y, np.einsum("ij,ij->j", y, y)
+
+        if self.__xx is None:
+            self.__mean_x, self.__mean_y, self.__xx, self.__xy, self.__yy = mean_x, mean_y, xx, xy, yy
+        else:
+            total = self.n_samples_ + n
+            dx, dy = mean_x - self.__mean_x, mean_y - self.__mean_y
+            factor = self.n_samples_ * n / total
+            self.__xx = self.__xx + xx + factor * np.outer(dx, dx)
+            self.__xy = self.__xy + xy + factor * np.outer(dx, dy)
+            self.__yy = self.__yy + yy + factor * dy ** 2
+            self.__mean_x = self.__mean_x + dx * (n / total)
+            self.__mean_y = self.__mean_y + dy * (n / total)
+        self.n_samples_ += n
+        self.__multi_target = multi_target
+        self.__solution = None
+        return self
+
+    def fit(self, X: ArrayLike, y: ArrayLike) -> Self:
+        """训练模型，丢弃之前的统计量
+
+        Args:
+            X (ArrayLike): 自变量
+            y (ArrayLike): 因变量
+
+        Returns:
+            Self: 返回实例本身
+        """
+        self.reset()
+        return self.partial_fit(X, y)
+
+    @classmethod
+    def fit_chunks(cls, chunks: Iterable[tuple[ArrayLike, ArrayLike]], *args, **kwargs) -> Self:
+        """逐块训练，数据不需要同时放进内存
+
+        Args:
+            chunks (Iterable[tuple]): ``(X, y)`` 数据块
+            *args: 其他参数
+            **kwargs: 其他参数
+
+        Returns:
+            训练好的模型
+        """
+        model = cls(*args, **kwargs)
+        for X, y in chunks:
+            model.partial_fit(X, y)
+        return model
+
+    def __normal_equations(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """``(A, b, yy)``：系数满足 :math:`A \\beta = b`，yy 为对应的 y 的平方和"""
+        if self.fit_intercept:
+            return self.__xx, self.__xy, self.__yy
+        n = self.n_samples_
+        return (
+            self.__xx + n * np.outer(self.__mean_x, self.__mean_x),
+            self.__xy + n * np.outer(self.__mean_x, self.__mean_y),
+            self.__yy + n * self.__mean_y ** 2,
+        )
+
+    def __solve(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int]:
+        """``(beta, intercept, unscaled, sse, rank)``，统计量不变时复用
+
+        unscaled 为 :math:`(X^T X)^{-1}` 的对角线，去掉的列的 beta 和 unscaled 为 NaN
+
+        Raises:
+            ValueError: 尚未训练
+        """
+        if self.__xx is None:
+            raise ValueError("尚未训练，需要调用 fit 或 partial_fit")
+        if self.__solution is None:
+            a, b, yy = self.__normal_equations()
+            p = len(a)
+            tolerance = np.max(np.diag(a), initial=0) * max(self.n_samples_, p) * np.finfo(np.float64).eps
+            factor, pivots, rank, _ = lapack.dpstrf(a, tol=tolerance)
+            kept = pivots[:rank] - 1
+            r = np.triu(factor[:rank, :rank])
+            r_inverse = linalg.solve_triangular(r, np.eye(rank))
+
+            beta = np.full((p, b.shape[1]), np.nan)
+            beta[kept] = r_inverse @ (r_inverse.T @ b[kept])
+            unscaled = np.full(p, np.nan)
+            unscaled[kept] = np.einsum("ij,ij->i", r_inverse, r_inverse)
+            solution = np.nan_to_num(beta)
+            sse = np.maximum(yy - np.einsum("ij,ij->j", solution, b), 0)
+            intercept = self.__mean_y - self.__mean_x @ solution if self.fit_intercept else np.zeros(b.shape[1])
+            self.__solution = beta, intercept, unscaled, sse, rank
+        return self.__solution
+
+    def __output(self, values: np.ndarray) -> np.ndarray:
+        """只有一个因变量时去掉因变量的维度"""
+        return values if self.__multi_target else values[..., 0]
+
+    @property
+    def coef_(self) -> np.ndarray:
+        """回归系数，(自变量数,) 或 (因变量数, 自变量数)，自变量线性相关时去掉的列为 NaN"""
+        beta = self.__solve()[0]
+        return beta.T if self.__multi_target else beta[:, 0]
+
+    @property
+    def intercept_(self) -> float | np.ndarray:
+        """截距，多个因变量时为数组"""
+        intercept = self.__solve()[1]
+        return intercept if self.__multi_target else float(intercept[0])
+
+    @property
+    def dof_(self) -> int:
+        """残差的自由度，自变量线性相关时按 X 的秩计算"""
+        return self.n_samples_ - self.__solve()[4] - int(self.fit_intercept)
+
+    @property
+    def sse_(self) -> float | np.ndarray:
+        """残差平方和"""
+        return self.__output(self.__solve()[3])
+
+    @property
+    def r2_(self) -> float | np.ndarray:
+        """训练数据上的决定系数 :math:`R^2`，不需要再读数据"""
+        sse = self.__solve()[3]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.__output(1 - sse / self.__yy)
+
+    @property
+    def adjusted_r2_(self) -> float | np.ndarray:
+        """训练数据上的调整 :math:`R^2`"""
+        n, p = self.n_samples_, len(self.__mean_x)
+        return 1 - (1 - self.r2_) * (n - 1) / (n - p - 1)
+
+    @property
+    def standard_errors_(self) -> np.ndarray:
+        """回归系数（不包括截距）的标准误差，形状与 ``coef_`` 相同"""
+        _, _, unscaled, sse, _ = self.__solve()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            errors = np.sqrt(np.outer(sse / self.dof_, unscaled))
+        return errors if self.__multi_target else errors[0]
+
+    @property
+    def t_values_(self) -> np.ndarray:
+        """回归系数的 t 统计量"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.coef_ / self.standard_errors_
+
+    @property
+    def p_values_(self) -> np.ndarray:
+        """回归系数（不包括截距）的双侧 p 值，与 ``p_values`` 相同"""
+        return 2 * t.sf(np.abs(self.t_values_), df=self.dof_)
+
+    def predict(self, X: ArrayLike) -> np.ndarray:
+        """预测
+
+        Args:
+            X (ArrayLike): 自变量
+
+        Returns:
+            np.ndarray: 预测值，(样本数,) 或 (样本数, 因变量数)
+        """
+        beta, intercept, _, _, _ = self.__solve()
+        return self.__output(_as_matrix(X) @ np.nan_to_num(beta) + intercept)
+
+    def score(self, X: ArrayLike, y: ArrayLike) -> float:
+        """在给定数据上的决定系数 :math:`R^2`，多个因变量时取平均
+
+        Args:
+            X (ArrayLike): 自变量
+            y (ArrayLike): 因变量
+        """
+        y = _as_matrix(y)
+        return float(_r2(y, _as_matrix(self.predict(X))).mean())
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(fit_intercept={self.fit_intercept}, n_samples_={self.n_samples_})"
+
+
+def _coef_statistics(
+        coef: np.ndarray, residuals: np.ndarray, x: np.ndarray, fit_intercept: bool = True,
+) -> dict[str, np.ndarray]:
+    r"""给定模型的系数和残差，求标准误差、t 值和 p 值
+
+    :math:`(X^T X)^{-1}` 的对角线来自 X 的一次 QR 分解（与 ``regression_statistics`` 相同），
+    残差方差由模型自己的残差得到，t 值用模型自己的系数，所以各项都对应 ``coef``，
+    模型不是在这份数据上训练的普通最小二乘时也是如此。X 线性相关时去掉的列为 NaN
+
+    Args:
+        coef (np.ndarray): (因变量数, 自变量数) 的系数
+        residuals (np.ndarray): (样本数, 因变量数) 的残差
+        x (np.ndarray): 二维的自变量
+        fit_intercept (bool): 是否有截距
+
+    Returns:
+        dict[str, np.ndarray]: ``standard_errors``、``t_values`` 和 ``p_values``，形状与 coef 相同，以及 ``dof``
+    """
+    unscaled, dof = _least_squares(x, residuals, fit_intercept)[4:]
+    sse = np.einsum("ij,ij->j", residuals, residuals)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        standard_errors = np.sqrt(np.outer(sse / dof, unscaled))
+        t_values = coef / standard_errors
+    return {
+        "standard_errors": standard_errors,
+        "t_values": t_values,
+        "p_values": 2 * t.sf(np.abs(t_values), df=dof),
+        "dof": dof,
+    }
+
+
+class RegressionReport:
+    """线性回归的结果报告
+
+    预测值、残差、R 方、调整 R 方、标准误差和 p 值都在第一次访问时计算并缓存，
+    每项最多计算一次：整个报告只调用一次 ``model.predict``，
+    系数来自 ``model.coef_``，标准误差由模型自己的残差和 X 的一次 QR 分解得到，
+    t 值和 p 值都对应报告中的系数（与 ``p_values`` 相同）。
+    ``str(report)`` 是 ``print_result_for_lm`` 打印的摘要，也可以导出为 dict 或 DataFrame
+
+    不传 X 和 y 时使用模型训练时累积的统计量（如 ``OLS.r2_``、``OLS.p_values_``），
+    不需要再读数据，此时没有预测值和残差
+
+    Attributes:
+        model (LinearModel): 线性回归模型
+        X: 自变量数据
+        y: 因变量数据，只有一个因变量
+
+    Examples:
+        >>> report = RegressionReport(model, X, y)
+        >>> print(report)
+        >>> report.to_frame()
+    """
+
+    def __init__(self, model: LinearModel, X=None, y=None) -> None:
+        """
+        Args:
+            model (LinearModel): 训练好的线性回归模型
+            X: 自变量数据，为 None 时使用模型累积的统计量
+            y: 因变量数据
+
+        Raises:
+            ValueError: 只传了 X 和 y 中的一个
+        """
+        if (X is None) != (y is None):
+            raise ValueError("X 和 y 必须同时给出")
+        self.model: LinearModel = model
+        self.X = X
+        self.y = y
+
+    @cached_property
+    def __x(self) -> np.ndarray:
+        """转换为 float64 的 X，只转换一次"""
+        if self.X is None:
+            raise ValueError("没有数据，无法计算标准误差和 p 值")
+        return _as_matrix(self.X)
+
+    @cached_property
+    def __y(self) -> np.ndarray:
+        """转换为 float64 的 y，只转换一次"""
+        if self.y is None:
+            raise ValueError("没有数据，无法计算预测值和残差")
+        return np.asarray(self.y, dtype=np.float64)
+
+    @cached_property
+    def __statistics(self) -> dict[str, np.ndarray]:
+        """模型的系数和残差对应的标准误差和 p 值"""
+        return _coef_statistics(
+            np.asarray(self.coef, dtype=np.float64).reshape(1, -1), _as_matrix(self.residuals), self.__x,
+            getattr(self.model, "fit_intercept", True),
+        )
+
+    @property
+    def variables(self) -> list[str]:
+        """自变量的名称，没有列名时为 x0, x1, ..."""
+        if isinstance(self.X, pd.DataFrame):
+            return list(self.X.columns)
+        names = getattr(self.model, "feature_names_in_", None)
+        if names is not None:
+            return list(names)
+        return [f"x{i}" for i in range(len(self.coef))]
+
+    @property
+    def coef(self) -> np.ndarray:
+        """回归系数"""
+        return np.asarray(self.model.coef_)
+
+    @property
+    def intercept(self) -> float:
+        """截距"""
+        return self.model.intercept_
+
+    @cached_property
+    def predictions(self) -> np.ndarray:
+        """X 上的预测值"""
+        return np.asarray(self.model.predict(self.X), dtype=np.float64).reshape(self.__y.shape)
+
+    @cached_property
+    def residuals(self) -> np.ndarray:
+        """残差 y - 预测值"""
+        return self.__y - self.predictions
+
+    @cached_property
+    def r2(self) -> float:
+        """决定系数 R 方，与 ``model.score`` 相同"""
+        if self.X is None:
+            return self.model.r2_
+        return float(_r2(_as_matrix(self.__y), _as_matrix(self.predictions)).mean())
+
+    @cached_property
+    def adjusted_r2(self) -> float:
+        """调整 R 方"""
+        if self.X is None:
+            return self.model.adjusted_r2_
+        shape = np.shape(self.X)
+        n, p = shape[0], int(np.prod(shape[1:]))
+        return 1 - (1 - self.r2) * (n - 1) / (n - p - 1)
+
+    @cached_property
+    def standard_errors(self) -> np.ndarray:
+        """回归系数（不包括截距）的标准误差"""
+        if self.X is None:
+            return self.model.standard_errors_
+        return self.__statistics["standard_errors"][0]
+
+    @cached_property
+    def p_values(self) -> np.ndarray:
+        """回归系数（不包括截距）的双侧 p 值，与 ``p_values`` 相同"""
+        if self.X is None:
+            return self.model.p_values_
+        return self.__statistics["p_values"][0]
+
+    def to_dict(self) -> dict[str, object]:
+        """导出为 dict，键为 ``variables``、``coef``、``intercept``、``r2``、``adjusted_r2``、
+        ``standard_errors`` 和 ``p_values``"""
+        return {
+            "variables": self.variables,
+            "coef": self.coef,
+            "intercept": self.intercept,
+            "r2": self.r2,
+            "adjusted_r2": self.adjusted_r2,
+            "standard_errors": self.standard_errors,
+            "p_values": self.p_values,
+        }
+
+    def to_frame(self) -> pd.DataFrame:
+        """导出为每个自变量一行的 DataFrame，列为 ``coef``、``standard_errors``、``p_values``，
+        截距和 R 方保存在 ``attrs`` 中"""
+        frame = pd.DataFrame(
+            {"coef": self.coef, "standard_errors": self.standard_errors, "p_values": self.p_values},
+            index=pd.Index(self.variables, name="variable"),
+        )
+        frame.attrs.update(intercept=self.intercept, r2=self.r2, adjusted_r2=self.adjusted_r2)
+        return frame
+
+    def __str__(self) -> str:
+        return "\n".join([
+            " ".join(["变量:", *map(str, self.variables)]),
+            " ".join(["回归系数:", *map(str, self.coef)]),
+            f"截距: {self.intercept}",
+            f"决定R方: {self.r2}",
+            f"调整R方: {self.adjusted_r2}",
+            " ".join(["P值:", *map(str, self.p_values)]),
+        ])
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(model={self.model!r}, r2={self.r2})"
+
+
+__all__ = [
+    "OLS",
+    "regression_statistics",
+    "RegressionReport",
+]
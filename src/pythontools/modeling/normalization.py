@@ -1,41 +1,228 @@
-from abc import ABC, abstractmethod
-from functools import cached_property
-from numbers import Real
-from typing import Self, Optional, Literal
+from __future__ import annotations
 
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
 from numbers import Real
-from typing import Self, Literal, Optional
+from typing import Self, Optional, Literal, Iterable, Callable
 
+import numpy as np
 import pandas as pd
+from numpy.typing import ArrayLike, DTypeLike
+from scipy import sparse, special
+
+from pythontools.modeling.base import WeightType
+from pythontools.modeling.chunked import DEFAULT_CHUNKSIZE, read_chunks, write_chunks
+from pythontools.modeling.sketch import KLLSketch
+from pythontools.modeling.statistics import (
+    ColumnStatistics, block_rows, iter_blocks, is_sparse_frame, sparse_column_indices
+)
+
+Data = pd.DataFrame | np.ndarray | sparse.sparray | sparse.spmatrix
+Backend = Literal["thread", "process"]
 
 
 class Normalizer(ABC):
     """
     Normalizer 抽象基类，拥有基本的数据
+
+    所有统计量来自同一次扫描得到的 ``ColumnStatistics``。每个 Normalizer 各自扫描自己的数据；
+    同一份数据上的多个 Normalizer 需要共享一次扫描时，显式传入 ``statistics``，
+    例如 ``MinMaxNormalizer(data, statistics=zscore.statistics)``。
+
+    数据可以是 DataFrame，也可以是二维 ndarray（按列的位置对应）。
+    ``np.memmap`` 或 ``.npy`` 文件路径会按块读取，适合比内存还大的数据。
+    scipy 稀疏矩阵（CSR/CSC）和全部为稀疏列的 DataFrame 只读取存储的元素，
+    变换时需要 ``scale_only=True`` 以保持稀疏
     """
 
     def __init__(
             self,
-            data: pd.DataFrame,
+            data: Optional[Data] = None,
             ddof: Literal[0, 1] = 0,
+            n_jobs: int = 1,
+            backend: Backend = "thread",
+            dtype: DTypeLike = np.float64,
+            scale_only: bool = False,
+            skipna: bool = True,
+            weights: Optional[ArrayLike] = None,
+            weight_type: WeightType = "frequency",
+            statistics: Optional[ColumnStatistics] = None,
+            include_zeros: bool = True,
     ) -> None:
         """
         Args:
-            data: 标准化的标准数据
+            data: 标准化的标准数据，为 None 时需要用 ``partial_fit`` 分块训练，
+                为文件路径时以只读内存映射打开 ``.npy`` 文件
             ddof: 自由度增量，默认 0
+            n_jobs: 变换时把列分成几组并行计算，-1 表示使用全部核心，默认 1 不并行
+            backend: 并行方式，"thread" 为线程池，"process" 为进程池（通过共享内存传递数据）
+            dtype: 变换结果的浮点类型，默认 float64。为 float32 时变换在 float32 下进行，
+                内存和带宽减半；统计量始终用 float64 累加，精度不受影响
+            scale_only: 只缩放不平移，即 :math:`x \\cdot scale`，0 仍然是 0，稀疏数据必须使用
+            skipna: 统计量是否跳过缺失值(NaN)，默认跳过，不需要先删除有缺失值的行。
+                为 False 时有缺失值的列统计量为 NaN。无论如何缺失值在变换后仍是缺失值
+            weights: data 每行的非负权重，统计量按权重计算，不需要把行重复展开
+            weight_type: 权重的含义，"frequency" 为频数权重，"reliability" 为可靠性权重，
+                影响 ``ddof`` 不为 0 时的标准差，见 ``ColumnStatistics.var``
+            statistics: data 的统计量，传入时不再扫描 data，用于在多个 Normalizer 之间共享一次扫描。
+                调用者需要保证它与 data 当前的值一致，原地修改 data 后不要再传入旧的统计量
+            include_zeros: 稀疏数据的统计量是否把未存储的 0 算作样本，默认是。
+                为 False 时只统计存储的（非零）元素，例如 ``scale_only`` 时按非零元素的最小值和最大值缩放。
+                稠密数据不受影响
         """
-        if not isinstance(data, pd.DataFrame):
-            raise NotImplementedError("暂不支持 data 不是 pandas DataFrame 的情形")
+        if data is not None:
+            data = self._open(data)
+            self._check_data(data)
+
+        if weights is not None and data is None:
+            raise ValueError("没有数据时不能传入 weights，需要在 partial_fit 中传入")
+        if weights is not None and statistics is not None:
+            raise ValueError("weights 和 statistics 不能同时传入")
 
         self.__data = data
+        self.__weights: Optional[np.ndarray] = None if weights is None else np.asarray(weights, dtype=np.float64)
         self.__ddof = ddof
+        self.__statistics: Optional[ColumnStatistics] = statistics
+        self.__affine_cache: Optional[tuple] = None
+        self.set_parallel(n_jobs, backend)
+
+        self.dtype: np.dtype = np.dtype(dtype)
+        if self.dtype.kind != "f":
+            raise TypeError(f"dtype 必须是浮点类型，得到的是 {self.dtype}")
+        self.scale_only: bool = scale_only
+        self.skipna: bool = skipna
+        self.include_zeros: bool = include_zeros
+        if weight_type not in ("frequency", "reliability"):
+            raise ValueError(f"无效的权重类型: {weight_type}")
+        self.weight_type: WeightType = weight_type
+
+    def set_parallel(self, n_jobs: int = 1, backend: Backend = "thread") -> Self:
+        """设置按列并行变换
+
+        每组列的计算与串行时完全相同，所以结果与串行一致
+
+        Args:
+            n_jobs (int): 列分成的组数，-1 表示使用全部核心
+            backend (Literal["thread", "process"]): 线程池或进程池
+
+        Returns:
+            Self: 返回实例本身，便于链式调用
+
+        Raises:
+            ValueError: 无效的 n_jobs 或 backend
+        """
+        if n_jobs == -1:
+            n_jobs = os.cpu_count() or 1
+        if n_jobs < 1:
+            raise ValueError(f"无效的 n_jobs: {n_jobs}")
+        if backend not in ("thread", "process"):
+            raise ValueError(f"无效的 backend: {backend}")
+        self.n_jobs: int = n_jobs
+        self.backend: Backend = backend
+        return self
+
+    @staticmethod
+    def _open(data: Data | str | os.PathLike) -> Data:
+        """路径以只读内存映射打开，其他数据原样返回"""
+        if isinstance(data, (str, os.PathLike)):
+            return np.load(data, mmap_mode="r")
+        return data
+
+    @staticmethod
+    def _check_data(data: Data) -> None:
+        """
+        Raises:
+            NotImplementedError: 不是 DataFrame、ndarray 或 scipy 稀疏矩阵
+            ValueError: ndarray 不是二维的
+        """
+        if sparse.issparse(data):
+            return
+        if not isinstance(data, (pd.DataFrame, np.ndarray)):
+            raise NotImplementedError("暂不支持 data 不是 pandas DataFrame、numpy ndarray 或 scipy 稀疏矩阵的情形")
+        if isinstance(data, np.ndarray) and data.ndim != 2:
+            raise ValueError(f"ndarray 必须是二维的，得到的是 {data.ndim} 维")
+
+    @property
+    def data(self) -> Optional[Data]:
+        """标准化的标准数据"""
+        return self.__data
+
+    @property
+    def statistics(self) -> ColumnStatistics:
+        """统计量，第一次访问时扫描数据
+
+        可以通过 ``statistics.passes`` 检查扫描数据的次数
+
+        Raises:
+            ValueError: 既没有数据也没有调用过 ``partial_fit``
+        """
+        if self.__statistics is None:
+            if self.__data is None:
+                raise ValueError("尚未训练，需要传入 data 或调用 partial_fit")
+            self.__statistics = ColumnStatistics.from_data(
+                self.__data, weights=self.__weights, include_zeros=self.include_zeros
+            )
+        return self.__statistics
+
+    def partial_fit(self, chunk: Data | str | os.PathLike, weights: Optional[ArrayLike] = None) -> Self:
+        """用一块数据增量训练
+
+        均值和方差按 Welford/Chan 的方法合并，最小值和最大值逐块取较小/较大者，
+        多次调用后的结果与在拼接后的数据上训练相同（在浮点误差内）。
+        不会修改与其他 Normalizer 共享的统计量
+
+        Args:
+            chunk (DataFrame | np.ndarray | str): 一块训练数据，列必须与之前的数据相同，可以是 ``.npy`` 文件路径
+            weights (Optional[ArrayLike]): 这块数据每行的权重
+
+        Returns:
+            Self: 返回实例本身，便于链式调用
+
+        Examples:
+            >>> normalizer = ZScoreNormalizer()
+            >>> for chunk in pd.read_csv("data.csv", chunksize=100_000):
+            ...     normalizer.partial_fit(chunk)
+        """
+        chunk = self._open(chunk)
+        self._check_data(chunk)
+
+        if self.__statistics is None and self.__data is None:
+            self.__statistics = ColumnStatistics.from_data(chunk, weights=weights, include_zeros=self.include_zeros)
+            return self
+
+        columns = self.statistics.columns
+        if isinstance(chunk, pd.DataFrame):
+            if not chunk.columns.equals(columns):
+                chunk = chunk.loc[:, columns]
+            statistics = ColumnStatistics.from_data(chunk, weights=weights, include_zeros=self.include_zeros)
+        else:
+            if chunk.shape[1] != len(columns):
+                raise ValueError(f"列数不同: 需要 {len(columns)} 列，得到 {chunk.shape[1]} 列")
+            statistics = ColumnStatistics.from_data(chunk, weights=weights, include_zeros=self.include_zeros)
+            statistics.columns = columns
+        self.__statistics = self.statistics.merge(statistics)
+        return self
+
+    def _resolve_data(self, data: Optional[Data]) -> Data:
+        """data 为 None 时使用训练数据
+
+        Raises:
+            ValueError: 没有训练数据
+        """
+        if data is not None:
+            return data
+        if self.__data is None:
+            raise ValueError("没有训练数据，需要传入 data")
+        return self.__data
 
     @property
     def ddof(self) -> Literal[0, 1]:
         """自由度增量"""
         return self.__ddof
 
-    def set_ddof(self, ddof:Literal[0, 1]):
+    def set_ddof(self, ddof: Literal[0, 1]):
         """设置自由度增量
 
         一般是 0 或 1
@@ -45,63 +232,391 @@ class Normalizer(ABC):
         """
         self.__ddof = ddof
 
-    @cached_property
+    def get_params(self) -> dict:
+        """创建 Normalizer 时的参数（不包括数据）"""
+        return {
+            "ddof": self.ddof, "dtype": self.dtype.name, "scale_only": self.scale_only, "skipna": self.skipna,
+            "weight_type": self.weight_type, "include_zeros": self.include_zeros,
+        }
+
+    def _statistic(self, name: Literal["max", "min", "std", "mean", "range"]) -> np.ndarray:
+        """按 ``ddof`` 和 ``skipna`` 取出统计量
+
+        Args:
+            name: 统计量的名称
+        """
+        statistics = self.statistics
+        values = statistics.std(self.ddof, self.weight_type) if name == "std" else getattr(statistics, name)
+        if not self.skipna:
+            values = np.where(statistics.missing > 0, np.nan, values)
+        return values
+
+    @property
     def max(self) -> pd.Series[Real]:
         """最大值"""
-        return self.__data.max()
+        return self.statistics.to_series(self._statistic("max"))
 
-    @cached_property
+    @property
     def min(self) -> pd.Series[Real]:
         """最小值"""
-        return self.__data.min()
+        return self.statistics.to_series(self._statistic("min"))
 
-    @cached_property
+    @property
     def std(self) -> pd.Series[Real]:
         """标准差"""
-        return self.__data.std(ddof=self.ddof)
+        return self.statistics.to_series(self._statistic("std"))
 
-    @cached_property
+    @property
     def mean(self) -> pd.Series[Real]:
         """算术平均数"""
-        return self.__data.mean()
+        return self.statistics.to_series(self._statistic("mean"))
 
-    @cached_property
+    @property
     def range(self) -> pd.Series[Real]:
         """极差"""
-        return self.max - self.min
+        return self.statistics.to_series(self._statistic("range"))
 
     @abstractmethod
-    def normalize(self, data: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    def normalize(
+            self,
+            data: Optional[Data | str | os.PathLike] = None,
+            out: Optional[np.ndarray | str | os.PathLike] = None,
+            inplace: bool = False,
+    ) -> Data:
         """
         标准化
 
         Args:
-            data (Optional[DataFrame]): 需要标准化的数据
+            data (Optional[DataFrame | np.ndarray]): 需要标准化的数据
+            out (Optional[np.ndarray | str]): data 是 ndarray 时，结果写入的数组，形状必须相同，
+                为路径时写入新建的 ``.npy`` 内存映射文件
+            inplace (bool): 直接修改 data 并返回它，不复制整个数据
         Returns:
-            返回数据标准化后的 DataFrame
+            返回数据标准化后的 DataFrame，data 是 ndarray 时返回 ndarray
         """
         raise NotImplementedError
 
-    def denormalize(self, data: pd.DataFrame) -> pd.DataFrame:
+    def denormalize(
+            self,
+            data: Data | str | os.PathLike,
+            out: Optional[np.ndarray | str | os.PathLike] = None,
+            inplace: bool = False,
+    ) -> Data:
         """
         反标准化
 
         可以不实现
 
         Args:
-            data (DataFrame): 标准化后的数据
+            data (DataFrame | np.ndarray): 标准化后的数据
+            out (Optional[np.ndarray | str]): data 是 ndarray 时，结果写入的数组，形状必须相同，
+                为路径时写入新建的 ``.npy`` 内存映射文件
+            inplace (bool): 直接修改 data 并返回它，不复制整个数据
 
         Returns:
-            反标准化后的 DataFrame
+            反标准化后的 DataFrame，data 是 ndarray 时返回 ndarray
 
         Raises:
             NotImplementedError: 没实现
         """
         raise NotImplementedError
 
-    def transform(self, data: pd.DataFrame) -> pd.DataFrame:
+    def _affine(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        r"""逐列的仿射变换参数 ``(center, scale, offset, inverse)``
+
+        标准化为 :math:`(x - center) \cdot scale + offset`，
+        反标准化为 :math:`(y - offset) \cdot inverse + center`
+
+        Raises:
+            NotImplementedError: 不是仿射变换
+        """
+        raise NotImplementedError
+
+    def _params(self, columns: Optional[pd.Index] = None) -> tuple[np.ndarray, ...]:
+        """按 columns 对齐的变换参数，统计量和 ``get_params`` 不变时复用上次的结果
+
+        Args:
+            columns (Optional[pd.Index]): 数据的列名，为 None 时按位置对应
+        """
+        statistics = self.statistics
+        key = tuple(self.get_params().items())
+        cache = self.__affine_cache
+        if cache is None or cache[0] is not statistics or cache[1] != key:
+            params = self._affine()
+            if self.scale_only:
+                center, scale, offset, inverse_scale = params
+                params = np.zeros_like(center), scale, np.zeros_like(offset), inverse_scale
+            params = self._cast_params(params)
+            cache = self.__affine_cache = (statistics, key, params)
+        params = cache[2]
+
+        if columns is None or columns.equals(statistics.columns):
+            return params
+        indexer = statistics.columns.get_indexer(columns)
+        missing = indexer < 0
+        return tuple(np.where(missing, np.nan, param[indexer]) for param in params)
+
+    @classmethod
+    def _take_params(cls, params: tuple, columns: slice) -> tuple:
+        """取出一组列的变换参数
+
+        Args:
+            params (tuple): ``_params`` 的结果
+            columns (slice): 列的范围
+        """
+        return tuple(param[columns] for param in params)
+
+    def _cast_params(self, params: tuple[np.ndarray, ...]) -> tuple[np.ndarray, ...]:
+        """把变换参数转换为 ``dtype``
+
+        center 保持 float64：数据与 center 相减时抵消最严重，
+        在 float32 下会损失精度，numpy 会用 float64 计算后再写回 float32
+        """
+        center, *rest = params
+        return (np.asarray(center, dtype=np.float64), *(np.asarray(param, dtype=self.dtype) for param in rest))
+
+    @classmethod
+    def _transform_block(
+            cls,
+            block: np.ndarray,
+            out: np.ndarray,
+            params: tuple[np.ndarray, ...],
+            inverse: bool,
+    ) -> None:
+        """变换一个数据块并写入 out，不分配新的数组
+
+        只能使用 params 中的数据，这样才能在其他进程中运行
+
+        Args:
+            block (np.ndarray): 数据块
+            out (np.ndarray): 输出，可以就是 block
+            params (tuple[np.ndarray, ...]): ``_params`` 的结果
+            inverse (bool): 是否为反标准化
+        """
+        center, scale, offset, inverse_scale = params
+        if inverse:
+            np.subtract(block, offset, out=out)
+            np.multiply(out, inverse_scale, out=out)
+            np.add(out, center, out=out)
+        else:
+            np.subtract(block, center, out=out)
+            np.multiply(out, scale, out=out)
+            np.add(out, offset, out=out)
+
+    def _transform(
+            self,
+            data: Optional[Data | str | os.PathLike],
+            out: Optional[np.ndarray | str | os.PathLike] = None,
+            inverse: bool = False,
+            inplace: bool = False,
+    ) -> Data:
+        """按行分块变换数据
+
+        Args:
+            data (Optional[DataFrame | np.ndarray | str]): 数据，为 None 时使用训练数据，为路径时内存映射打开
+            out (Optional[np.ndarray | str]): 结果写入的数组，只支持 ndarray 的数据，
+                为路径时创建一个 ``.npy`` 内存映射文件，按块写入
+            inverse (bool): 是否为反标准化
+            inplace (bool): 是否直接修改 data
+
+        Raises:
+            ValueError: out 的形状不对，或 DataFrame 传入了 out
+        """
+        data = self._open(self._resolve_data(data))
+        self._check_data(data)
+
+        if inplace and out is not None:
+            raise ValueError("inplace 与 out 不能同时使用")
+
+        if sparse.issparse(data) or is_sparse_frame(data):
+            if out is not None:
+                raise ValueError("稀疏数据不支持 out 参数")
+            return self.__transform_sparse(data, inverse, inplace)
+
+        if isinstance(data, pd.DataFrame):
+            if out is not None:
+                raise ValueError("DataFrame 不支持 out 参数")
+            if data.empty:
+                return data
+            params = self._params(data.columns)
+            if inplace:
+                self.__transform_frame_inplace(data, params, inverse)
+                return data
+            result = np.empty(data.shape, dtype=self.dtype)
+            self.__transform_blocks(data, result, params, inverse)
+            return pd.DataFrame(result, index=data.index, columns=data.columns)
+
+        if data.shape[1] != len(self.statistics.columns):
+            raise ValueError(f"列数不同: 需要 {len(self.statistics.columns)} 列，得到 {data.shape[1]} 列")
+        if inplace:
+            if data.dtype.kind != "f":
+                raise TypeError(f"原地修改需要浮点数组，得到的是 {data.dtype}")
+            out = data
+        elif out is None:
+            out = np.empty(data.shape, dtype=self.dtype)
+        elif isinstance(out, (str, os.PathLike)):
+            out = np.lib.format.open_memmap(out, mode="w+", dtype=self.dtype, shape=data.shape)
+        elif out.shape != data.shape:
+            raise ValueError(f"out 的形状应为 {data.shape}，得到的是 {out.shape}")
+        self.__transform_blocks(data, out, self._params(), inverse)
+        if isinstance(out, np.memmap):
+            out.flush()
+        return out
+
+    @classmethod
+    def _transform_blocks(cls, data: Data, out: np.ndarray, params: tuple, inverse: bool) -> None:
+        """按行分块变换，每块都足够小，可以常驻缓存
+
+        DataFrame 按输入的精度取出数据块，与 center 相减后才转换为 out 的类型
+        """
+        dtype = _read_dtype(data)
+        rows = block_rows(data.shape[1], dtype.itemsize)
+        if isinstance(data, pd.DataFrame):
+            blocks = iter_blocks(data, rows, dtype)
+        else:
+            blocks = (data[start:start + rows] for start in range(0, len(data), rows))
+        for start, block in zip(range(0, len(data), rows), blocks):
+            cls._transform_block(block, out[start:start + rows], params, inverse)
+
+    def __transform_blocks(self, data: Data, out: np.ndarray, params: tuple, inverse: bool) -> None:
+        """按 ``n_jobs`` 把列分组并行变换"""
+        n_jobs = min(self.n_jobs, data.shape[1])
+        if n_jobs <= 1:
+            self._transform_blocks(data, out, params, inverse)
+            return
+
+        groups = [
+            slice(int(indices[0]), int(indices[-1]) + 1)
+            for indices in np.array_split(np.arange(data.shape[1]), n_jobs)
+        ]
+        if self.backend == "process":
+            self.__transform_processes(data, out, params, inverse, groups)
+            return
+
+        def run(columns: slice) -> None:
+            part = data.iloc[:, columns] if isinstance(data, pd.DataFrame) else data[:, columns]
+            self._transform_blocks(part, out[:, columns], self._take_params(params, columns), inverse)
+
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            # list 使异常在这里抛出
+            list(executor.map(run, groups))
+
+    def __transform_processes(
+            self,
+            data: Data,
+            out: np.ndarray,
+            params: tuple,
+            inverse: bool,
+            groups: list[slice],
+    ) -> None:
+        """把数据复制到共享内存，在进程池中按列分组变换
+
+        源数据按输入的精度复制，与串行时一样在变换之后才转换为 out 的类型
+        """
+        shape, dtype, source_dtype = data.shape, out.dtype, _read_dtype(data)
+        count = max(int(np.prod(shape)), 1)
+        source = SharedMemory(create=True, size=count * source_dtype.itemsize)
+        target = SharedMemory(create=True, size=count * dtype.itemsize)
+        try:
+            shared = np.ndarray(shape, dtype=source_dtype, buffer=source.buf)
+            if isinstance(data, pd.DataFrame):
+                rows = block_rows(shape[1], source_dtype.itemsize)
+                for start, block in zip(range(0, shape[0], rows), iter_blocks(data, rows, source_dtype)):
+                    shared[start:start + rows] = block
+            else:
+                shared[...] = data
+            del shared
+
+            with ProcessPoolExecutor(max_workers=len(groups)) as executor:
+                list(executor.map(
+                    _transform_shared,
+                    *zip(*(
+                        (
+                            type(self), source.name, target.name, shape, source_dtype, dtype,
+                            columns, self._take_params(params, columns), inverse,
+                        )
+                        for columns in groups
+                    ))
+                ))
+
+            result = np.ndarray(shape, dtype=dtype, buffer=target.buf)
+            out[...] = result
+            del result
+        finally:
+            for memory in (source, target):
+                memory.close()
+                memory.unlink()
+
+    def __transform_sparse(self, data: Data, inverse: bool, inplace: bool) -> Data:
+        """只缩放稀疏数据中存储的元素，结构不变
+
+        Raises:
+            ValueError: 没有设置 ``scale_only``，或对稀疏 DataFrame 原地修改
+        """
+        if not self.scale_only:
+            raise ValueError("稀疏数据需要 scale_only=True，否则平移后会变成稠密数据")
+
+        frame = None
+        if isinstance(data, pd.DataFrame):
+            if inplace:
+                raise ValueError("稀疏 DataFrame 不支持原地修改")
+            frame, data = data, sparse.csr_array(data.sparse.to_coo())
+            params = self._params(frame.columns)
+        else:
+            if data.shape[1] != len(self.statistics.columns):
+                raise ValueError(f"列数不同: 需要 {len(self.statistics.columns)} 列，得到 {data.shape[1]} 列")
+            params = self._params()
+        scale = params[3] if inverse else params[1]
+
+        if inplace:
+            if data.format not in ("csr", "csc") or data.dtype.kind != "f":
+                raise TypeError("原地修改需要浮点的 CSR/CSC 矩阵")
+            result = data
+        else:
+            if data.format not in ("csr", "csc"):
+                data = data.tocsr()
+            result = data.astype(self.dtype)
+        np.multiply(result.data, scale[sparse_column_indices(result)], out=result.data)
+
+        if frame is not None:
+            return pd.DataFrame.sparse.from_spmatrix(result, index=frame.index, columns=frame.columns)
+        return result
+
+    def __transform_frame_inplace(self, data: pd.DataFrame, params: tuple, inverse: bool) -> None:
+        """原地变换 DataFrame
+
+        浮点列直接覆盖原来的内存；不能覆盖的列（整数列等）逐列替换，
+        峰值内存只多一列
+        """
+        values = data.to_numpy()
+        if (
+                values.dtype.kind == "f"
+                and values.flags.writeable
+                and np.shares_memory(values, data.iloc[:, 0].to_numpy())
+        ):
+            # 整个 DataFrame 是同一块浮点内存
+            self.__transform_blocks(values, values, params, inverse)
+            return
+
+        # 变换的内核都按二维的块 (行数, 列数) 处理，每列作为只有一列的块传入
+        for i in range(data.shape[1]):
+            column = data.iloc[:, i].to_numpy()
+            column_params = self._take_params(params, slice(i, i + 1))
+            if column.dtype.kind == "f" and column.flags.writeable:
+                self._transform_block(column[:, None], column[:, None], column_params, inverse)
+            else:
+                result = np.empty(len(column), dtype=self.dtype)
+                self._transform_block(column[:, None], result[:, None], column_params, inverse)
+                data.isetitem(i, result)
+
+    def transform(
+            self,
+            data: Data | str | os.PathLike,
+            out: Optional[np.ndarray | str | os.PathLike] = None,
+            inplace: bool = False,
+    ) -> Data:
         """``normalize`` 的别名"""
-        return self.normalize(data)
+        return self.normalize(data, out, inplace=inplace)
 
     @classmethod
     def fit_transform(cls, data: pd.DataFrame, *args, **kwargs) -> pd.DataFrame:
@@ -117,6 +632,212 @@ class Normalizer(ABC):
         """
         return cls(data, *args, **kwargs).normalize()
 
+    @classmethod
+    def fit_transform_file(
+            cls,
+            source: str | os.PathLike,
+            target: str | os.PathLike,
+            *args,
+            chunksize: int = DEFAULT_CHUNKSIZE,
+            **kwargs
+    ) -> Self:
+        """分块训练文件中的数据，再分块把标准化结果写入另一个文件
+
+        读两遍源文件，内存占用只与 ``chunksize`` 有关，与文件大小无关
+
+        Args:
+            source: 训练数据文件，支持 CSV 和 Parquet
+            target: 输出文件，支持 CSV 和 Parquet，已存在时会被覆盖
+            *args: 其他参数
+            chunksize (int): 每块的行数
+            **kwargs: 其他参数
+
+        Returns:
+            训练好的 Normalizer
+
+        Examples:
+            >>> ZScoreNormalizer.fit_transform_file("train.csv", "train_normalized.parquet")
+        """
+        normalizer = cls.fit_chunks(read_chunks(source, chunksize), *args, **kwargs)
+        normalizer.transform_file(source, target, chunksize=chunksize)
+        return normalizer
+
+    def transform_file(
+            self,
+            source: str | os.PathLike,
+            target: str | os.PathLike,
+            chunksize: int = DEFAULT_CHUNKSIZE,
+    ) -> None:
+        """分块标准化文件中的数据并写入另一个文件
+
+        Args:
+            source: 需要标准化的数据文件，支持 CSV 和 Parquet
+            target: 输出文件，支持 CSV 和 Parquet，已存在时会被覆盖
+            chunksize (int): 每块的行数
+        """
+        write_chunks(
+            (self.normalize(chunk) for chunk in read_chunks(source, chunksize)),
+            target
+        )
+
+    @classmethod
+    def from_statistics(cls, statistics: ColumnStatistics, *args, **kwargs) -> Self:
+        """用已有的统计量创建 Normalizer，不需要原始数据
+
+        Args:
+            statistics (ColumnStatistics): 统计量
+            *args: 其他参数
+            **kwargs: 其他参数
+
+        Returns:
+            Normalizer
+        """
+        normalizer = cls(None, *args, **kwargs)
+        normalizer.__statistics = statistics
+        return normalizer
+
+    def save(self, path: str | os.PathLike) -> None:
+        """保存训练好的统计量和参数，不保存数据
+
+        格式见 ``ColumnStatistics.save``
+
+        Args:
+            path: 文件路径
+
+        Examples:
+            >>> ZScoreNormalizer(data).save("zscore.stat")
+            >>> normalizer = Normalizer.load("zscore.stat")
+        """
+        self.statistics.save(path, {"class": type(self).__name__, "params": self.get_params()})
+
+    @classmethod
+    def load(cls, path: str | os.PathLike, mmap: bool = True) -> "Normalizer":
+        """读取 ``save`` 保存的 Normalizer，不需要原始数据
+
+        在 ``Normalizer`` 上调用时返回保存时的子类
+
+        Args:
+            path: 文件路径
+            mmap (bool): 是否以只读内存映射的方式读取统计量
+
+        Returns:
+            Normalizer
+
+        Raises:
+            TypeError: 文件中保存的不是 cls 或它的子类
+        """
+        metadata = ColumnStatistics.load_metadata(path)
+        name = metadata.get("class")
+        target = next((sub for sub in _subclasses(cls) if sub.__name__ == name), None)
+        if target is None:
+            raise TypeError(f"文件中保存的是 {name}，不是 {cls.__name__}")
+        statistics = ColumnStatistics.load(path, mmap=mmap)
+        return target.from_statistics(statistics, **metadata["params"])
+
+    @classmethod
+    def fit_parallel(
+            cls,
+            shards: Iterable,
+            *args,
+            reader: Optional[Callable[..., pd.DataFrame]] = None,
+            max_workers: Optional[int] = None,
+            **kwargs
+    ) -> Self:
+        """在进程池中分别训练每个分片，再合并为一个 Normalizer
+
+        Args:
+            shards (Iterable): 分片，见 ``ColumnStatistics.from_shards``
+            *args: 其他参数
+            reader (Optional[Callable]): 读取分片的函数，例如 ``pd.read_parquet``
+            max_workers (Optional[int]): 进程数，默认使用全部核心
+            **kwargs: 其他参数
+
+        Returns:
+            训练好的 Normalizer
+
+        Examples:
+            >>> ZScoreNormalizer.fit_parallel(glob.glob("data/*.parquet"), reader=pd.read_parquet)
+        """
+        statistics = ColumnStatistics.from_shards(
+            shards, reader=reader, max_workers=max_workers, include_zeros=kwargs.get("include_zeros", True)
+        )
+        return cls.from_statistics(statistics, *args, **kwargs)
+
+    @classmethod
+    def fit_chunks(cls, chunks: Iterable[pd.DataFrame], *args, **kwargs) -> Self:
+        """逐块训练，数据不需要同时放进内存
+
+        Args:
+            chunks (Iterable[DataFrame]): 训练数据块
+            *args: 其他参数
+            **kwargs: 其他参数
+
+        Returns:
+            训练好的 Normalizer
+        """
+        normalizer = cls(None, *args, **kwargs)
+        for chunk in chunks:
+            normalizer.partial_fit(chunk)
+        return normalizer
+
+
+def _subclasses(cls: type) -> list[type]:
+    """cls 及其所有子类"""
+    result = [cls]
+    for sub in cls.__subclasses__():
+        result.extend(_subclasses(sub))
+    return result
+
+
+def _check_dense(data: Data, name: str) -> None:
+    """
+    Raises:
+        NotImplementedError: 稀疏数据，或不是 DataFrame、ndarray
+        ValueError: ndarray 不是二维的
+    """
+    if sparse.issparse(data) or is_sparse_frame(data):
+        raise NotImplementedError(f"{name} 不支持稀疏数据")
+    Normalizer._check_data(data)
+
+
+def _fit_shard(cls: type[Normalizer], shard, reader: Optional[Callable], args: tuple, kwargs: dict) -> Normalizer:
+    """在 worker 中用一个分片训练 Normalizer"""
+    data = shard if reader is None else reader(shard)
+    return cls(None, *args, **kwargs).partial_fit(data)
+
+
+def _read_dtype(data: Data) -> np.dtype:
+    """读取数据块时使用的类型：浮点输入保持原来的精度，其他类型用 float64"""
+    if isinstance(data, pd.DataFrame):
+        dtype = np.result_type(*data.dtypes) if len(data.columns) else np.dtype(np.float64)
+    else:
+        dtype = data.dtype
+    return dtype if dtype.kind == "f" else np.dtype(np.float64)
+
+
+def _transform_shared(
+        cls: type[Normalizer],
+        source: str,
+        target: str,
+        shape: tuple[int, int],
+        source_dtype: np.dtype,
+        dtype: np.dtype,
+        columns: slice,
+        params: tuple[np.ndarray, ...],
+        inverse: bool,
+) -> None:
+    """在 worker 进程中变换共享内存里的一组列"""
+    source_memory = SharedMemory(name=source)
+    target_memory = SharedMemory(name=target)
+    try:
+        data = np.ndarray(shape, dtype=source_dtype, buffer=source_memory.buf)
+        out = np.ndarray(shape, dtype=dtype, buffer=target_memory.buf)
+        cls._transform_blocks(data[:, columns], out[:, columns], params, inverse)
+        del data, out
+    finally:
+        source_memory.close()
+        target_memory.close()
+
 
 class ZScoreNormalizer(Normalizer):
     """
@@ -136,7 +857,12 @@ class ZScoreNormalizer(Normalizer):
         3   1   1   1
     """
 
-    def normalize(self, data: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    def normalize(
+            self,
+            data: Optional[Data | str | os.PathLike] = None,
+            out: Optional[np.ndarray | str | os.PathLike] = None,
+            inplace: bool = False,
+    ) -> Data:
         r"""Z Score 标准化
 
         特殊情况:
@@ -148,48 +874,40 @@ class ZScoreNormalizer(Normalizer):
         .. math::
             result = \frac{data - mean}{std}
 
+        Args:
+            data (Optional[DataFrame | np.ndarray]): 需要标准化的数据
+            out (Optional[np.ndarray | str]): data 是 ndarray 时，结果写入的数组，为路径时写入 ``.npy`` 内存映射文件
+            inplace (bool): 直接修改 data 并返回它，不复制整个数据
+
         Returns:
-            Z Score 结果 DataFrame
+            Z Score 结果 DataFrame，data 是 ndarray 时返回 ndarray
         """
-        if data is None:
-            data = self.__data
+        return self._transform(data, out, inplace=inplace)
 
-        if not isinstance(data, pd.DataFrame):
-            raise NotImplementedError("暂不支持 data 不是 pandas DataFrame 的情形")
-        if data.empty:
-            return data
-
-        # 处理标准差为0的情况，避免除零错误
-        std = self.std
-        mean = self.mean
-        result = data.copy()
-
-        # 对于标准差为0的列，标准化结果设为0
-        zero_std_columns = std == 0
-        if zero_std_columns.any():
-            result.loc[:, zero_std_columns] = 0
-            # 对于标准差非0的列，正常进行Z-Score标准化
-            nonzero_std_columns = ~zero_std_columns
-            if nonzero_std_columns.any():
-                result.loc[:, nonzero_std_columns] = (
-                        (data.loc[:, nonzero_std_columns] - mean[nonzero_std_columns])
-                        / std[nonzero_std_columns]
-                )
-        else:
-            # 所有列都正常进行Z-Score标准化
-            result = (data - mean) / std
-
-        return result
-
-    def denormalize(self, data: pd.DataFrame) -> pd.DataFrame:
+    def denormalize(
+            self,
+            data: Data | str | os.PathLike,
+            out: Optional[np.ndarray | str | os.PathLike] = None,
+            inplace: bool = False,
+    ) -> Data:
         """
         Args:
-            data (DataFrame): 标准化后的数据
+            data (DataFrame | np.ndarray): 标准化后的数据
+            out (Optional[np.ndarray | str]): data 是 ndarray 时，结果写入的数组，为路径时写入 ``.npy`` 内存映射文件
+            inplace (bool): 直接修改 data 并返回它，不复制整个数据
 
         Returns:
             反标准化后的 DataFrame，常数列不能得到原数据
         """
-        return data * self.std + self.mean
+        return self._transform(data, out, inverse=True, inplace=inplace)
+
+    def _affine(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        mean = self._statistic("mean")
+        std = self._statistic("std")
+        # 对于标准差为0的列，标准化结果设为0
+        with np.errstate(divide="ignore"):
+            scale = np.where(std == 0, 0.0, 1 / std)
+        return mean, scale, np.zeros_like(mean), std
 
 
 ZScoreScaler = StandardScaler = ZScoreNormalizer
@@ -218,7 +936,7 @@ class MinMaxNormalizer(Normalizer):
 
     def __init__(
             self,
-            data: pd.DataFrame,
+            data: Optional[Data] = None,
             target_range: tuple[Real, Real] = (0, 1),
             *args, **kwargs
     ):
@@ -230,7 +948,7 @@ class MinMaxNormalizer(Normalizer):
             **kwargs: 传给 Normalizer 的参数
         """
         super().__init__(data, *args, **kwargs)
-        self.target: tuple[Real, Real] = target_range
+        self.target: tuple[Real, Real] = tuple(target_range)
         self.__check_target_range_valid()
 
     def __check_target_range_valid(self) -> None:
@@ -263,7 +981,15 @@ class MinMaxNormalizer(Normalizer):
         self.__check_target_range_valid()
         return self
 
-    def normalize(self, data: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    def get_params(self) -> dict:
+        return {**super().get_params(), "target_range": tuple(self.target)}
+
+    def normalize(
+            self,
+            data: Optional[Data | str | os.PathLike] = None,
+            out: Optional[np.ndarray | str | os.PathLike] = None,
+            inplace: bool = False,
+    ) -> Data:
         r"""
         归一化
 
@@ -272,49 +998,505 @@ class MinMaxNormalizer(Normalizer):
         .. math::
             result = (b-a) \cdot \frac{data - min}{range} + a
 
+        极差为 0 的列归一化为目标区间的中点
+
+        Args:
+            data (Optional[DataFrame | np.ndarray]): 需要归一化的数据
+            out (Optional[np.ndarray | str]): data 是 ndarray 时，结果写入的数组，为路径时写入 ``.npy`` 内存映射文件
+            inplace (bool): 直接修改 data 并返回它，不复制整个数据
+
         Returns:
-            归一化结果 DataFrame
+            归一化结果 DataFrame，data 是 ndarray 时返回 ndarray
         """
-        if data is None:
-            data = self.__data
-        a, b = self.target
+        return self._transform(data, out, inplace=inplace)
+
+    def denormalize(
+            self,
+            data: Data | str | os.PathLike,
+            out: Optional[np.ndarray | str | os.PathLike] = None,
+            inplace: bool = False,
+    ) -> Data:
+        """
+        Args:
+            data (DataFrame | np.ndarray): 标准化后的数据
+            out (Optional[np.ndarray | str]): data 是 ndarray 时，结果写入的数组，为路径时写入 ``.npy`` 内存映射文件
+            inplace (bool): 直接修改 data 并返回它，不复制整个数据
 
-        # 处理极差为0的情况，避免除零错误
-        range_val = self.range
-        min_val = self.min
-        result = data.copy()
+        Returns:
+            反标准化后的 DataFrame，常数列不能得到原数据
+        """
+        return self._transform(data, out, inverse=True, inplace=inplace)
 
+    def _affine(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        a, b = self.target
+        min_val = self._statistic("min")
+        range_val = self._statistic("range")
         # 对于极差为0的列，归一化结果设为目标区间的中点
-        zero_range_columns = range_val == 0
-        if zero_range_columns.any():
-            midpoint = (a + b) / 2
-            result.loc[:, zero_range_columns] = midpoint
-            # 对于极差非0的列，正常进行MinMax标准化
-            nonzero_range_columns = ~zero_range_columns
-            if nonzero_range_columns.any():
-                result.loc[:, nonzero_range_columns] = (
-                        (b - a) * (data.loc[:, nonzero_range_columns] - min_val[nonzero_range_columns])
-                        / range_val[nonzero_range_columns] + a
-                )
+        zero_range = range_val == 0
+        with np.errstate(divide="ignore"):
+            scale = np.where(zero_range, 0.0, (b - a) / range_val)
+        offset = np.where(zero_range, (a + b) / 2, a)
+        return min_val, scale, offset, range_val / (b - a)
+
+
+MinMaxScaler = MinMaxNormalizer
+
+
+class QuantileNormalizer(Normalizer):
+    """把数据映射为经验分位数，适合重尾的特征
+
+    训练时对参考数据逐列排序一次，取 ``n_quantiles`` 个等距分位点作为参考值。
+    变换时对每个值在参考值中二分查找再线性插值，一批 n 个值的代价为 O(n log m)，
+    m 为分位点个数。参考数据很大时可以用 ``subsample`` 随机抽取部分行，限制排序需要的内存
+
+    Attributes:
+        n_quantiles (int): 分位点个数
+        output_distribution (Literal["uniform", "normal"]): 输出的分布
+        subsample (Optional[int]): 排序前最多抽取的行数
+        random_state: 抽样的随机种子
+
+    Example:
+        >>> data = pd.DataFrame({"A": [1, 2, 3, 100]})
+        >>> QuantileNormalizer(data).normalize()
+                  A
+        0  0.000000
+        1  0.333333
+        2  0.666667
+        3  1.000000
+    """
+
+    BOUNDS: float = 1e-7
+    """输出为正态分布时，分位数被截断到 [BOUNDS, 1 - BOUNDS]，避免得到无穷大"""
+
+    def __init__(
+            self,
+            data: Optional[Data] = None,
+            n_quantiles: int = 1000,
+            output_distribution: Literal["uniform", "normal"] = "uniform",
+            subsample: Optional[int] = None,
+            random_state: Optional[int | np.random.Generator] = None,
+            *args, **kwargs
+    ):
+        """
+        Args:
+            data: 参考数据，不支持稀疏矩阵
+            n_quantiles (int): 分位点个数，超过参考数据的行数时取行数
+            output_distribution: "uniform" 输出 [0, 1] 上的均匀分布，"normal" 输出标准正态分布
+            subsample (Optional[int]): 参考数据超过这么多行时随机抽取这么多行，为 None 时使用全部数据
+            random_state: 抽样的随机种子
+            *args: 传给 Normalizer 的参数
+            **kwargs: 传给 Normalizer 的参数
+
+        Raises:
+            ValueError: 参数无效
+        """
+        if n_quantiles < 2:
+            raise ValueError(f"n_quantiles 至少为 2，得到的是 {n_quantiles}")
+        if output_distribution not in ("uniform", "normal"):
+            raise ValueError(f"无效的输出分布: {output_distribution}")
+        if subsample is not None and subsample < 2:
+            raise ValueError(f"subsample 至少为 2，得到的是 {subsample}")
+        if kwargs.get("weights") is not None:
+            raise NotImplementedError("QuantileNormalizer 暂不支持权重")
+        super().__init__(data, *args, **kwargs)
+        self.n_quantiles: int = n_quantiles
+        self.output_distribution: Literal["uniform", "normal"] = output_distribution
+        self.subsample: Optional[int] = subsample
+        self.random_state = random_state
+        self.__cache: Optional[tuple] = None
+
+    @staticmethod
+    def _check_data(data: Data) -> None:
+        _check_dense(data, "QuantileNormalizer")
+
+    def get_params(self) -> dict:
+        return {
+            **super().get_params(),
+            "n_quantiles": self.n_quantiles,
+            "output_distribution": self.output_distribution,
+            "subsample": self.subsample,
+            "random_state": self.random_state,
+        }
+
+    def partial_fit(self, chunk: Data | str | os.PathLike, weights: Optional[ArrayLike] = None) -> Self:
+        """
+        Raises:
+            NotImplementedError: 分位数需要对全部参考数据排序，不能增量训练
+        """
+        raise NotImplementedError("QuantileNormalizer 需要完整的参考数据，不支持增量训练")
+
+    def save(self, path: str | os.PathLike) -> None:
+        """
+        Raises:
+            NotImplementedError: 统计量文件中不包括参考分位数
+        """
+        raise NotImplementedError("QuantileNormalizer 暂不支持保存")
+
+    def __sample(self) -> np.ndarray:
+        """需要排序的参考数据，超过 ``subsample`` 行时不放回地随机抽取"""
+        data = self._resolve_data(None)
+        rows = None
+        if self.subsample is not None and len(data) > self.subsample:
+            rng = np.random.default_rng(self.random_state)
+            rows = np.sort(rng.choice(len(data), self.subsample, replace=False))
+        if isinstance(data, pd.DataFrame):
+            data = data if rows is None else data.iloc[rows]
+            return data.to_numpy(dtype=np.float64)
+        return np.array(data if rows is None else data[rows], dtype=np.float64)
+
+    def __fit(self) -> tuple[np.ndarray, np.ndarray]:
+        """逐列排序参考数据，返回 ``(references, levels)``
+
+        references 的形状为 (分位点个数, 列数)，全部缺失的列为 NaN
+        """
+        values = np.sort(self.__sample(), axis=0)  # NaN 排在最后
+        counts = np.count_nonzero(~np.isnan(values), axis=0)
+        levels = np.linspace(0, 1, max(min(self.n_quantiles, len(values)), 2))
+
+        # 每列按自己的有效个数插值，位置 levels * (count - 1)
+        positions = levels[:, None] * np.maximum(counts - 1, 0)
+        lower = np.floor(positions).astype(np.intp)
+        upper = np.minimum(lower + 1, np.maximum(counts - 1, 0))
+        fraction = positions - lower
+        low = np.take_along_axis(values, lower, axis=0)
+        high = np.take_along_axis(values, upper, axis=0)
+        references = low + fraction * (high - low)
+
+        invalid = counts == 0
+        if not self.skipna:
+            invalid |= counts < len(values)
+        references[:, invalid] = np.nan
+        return references, levels
+
+    @property
+    def references(self) -> pd.DataFrame:
+        """参考分位数，行为分位点的水平，列与训练数据相同"""
+        references, levels = self._params()[:2]
+        return pd.DataFrame(references, index=pd.Index(levels, name="quantile"), columns=self.statistics.columns)
+
+    def _params(self, columns: Optional[pd.Index] = None) -> tuple:
+        """按 columns 对齐的 ``(references, levels, normal)``，参数不变时复用上次排序的结果
+
+        Args:
+            columns (Optional[pd.Index]): 数据的列名，为 None 时按位置对应
+        """
+        key = tuple(self.get_params().items())
+        if self.__cache is None or self.__cache[0] != key:
+            self.__cache = (key, *self.__fit())
+        references, levels = self.__cache[1:]
+        normal = self.output_distribution == "normal"
+
+        known = self.statistics.columns
+        if columns is not None and not columns.equals(known):
+            indexer = known.get_indexer(columns)
+            references = np.where(indexer < 0, np.nan, references[:, indexer])
+        return references, levels, normal
+
+    @classmethod
+    def _take_params(cls, params: tuple, columns: slice) -> tuple:
+        references, levels, normal = params
+        return references[:, columns], levels, normal
+
+    @classmethod
+    def _transform_block(
+            cls,
+            block: np.ndarray,
+            out: np.ndarray,
+            params: tuple,
+            inverse: bool,
+    ) -> None:
+        references, levels, normal = params
+        for j in range(block.shape[1]):
+            reference = references[:, j]
+            if np.isnan(reference[0]):
+                out[:, j] = np.nan
+                continue
+            x = block[:, j]
+            if inverse:
+                if normal:
+                    x = special.ndtr(x)
+                out[:, j] = np.interp(x, levels, reference)
+                continue
+            # 正反两个方向插值再平均，参考值中有重复时取重复区间的中点
+            q = 0.5 * (
+                    np.interp(x, reference, levels)
+                    - np.interp(-x, -reference[::-1], -levels[::-1])
+            )
+            if normal:
+                q = special.ndtri(np.clip(q, cls.BOUNDS, 1 - cls.BOUNDS))
+            out[:, j] = q
+
+    def normalize(
+            self,
+            data: Optional[Data | str | os.PathLike] = None,
+            out: Optional[np.ndarray | str | os.PathLike] = None,
+            inplace: bool = False,
+    ) -> Data:
+        """
+        映射为经验分位数
+
+        超出参考数据范围的值被截断为 0 或 1（正态分布时为对应的截断值），
+        与参考数据相同的重复值映射为重复区间的中点，常数列映射为 0.5
+
+        Args:
+            data (Optional[DataFrame | np.ndarray]): 需要标准化的数据
+            out (Optional[np.ndarray | str]): data 是 ndarray 时，结果写入的数组，为路径时写入 ``.npy`` 内存映射文件
+            inplace (bool): 直接修改 data 并返回它，不复制整个数据
+
+        Returns:
+            分位数 DataFrame，data 是 ndarray 时返回 ndarray
+        """
+        return self._transform(data, out, inplace=inplace)
+
+    def denormalize(
+            self,
+            data: Data | str | os.PathLike,
+            out: Optional[np.ndarray | str | os.PathLike] = None,
+            inplace: bool = False,
+    ) -> Data:
+        """
+        Args:
+            data (DataFrame | np.ndarray): 分位数
+            out (Optional[np.ndarray | str]): data 是 ndarray 时，结果写入的数组，为路径时写入 ``.npy`` 内存映射文件
+            inplace (bool): 直接修改 data 并返回它，不复制整个数据
+
+        Returns:
+            参考分位数之间线性插值得到的原始值，分位点较少时是近似值
+        """
+        return self._transform(data, out, inverse=True, inplace=inplace)
+
+
+QuantileScaler = QuantileNormalizer
+
+
+class RobustNormalizer(Normalizer):
+    r"""用中位数和四分位距 (IQR) 标准化，不受离群值影响
+
+    .. math::
+        result = \frac{data - median}{q_{75} - q_{25}}
+
+    分位数来自每列一个 ``KLLSketch``，内存与数据量无关，
+    可以用 ``partial_fit`` 分块训练，也可以在多个 worker 中分别训练后用 ``merge`` 合并。
+    分位数是近似值，真实秩与目标秩之差不超过 ``rank_error``
+
+    Attributes:
+        quantile_range (tuple[float, float]): 计算尺度的分位点（百分数）
+        k (int): 草图的精度参数
+
+    Example:
+        >>> normalizer = RobustNormalizer()
+        >>> for chunk in pd.read_csv("telemetry.csv", chunksize=100_000):
+        ...     normalizer.partial_fit(chunk)
+        >>> normalizer.normalize(chunk)
+    """
+
+    def __init__(
+            self,
+            data: Optional[Data] = None,
+            quantile_range: tuple[float, float] = (25.0, 75.0),
+            k: int = 200,
+            random_state: Optional[int] = None,
+            *args, **kwargs
+    ):
+        """
+        Args:
+            data: 数据，不支持稀疏矩阵
+            quantile_range (tuple[float, float]): 计算尺度的两个分位点（百分数），默认为四分位距
+            k (int): 草图的精度参数，越大越精确，见 ``KLLSketch``
+            random_state (Optional[int]): 草图压缩的随机种子
+            *args: 传给 Normalizer 的参数
+            **kwargs: 传给 Normalizer 的参数
+
+        Raises:
+            ValueError: 无效的分位点
+        """
+        low, high = quantile_range
+        if not 0 <= low < high <= 100:
+            raise ValueError(f"无效的分位点: {list(quantile_range)}")
+        if kwargs.get("weights") is not None:
+            raise NotImplementedError("RobustNormalizer 暂不支持权重")
+        super().__init__(data, *args, **kwargs)
+        self.quantile_range: tuple[float, float] = (float(low), float(high))
+        self.k: int = k
+        self.random_state: Optional[int] = random_state
+        self.__sketches: Optional[list[KLLSketch]] = None
+
+    @staticmethod
+    def _check_data(data: Data) -> None:
+        _check_dense(data, "RobustNormalizer")
+
+    def get_params(self) -> dict:
+        return {
+            **super().get_params(),
+            "quantile_range": self.quantile_range,
+            "k": self.k,
+            "random_state": self.random_state,
+        }
+
+    def __new_sketches(self, n: int) -> list[KLLSketch]:
+        rng = np.random.default_rng(self.random_state)
+        return [KLLSketch(self.k, rng) for _ in range(n)]
+
+    @staticmethod
+    def __update(sketches: list[KLLSketch], data: pd.DataFrame | np.ndarray) -> None:
+        for block in iter_blocks(data):
+            for j, sketch in enumerate(sketches):
+                sketch.update(block[:, j])
+
+    @property
+    def sketches(self) -> list[KLLSketch]:
+        """每列的分位数草图，第一次访问时按块扫描数据
+
+        Raises:
+            ValueError: 既没有数据也没有调用过 ``partial_fit``
+        """
+        if self.__sketches is None:
+            if self.data is None:
+                raise ValueError("尚未训练，需要传入 data 或调用 partial_fit")
+            sketches = self.__new_sketches(self.data.shape[1])
+            self.__update(sketches, self.data)
+            self.__sketches = sketches
+        return self.__sketches
+
+    def partial_fit(self, chunk: Data | str | os.PathLike, weights: Optional[ArrayLike] = None) -> Self:
+        if weights is not None:
+            raise NotImplementedError("RobustNormalizer 暂不支持权重")
+        chunk = self._open(chunk)
+        if self.__sketches is None and self.data is None:
+            self._check_data(chunk)
+            self.__sketches = self.__new_sketches(chunk.shape[1])
+        sketches = self.sketches
+        super().partial_fit(chunk)
+        if isinstance(chunk, pd.DataFrame) and not chunk.columns.equals(self.statistics.columns):
+            chunk = chunk.loc[:, self.statistics.columns]
+        self.__update(sketches, chunk)
+        return self
+
+    def merge(self, other: "RobustNormalizer") -> Self:
+        """合并另一个 RobustNormalizer 的统计量和草图，返回新的实例
+
+        Args:
+            other (RobustNormalizer): 在另一部分数据上训练的实例，列必须相同
+
+        Returns:
+            Self: 合并后的 Normalizer，参数与 self 相同
+        """
+        normalizer = self.from_statistics(self.statistics.merge(other.statistics), **self.get_params())
+        normalizer.__sketches = [a.merge(b) for a, b in zip(self.sketches, other.sketches)]
+        return normalizer
+
+    @classmethod
+    def fit_parallel(
+            cls,
+            shards: Iterable,
+            *args,
+            reader: Optional[Callable[..., pd.DataFrame]] = None,
+            max_workers: Optional[int] = None,
+            **kwargs
+    ) -> Self:
+        """在进程池中分别训练每个分片，再两两合并统计量和草图
+
+        参数见 ``Normalizer.fit_parallel``
+        """
+        if max_workers == 1:
+            parts = [_fit_shard(cls, shard, reader, args, kwargs) for shard in shards]
         else:
-            # 所有列都正常进行MinMax标准化
-            result = (b - a) * (data - min_val) / range_val + a
+            shards = list(shards)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                parts = list(executor.map(
+                    _fit_shard, [cls] * len(shards), shards, [reader] * len(shards),
+                    [args] * len(shards), [kwargs] * len(shards),
+                ))
+        if not parts:
+            raise ValueError("没有可合并的分片")
+        while len(parts) > 1:
+            merged = [a.merge(b) for a, b in zip(parts[::2], parts[1::2])]
+            if len(parts) % 2:
+                merged.append(parts[-1])
+            parts = merged
+        return parts[0]
+
+    def save(self, path: str | os.PathLike) -> None:
+        """
+        Raises:
+            NotImplementedError: 统计量文件中不包括草图
+        """
+        raise NotImplementedError("RobustNormalizer 暂不支持保存")
 
-        return result
+    def quantile(self, q: float) -> pd.Series[Real]:
+        """每列的近似分位数
+
+        Args:
+            q (float): [0, 1] 之间的分位点
+        """
+        values = np.array([sketch.quantile(q) for sketch in self.sketches])
+        if not self.skipna:
+            values = np.where(self.statistics.missing > 0, np.nan, values)
+        return self.statistics.to_series(values)
+
+    @property
+    def median(self) -> pd.Series[Real]:
+        """近似中位数"""
+        return self.quantile(0.5)
+
+    @property
+    def iqr(self) -> pd.Series[Real]:
+        """``quantile_range`` 两个分位点之差，默认为近似四分位距"""
+        low, high = self.quantile_range
+        return self.quantile(high / 100) - self.quantile(low / 100)
 
-    def denormalize(self, data: pd.DataFrame) -> pd.DataFrame:
+    @property
+    def rank_error(self) -> pd.Series[Real]:
+        """每列分位数的归一化秩误差上界，见 ``KLLSketch.rank_error``"""
+        return self.statistics.to_series(np.array([sketch.rank_error for sketch in self.sketches]))
+
+    def normalize(
+            self,
+            data: Optional[Data | str | os.PathLike] = None,
+            out: Optional[np.ndarray | str | os.PathLike] = None,
+            inplace: bool = False,
+    ) -> Data:
         """
+        用中位数和四分位距标准化
+
+        四分位距为 0 的列标准化为 0
+
         Args:
-            data (DataFrame): 标准化后的数据
+            data (Optional[DataFrame | np.ndarray]): 需要标准化的数据
+            out (Optional[np.ndarray | str]): data 是 ndarray 时，结果写入的数组，为路径时写入 ``.npy`` 内存映射文件
+            inplace (bool): 直接修改 data 并返回它，不复制整个数据
 
         Returns:
-            反标准化后的 DataFrame，常数列不能得到原数据
+            标准化结果 DataFrame，data 是 ndarray 时返回 ndarray
         """
-        a, b = self.target
-        return (data - a) * self.range / (b - a) + self.min
+        return self._transform(data, out, inplace=inplace)
 
+    def denormalize(
+            self,
+            data: Data | str | os.PathLike,
+            out: Optional[np.ndarray | str | os.PathLike] = None,
+            inplace: bool = False,
+    ) -> Data:
+        """
+        Args:
+            data (DataFrame | np.ndarray): 标准化后的数据
+            out (Optional[np.ndarray | str]): data 是 ndarray 时，结果写入的数组，为路径时写入 ``.npy`` 内存映射文件
+            inplace (bool): 直接修改 data 并返回它，不复制整个数据
 
-MinMaxScaler = MinMaxNormalizer
+        Returns:
+            反标准化后的 DataFrame，四分位距为 0 的列不能得到原数据
+        """
+        return self._transform(data, out, inverse=True, inplace=inplace)
+
+    def _affine(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        median = self.median.to_numpy()
+        iqr = self.iqr.to_numpy()
+        with np.errstate(divide="ignore"):
+            scale = np.where(iqr == 0, 0.0, 1 / iqr)
+        return median, scale, np.zeros_like(median), iqr
+
+
+RobustScaler = RobustNormalizer
 
 __all__ = [
     # Base class
@@ -325,4 +1507,10 @@ __all__ = [
 
     # Min-Max normalizers (all are the same)
     "MinMaxNormalizer", "MinMaxScaler",
+
+    # Quantile normalizers (all are the same)
+    "QuantileNormalizer", "QuantileScaler",
+
+    # Robust normalizers (all are the same)
+    "RobustNormalizer", "RobustScaler",
 ]
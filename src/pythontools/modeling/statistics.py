@@ -0,0 +1,555 @@
+from __future__ import annotations
+
+import json
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from typing import Self, Optional, Iterable, Callable, Any
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from pythontools.modeling.base import WeightType
+
+MAGIC: bytes = b"PTSTAT\x00\x01"
+"""统计量文件的文件头，最后一个字节是格式版本"""
+
+BLOCK_BYTES: int = 8 * 1024 * 1024
+"""一次扫描中每个数据块的大致字节数，块足够小时可以常驻缓存"""
+
+
+def block_rows(n_columns: int, itemsize: int = 8) -> int:
+    """按 ``BLOCK_BYTES`` 计算每块的行数
+
+    Args:
+        n_columns (int): 列数
+        itemsize (int): 每个元素的字节数
+
+    Returns:
+        int: 每块的行数，至少为 1
+    """
+    return max(1, BLOCK_BYTES // (max(n_columns, 1) * itemsize))
+
+
+def iter_blocks(
+        data: pd.DataFrame | np.ndarray,
+        rows: Optional[int] = None,
+        dtype: np.dtype = np.float64,
+):
+    """按行把数据切成 float64 的 ndarray 块
+
+    类型已经是 dtype 的 ndarray 切出来的是视图，不会复制
+
+    Args:
+        data (DataFrame | np.ndarray): 二维数据
+        rows (Optional[int]): 每块的行数，默认由 ``block_rows`` 决定
+        dtype (np.dtype): 数据块的类型，默认 float64
+
+    Yields:
+        np.ndarray: 形状为 (rows, 列数) 的数据块
+    """
+    if rows is None:
+        rows = block_rows(data.shape[1])
+    for start in range(0, len(data), rows):
+        if isinstance(data, pd.DataFrame):
+            yield data.iloc[start:start + rows].to_numpy(dtype=dtype)
+        else:
+            yield np.asarray(data[start:start + rows], dtype=dtype)
+
+
+def is_sparse_frame(data) -> bool:
+    """是否为所有列都是 pandas 稀疏类型的 DataFrame"""
+    return (
+            isinstance(data, pd.DataFrame)
+            and data.shape[1] > 0
+            and all(isinstance(dtype, pd.SparseDtype) for dtype in data.dtypes)
+    )
+
+
+def sparse_column_indices(matrix) -> np.ndarray:
+    """CSR/CSC 矩阵中每个存储的元素所在的列
+
+    Args:
+        matrix: CSR 或 CSC 格式的 scipy 稀疏矩阵
+
+    Returns:
+        np.ndarray: 与 ``matrix.data`` 等长的列下标
+    """
+    if matrix.format == "csr":
+        return matrix.indices
+    if matrix.format == "csc":
+        return np.repeat(np.arange(matrix.shape[1]), np.diff(matrix.indptr))
+    raise ValueError(f"只支持 CSR 和 CSC 格式，得到的是 {matrix.format}")
+
+
+class ColumnStatistics:
+    """
+    按列的统计量：样本数、均值、离差平方和(M2)、最小值、最大值、缺失值个数
+
+    所有统计量都在同一次扫描中得到，缺失值(NaN)会被跳过并单独计数。
+    两份统计量可以用 ``merge`` 合并，结果与在合并后的数据上计算相同。
+    有行权重时 count 是权重之和，均值和 M2 都是加权的
+
+    Attributes:
+        count (np.ndarray): 每列的有效样本数，有权重时为有效样本的权重之和
+        weight2 (np.ndarray): 每列有效样本的权重平方和，没有权重时等于 count
+        mean (np.ndarray): 每列的均值
+        m2 (np.ndarray): 每列的离差平方和 :math:`\\sum w_i (x_i - \\bar{x})^2`
+        min (np.ndarray): 每列的最小值
+        max (np.ndarray): 每列的最大值
+        missing (np.ndarray): 每列缺失值(NaN)的个数
+        columns (pd.Index): 列名
+        passes (int): 得到这份统计量一共扫描了多少次数据
+    """
+
+    FIELDS: tuple[str, ...] = ("count", "mean", "m2", "min", "max", "missing", "weight2")
+    """保存到文件的字段"""
+
+    def __init__(
+            self,
+            count: np.ndarray,
+            mean: np.ndarray,
+            m2: np.ndarray,
+            min: np.ndarray,
+            max: np.ndarray,
+            columns: Optional[pd.Index] = None,
+            passes: int = 0,
+            missing: Optional[np.ndarray] = None,
+            weight2: Optional[np.ndarray] = None,
+    ) -> None:
+        self.count = np.asarray(count, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.m2 = np.asarray(m2, dtype=np.float64)
+        self.min = np.asarray(min, dtype=np.float64)
+        self.max = np.asarray(max, dtype=np.float64)
+        self.missing = np.zeros_like(self.count) if missing is None else np.asarray(missing, dtype=np.float64)
+        self.weight2 = self.count if weight2 is None else np.asarray(weight2, dtype=np.float64)
+        self.columns = pd.RangeIndex(self.mean.shape[-1]) if columns is None else pd.Index(columns)
+        self.passes = passes
+
+    @classmethod
+    def empty(cls, columns: pd.Index) -> Self:
+        """没有任何样本的统计量
+
+        Args:
+            columns (pd.Index): 列名
+        """
+        p = len(columns)
+        return cls(
+            count=np.zeros(p),
+            mean=np.full(p, np.nan),
+            m2=np.zeros(p),
+            min=np.full(p, np.nan),
+            max=np.full(p, np.nan),
+            columns=columns,
+        )
+
+    @classmethod
+    def from_block(
+            cls,
+            block: np.ndarray,
+            columns: Optional[pd.Index] = None,
+            weights: Optional[np.ndarray] = None,
+    ) -> Self:
+        """计算一个 ndarray 块的统计量
+
+        Args:
+            block (np.ndarray): 二维数据块
+            columns (Optional[pd.Index]): 列名
+            weights (Optional[np.ndarray]): 每行的权重
+        """
+        n, p = block.shape
+        if n == 0:
+            return cls.empty(pd.RangeIndex(p) if columns is None else columns)
+        if weights is not None:
+            return cls.__from_weighted_block(block, columns, weights)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            nan = np.isnan(block)
+            missing = np.count_nonzero(nan, axis=0)
+            if missing.any():
+                # 用掩码一次处理所有列，缺失值的位置填 0 后不影响求和
+                count = n - missing.astype(np.float64)
+                filled = np.where(nan, 0, block)
+                mean = filled.sum(axis=0) / count
+                filled -= mean
+                filled[nan] = 0
+                m2 = np.einsum("ij,ij->j", filled, filled)
+                min_ = np.fmin.reduce(block, axis=0)
+                max_ = np.fmax.reduce(block, axis=0)
+            else:
+                count = np.full(p, n, dtype=np.float64)
+                mean = block.mean(axis=0)
+                centered = block - mean
+                m2 = np.einsum("ij,ij->j", centered, centered)
+                min_ = block.min(axis=0)
+                max_ = block.max(axis=0)
+
+        return cls(count, mean, m2, min_, max_, columns=columns, passes=1, missing=missing)
+
+    @classmethod
+    def __from_weighted_block(cls, block: np.ndarray, columns: Optional[pd.Index], weights: np.ndarray) -> Self:
+        """加权的 ``from_block``，权重为 0 的行不计入最小值和最大值"""
+        nan = np.isnan(block)
+        # 缺失值的权重为 0，填 0 后不影响求和
+        w = np.where(nan, 0.0, weights[:, None])
+        filled = np.where(nan, 0.0, block)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            count = w.sum(axis=0)
+            mean = np.einsum("ij,ij->j", w, filled) / count
+            filled -= mean
+            m2 = np.einsum("ij,ij,ij->j", w, filled, filled)
+            m2[count == 0] = 0
+            masked = np.where(w > 0, block, np.nan)
+            min_ = np.fmin.reduce(masked, axis=0)
+            max_ = np.fmax.reduce(masked, axis=0)
+        return cls(
+            count, mean, m2, min_, max_, columns=columns, passes=1,
+            missing=np.count_nonzero(nan, axis=0), weight2=np.einsum("ij,ij->j", w, w),
+        )
+
+    @classmethod
+    def from_data(
+            cls,
+            data: pd.DataFrame | np.ndarray,
+            rows: Optional[int] = None,
+            weights: Optional[np.ndarray] = None,
+            include_zeros: bool = True,
+    ) -> Self:
+        """一次扫描计算所有统计量
+
+        数据按行分块，每块计算后立即合并，整个过程只读一遍数据
+
+        Args:
+            data (DataFrame | np.ndarray): 二维数据，ndarray 的列名为 0, 1, 2, ...；
+                也可以是 scipy 稀疏矩阵或全部为稀疏列的 DataFrame，见 ``from_sparse``
+            rows (Optional[int]): 每块的行数
+            weights (Optional[np.ndarray]): 每行的非负权重，长度与 data 的行数相同
+            include_zeros (bool): 稀疏数据是否把未存储的 0 算作样本，稠密数据不受影响，见 ``from_sparse``
+
+        Returns:
+            ColumnStatistics: 统计量，``passes`` 为 1
+
+        Raises:
+            ValueError: 权重的长度不对或有负数
+            NotImplementedError: 稀疏数据使用了权重
+        """
+        columns = data.columns if isinstance(data, pd.DataFrame) else pd.RangeIndex(data.shape[1])
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            if weights.shape != (data.shape[0],):
+                raise ValueError(f"权重的长度应为 {data.shape[0]}，得到的形状是 {weights.shape}")
+            if np.any(weights < 0):
+                raise ValueError("权重不能为负数")
+        if is_sparse_frame(data) or sparse.issparse(data):
+            if weights is not None:
+                raise NotImplementedError("稀疏数据暂不支持权重")
+            matrix = data.sparse.to_coo() if is_sparse_frame(data) else data
+            return cls.from_sparse(matrix, columns, include_zeros)
+
+        if rows is None:
+            rows = block_rows(data.shape[1])
+        result = cls.empty(columns)
+        for start, block in zip(range(0, len(data), rows), iter_blocks(data, rows)):
+            block_weights = None if weights is None else weights[start:start + rows]
+            result = result.merge(cls.from_block(block, columns, block_weights))
+        result.passes = 1
+        return result
+
+    @classmethod
+    def from_sparse(
+            cls,
+            matrix,
+            columns: Optional[pd.Index] = None,
+            include_zeros: bool = True,
+    ) -> Self:
+        """只读取稀疏矩阵中存储的元素计算统计量，不转换为稠密矩阵
+
+        未存储的 0 通过个数直接计入统计量，时间和内存都只与存储的元素个数有关
+
+        Args:
+            matrix: scipy 稀疏矩阵，非 CSC 格式时会先转换为 CSC
+            columns (Optional[pd.Index]): 列名
+            include_zeros (bool): 是否把未存储的 0 算作样本。为 False 时只统计存储的（非零）元素
+
+        Returns:
+            ColumnStatistics: 统计量，``passes`` 为 1
+        """
+        matrix = sparse.csc_array(matrix)
+        n, p = matrix.shape
+        values = np.asarray(matrix.data, dtype=np.float64)
+        lengths = np.diff(matrix.indptr)
+        column = np.repeat(np.arange(p), lengths)
+        valid = ~np.isnan(values)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            stored = np.bincount(column, weights=valid, minlength=p)
+            zeros = (n - lengths).astype(np.float64) if include_zeros else np.zeros(p)
+            count = stored + zeros
+            mean = np.bincount(column, weights=np.where(valid, values, 0), minlength=p) / count
+            deviation = np.where(valid, values - mean[column], 0)
+            m2 = np.bincount(column, weights=deviation * deviation, minlength=p)
+            m2 += np.where(zeros > 0, zeros * mean ** 2, 0)
+
+        min_ = np.full(p, np.nan)
+        max_ = np.full(p, np.nan)
+        nonempty = lengths > 0
+        if values.size:
+            starts = matrix.indptr[:-1][nonempty]
+            min_[nonempty] = np.fmin.reduceat(values, starts)
+            max_[nonempty] = np.fmax.reduceat(values, starts)
+        if include_zeros:
+            min_ = np.where(zeros > 0, np.fmin(min_, 0), min_)
+            max_ = np.where(zeros > 0, np.fmax(max_, 0), max_)
+
+        return cls(count, mean, m2, min_, max_, columns=columns, passes=1, missing=lengths - stored)
+
+    def merge(self, other: "ColumnStatistics") -> "ColumnStatistics":
+        """合并两份统计量
+
+        使用 Chan 等人的并行合并公式，不修改原来的两份统计量
+
+        Args:
+            other (ColumnStatistics): 另一份统计量，列必须相同
+
+        Returns:
+            ColumnStatistics: 合并后的统计量
+
+        Raises:
+            ValueError: 列不相同
+        """
+        if not self.columns.equals(other.columns):
+            raise ValueError("列不相同，无法合并")
+
+        na, nb = self.count, other.count
+        n = na + nb
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = other.mean - self.mean
+            mean = np.where(
+                nb == 0, self.mean,
+                np.where(na == 0, other.mean, self.mean + delta * (nb / n))
+            )
+            m2 = np.where(
+                nb == 0, self.m2,
+                np.where(na == 0, other.m2, self.m2 + other.m2 + delta ** 2 * (na * nb / n))
+            )
+
+        return ColumnStatistics(
+            count=n,
+            mean=mean,
+            m2=m2,
+            min=np.fmin(self.min, other.min),
+            max=np.fmax(self.max, other.max),
+            columns=self.columns,
+            passes=self.passes + other.passes,
+            missing=self.missing + other.missing,
+            weight2=self.weight2 + other.weight2,
+        )
+
+    @classmethod
+    def merge_all(cls, statistics: Iterable["ColumnStatistics"]) -> "ColumnStatistics":
+        """合并多份统计量
+
+        两两配对逐层合并，比逐个累加的舍入误差更小
+
+        Args:
+            statistics (Iterable[ColumnStatistics]): 多份统计量
+
+        Returns:
+            ColumnStatistics: 合并后的统计量
+
+        Raises:
+            ValueError: 没有统计量
+        """
+        level = list(statistics)
+        if not level:
+            raise ValueError("没有可合并的统计量")
+        while len(level) > 1:
+            merged = [a.merge(b) for a, b in zip(level[::2], level[1::2])]
+            if len(level) % 2:
+                merged.append(level[-1])
+            level = merged
+        return level[0]
+
+    @classmethod
+    def from_shards(
+            cls,
+            shards: Iterable[Any],
+            reader: Optional[Callable[[Any], pd.DataFrame]] = None,
+            max_workers: Optional[int] = None,
+            include_zeros: bool = True,
+    ) -> "ColumnStatistics":
+        """在进程池中分别计算每个分片的统计量，再合并为一份
+
+        每个分片只在 worker 中读取，主进程只接收和合并很小的统计量，
+        不需要拼接数据
+
+        Args:
+            shards (Iterable): 分片，``reader`` 为 None 时应是 DataFrame，否则是传给 ``reader`` 的参数（如文件路径）
+            reader (Optional[Callable]): 读取分片的函数，例如 ``pd.read_parquet``，必须可以被 pickle
+            max_workers (Optional[int]): 进程数，默认使用全部核心，为 1 时不创建进程池
+            include_zeros (bool): 稀疏分片是否把未存储的 0 算作样本，见 ``from_sparse``
+
+        Returns:
+            ColumnStatistics: 合并后的统计量
+
+        Examples:
+            >>> ColumnStatistics.from_shards(glob.glob("data/*.parquet"), reader=pd.read_parquet)
+        """
+        if max_workers == 1:
+            return cls.merge_all(_shard_statistics(shard, reader, include_zeros) for shard in shards)
+
+        shards = list(shards)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(_shard_statistics, shards, [reader] * len(shards), [include_zeros] * len(shards))
+            return cls.merge_all(results)
+
+    def var(self, ddof: int = 0, weight_type: WeightType = "frequency") -> np.ndarray:
+        """方差，自由度不大于 0 的列为 NaN
+
+        没有权重时两种权重类型的结果相同，见 ``pythontools.modeling.base.std``
+
+        Args:
+            ddof (int): 自由度增量
+            weight_type (Literal["frequency", "reliability"]): 权重的含义，
+                频数权重的自由度为 :math:`W - ddof`，可靠性权重为 :math:`W - ddof \\cdot V_2 / W`
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if weight_type == "frequency":
+                dof = self.count - ddof
+            elif weight_type == "reliability":
+                dof = self.count - ddof * self.weight2 / self.count
+            else:
+                raise ValueError(f"无效的权重类型: {weight_type}")
+            return np.where(dof > 0, self.m2 / dof, np.nan)
+
+    def std(self, ddof: int = 0, weight_type: WeightType = "frequency") -> np.ndarray:
+        """标准差
+
+        Args:
+            ddof (int): 自由度增量
+            weight_type (Literal["frequency", "reliability"]): 权重的含义
+        """
+        return np.sqrt(self.var(ddof, weight_type))
+
+    @property
+    def range(self) -> np.ndarray:
+        """极差"""
+        return self.max - self.min
+
+    def save(self, path: str | os.PathLike, metadata: Optional[dict] = None) -> None:
+        """保存为紧凑的二进制文件
+
+        文件格式::
+
+            MAGIC (8 字节) | 头部长度 (uint32, 小端) | JSON 头部 | 填充到 64 字节对齐 | float64 数组
+
+        数组的形状为 (字段数, 列数)，字段依次为 ``FIELDS``，可以直接内存映射
+
+        Args:
+            path: 文件路径
+            metadata (Optional[dict]): 额外保存的信息，必须可以转换为 JSON
+
+        Raises:
+            TypeError: 列名或 metadata 不能转换为 JSON
+        """
+        if isinstance(self.columns, pd.RangeIndex) and self.columns.start == 0 and self.columns.step == 1:
+            columns = {"range": len(self.columns)}
+        else:
+            columns = {"values": self.columns.tolist()}
+        header = json.dumps({
+            "columns": columns,
+            "shape": list(self.mean.shape),
+            "fields": list(self.FIELDS),
+            "passes": self.passes,
+            "metadata": metadata or {},
+        }).encode()
+
+        prefix = len(MAGIC) + 4 + len(header)
+        padding = -prefix % 64
+        values = np.stack([getattr(self, field) for field in self.FIELDS])
+        with open(path, "wb") as file:
+            file.write(MAGIC)
+            file.write(struct.pack("<I", len(header) + padding))
+            file.write(header)
+            file.write(b" " * padding)
+            file.write(np.ascontiguousarray(values, dtype="<f8").tobytes())
+
+    @staticmethod
+    def _read_header(path: str | os.PathLike) -> tuple[dict, int]:
+        """读取文件头
+
+        Returns:
+            (头部, 数组的偏移量)
+
+        Raises:
+            ValueError: 不是统计量文件
+        """
+        with open(path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"不是统计量文件: {path}")
+            (length,) = struct.unpack("<I", file.read(4))
+            header = json.loads(file.read(length))
+        return header, len(MAGIC) + 4 + length
+
+    @classmethod
+    def load(cls, path: str | os.PathLike, mmap: bool = True) -> Self:
+        """读取 ``save`` 保存的统计量
+
+        Args:
+            path: 文件路径
+            mmap (bool): 是否以只读内存映射的方式读取数组，不复制到内存
+
+        Returns:
+            ColumnStatistics: 统计量
+
+        Raises:
+            ValueError: 不是统计量文件
+        """
+        header, offset = cls._read_header(path)
+        # 早期的文件没有 missing；没有 weight2 时等于 count
+        fields = header.get("fields", ["count", "mean", "m2", "min", "max"])
+        shape = (len(fields), *header["shape"])
+        if mmap:
+            values = np.memmap(path, dtype="<f8", mode="r", offset=offset, shape=shape)
+        else:
+            values = np.fromfile(path, dtype="<f8", offset=offset).reshape(shape)
+
+        columns = header["columns"]
+        if "range" in columns:
+            columns = pd.RangeIndex(columns["range"])
+        else:
+            columns = pd.Index(columns["values"])
+        return cls(**dict(zip(fields, values)), columns=columns, passes=header["passes"])
+
+    @classmethod
+    def load_metadata(cls, path: str | os.PathLike) -> dict:
+        """读取 ``save`` 时保存的 metadata
+
+        Args:
+            path: 文件路径
+        """
+        return cls._read_header(path)[0]["metadata"]
+
+    def to_series(self, values: np.ndarray) -> pd.Series:
+        """把按列的数组包装为以列名为索引的 Series"""
+        return pd.Series(values, index=self.columns)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(columns={list(self.columns)}, passes={self.passes})"
+
+
+def _shard_statistics(
+        shard: Any,
+        reader: Optional[Callable[[Any], pd.DataFrame]],
+        include_zeros: bool = True,
+) -> ColumnStatistics:
+    """在 worker 中计算一个分片的统计量"""
+    data = shard if reader is None else reader(shard)
+    return ColumnStatistics.from_data(data, include_zeros=include_zeros)
+
+
+__all__ = [
+    "ColumnStatistics",
+]
@@ -69,5 +69,13 @@ class TestMeanFunction(unittest.TestCase):
         expected = 2.5
         self.assertEqual(result, expected)
 
+    def test_mean_with_generator(self):
+        """测试生成器只遍历一次"""
+        data = np.random.default_rng(0).normal(size=200_000)
+        self.assertAlmostEqual(mean(x for x in data.tolist()), data.mean(), places=12)
+        with self.assertRaises(ValueError):
+            mean(x for x in [])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -36,8 +36,8 @@ class TestStdFunction(unittest.TestCase):
     def test_std_with_multiple_elements_ddof_1(self):
         """测试多个元素且ddof=1的情况"""
         data = [1.0, 2.0, 3.0, 4.0, 5.0]
-        # 手动计算期望值: sqrt((1+4+9+16+25)/4 - 3^2) = sqrt(13.75-9) = sqrt(4.75)
-        expected = np.sqrt(4.75)
+        # 手动计算期望值: sqrt(((1-3)^2+(2-3)^2+0+(4-3)^2+(5-3)^2)/4) = sqrt(10/4)
+        expected = np.sqrt(2.5)
         result = std(data, ddof=1)
         self.assertAlmostEqual(result, expected, places=10)
 
@@ -70,5 +70,21 @@ class TestStdFunction(unittest.TestCase):
         with self.assertRaises(Exception):
             std(data)
 
+    def test_std_with_generator(self):
+        """测试生成器只遍历一次，结果与数组相同"""
+        data = np.random.default_rng(0).normal(size=200_000)
+        result = std((x for x in data.tolist()), ddof=1)
+        self.assertAlmostEqual(result, np.std(data, ddof=1), places=12)
+        self.assertEqual(std(iter([5.0])), 0)
+        with self.assertRaises(ValueError):
+            std(x for x in [])
+
+    def test_std_numerically_stable(self):
+        """均值远大于标准差时没有相消误差"""
+        data = [1e9 + x for x in (1.0, 2.0, 3.0, 4.0, 5.0)]
+        self.assertAlmostEqual(std(data), np.sqrt(2), places=6)
+        self.assertAlmostEqual(std(iter(data)), np.sqrt(2), places=6)
+
+
 if __name__ == '__main__':
     unittest.main()
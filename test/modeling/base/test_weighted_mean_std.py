@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pythontools.modeling import corr
+from pythontools.modeling.base import mean, std
+
+
+class TestWeighted(unittest.TestCase):
+    """频数权重的结果与把每行重复 w 次相同"""
+
+    def setUp(self):
+        rng = np.random.default_rng(20)
+        self.x = rng.normal(5, 2, 1_000)
+        self.y = self.x + rng.normal(size=1_000)
+        self.w = rng.integers(0, 6, 1_000)
+        self.x_repeated = np.repeat(self.x, self.w)
+        self.y_repeated = np.repeat(self.y, self.w)
+
+    def test_mean(self):
+        self.assertAlmostEqual(mean(self.x, weights=self.w), self.x_repeated.mean(), places=12)
+        self.assertAlmostEqual(mean(pd.Series(self.x), weights=self.w), self.x_repeated.mean(), places=12)
+
+    def test_std_frequency(self):
+        for ddof in (0, 1):
+            with self.subTest(ddof=ddof):
+                expected = self.x_repeated.std(ddof=ddof)
+                self.assertAlmostEqual(std(self.x, ddof, weights=self.w), expected, places=12)
+                # 生成器只遍历一次
+                self.assertAlmostEqual(
+                    std(iter(self.x.tolist()), ddof, weights=iter(self.w.tolist())), expected, places=12
+                )
+
+    def test_std_reliability(self):
+        """可靠性权重与权重的缩放无关，权重全部相同时与不加权相同"""
+        result = std(self.x, 1, weights=self.w, weight_type="reliability")
+        self.assertAlmostEqual(std(self.x, 1, weights=self.w * 0.01, weight_type="reliability"), result, places=12)
+        v1, v2 = self.w.sum(), (self.w ** 2).sum()
+        m = np.average(self.x, weights=self.w)
+        expected = np.sqrt((self.w * (self.x - m) ** 2).sum() / (v1 - v2 / v1))
+        self.assertAlmostEqual(result, expected, places=12)
+        self.assertAlmostEqual(
+            std(self.x, 1, weights=np.full(1_000, 0.3), weight_type="reliability"), self.x.std(ddof=1), places=12
+        )
+
+    def test_corr(self):
+        expected = corr(pd.Series(self.x_repeated), pd.Series(self.y_repeated))
+        self.assertAlmostEqual(corr(self.x, self.y, weights=self.w), expected, places=12)
+        self.assertEqual(corr(self.x, np.ones(1_000), weights=self.w), 0)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            std([1, 2, 3], weights=[1, 2])
+        with self.assertRaises(ValueError):
+            mean([1, 2, 3], weights=[1, -1, 1])
+        with self.assertRaises(ValueError):
+            std([1, 2, 3], weights=[1, 1, 1], weight_type="other")
+        with self.assertRaises(ValueError):
+            corr(self.x, self.y, weights=self.w[:10])
+
+
+if __name__ == '__main__':
+    unittest.main()
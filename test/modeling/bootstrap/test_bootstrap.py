@@ -0,0 +1,115 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from pythontools.modeling import OLS, bootstrap_coef
+
+
+class Wrapped:
+    """不是 OLS 的 LinearModel，默认逐次训练"""
+
+    def __init__(self):
+        self.model = OLS()
+
+    def fit(self, X, y):
+        self.model.fit(X, y)
+        self.coef_, self.intercept_ = self.model.coef_, self.model.intercept_
+        return self
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+    def score(self, X, y):
+        return self.model.score(X, y)
+
+
+class TestBootstrap(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(25)
+        n = 400
+        self.X = pd.DataFrame(50 + rng.normal(size=(n, 3)), columns=["a", "b", "c"])
+        self.y = 1 + self.X @ [1.0, -2.0, 0.0] + rng.normal(size=n)
+        self.model = OLS().fit(self.X, self.y)
+
+    def test_matches_refit(self):
+        """加权的矩阵乘法与逐次训练的结果相同"""
+        weighted = bootstrap_coef(self.model, self.X, self.y, 100, batch_size=16, random_state=0)
+        refit = bootstrap_coef(self.model, self.X, self.y, 100, batch_size=16, random_state=0, refit=True)
+        np.testing.assert_allclose(weighted.samples, refit.samples, rtol=1e-8, atol=1e-10)
+        wrapped = Wrapped().fit(self.X, self.y)
+        np.testing.assert_allclose(
+            bootstrap_coef(wrapped, self.X, self.y, 100, batch_size=16, random_state=0).samples, refit.samples
+        )
+
+    def test_independent_of_workers(self):
+        expected = bootstrap_coef(self.model, self.X, self.y, 200, batch_size=32, random_state=1)
+        result = bootstrap_coef(self.model, self.X, self.y, 200, batch_size=32, n_jobs=3, random_state=1)
+        np.testing.assert_array_equal(result.samples, expected.samples)
+        refit = bootstrap_coef(Wrapped().fit(self.X, self.y), self.X, self.y, 64, batch_size=32, n_jobs=2, random_state=1)
+        np.testing.assert_allclose(refit.samples, expected.samples[:64], rtol=1e-8, atol=1e-10)
+
+    def test_refit_sends_data_once(self):
+        """逐次训练并行时每批只传随机种子和批大小，模型和数据由 initializer 发送"""
+        tasks = []
+
+        class Recording(ProcessPoolExecutor):
+            def map(self, fn, *iterables, **kwargs):
+                iterables = [list(values) for values in iterables]
+                tasks.extend(value for values in iterables for value in values)
+                return super().map(fn, *iterables, **kwargs)
+
+        model = Wrapped().fit(self.X, self.y)
+        with mock.patch("pythontools.modeling.bootstrap.ProcessPoolExecutor", Recording):
+            result = bootstrap_coef(model, self.X, self.y, 64, batch_size=16, n_jobs=2, random_state=2)
+        expected = bootstrap_coef(model, self.X, self.y, 64, batch_size=16, random_state=2)
+        np.testing.assert_array_equal(result.samples, expected.samples)
+        self.assertEqual(len(tasks), 8)
+        self.assertTrue(all(isinstance(task, (np.random.SeedSequence, int)) for task in tasks))
+
+    def test_reproducible(self):
+        first = bootstrap_coef(self.model, self.X, self.y, 50, random_state=2)
+        second = bootstrap_coef(self.model, self.X, self.y, 50, random_state=2)
+        np.testing.assert_array_equal(first.samples, second.samples)
+        other = bootstrap_coef(self.model, self.X, self.y, 50, random_state=3)
+        self.assertFalse(np.allclose(first.samples, other.samples))
+
+    def test_interval(self):
+        result = bootstrap_coef(self.model, self.X, self.y, 2_000, random_state=4)
+        self.assertEqual(result.samples.shape, (2_000, 3))
+        np.testing.assert_allclose(result.standard_errors, self.model.standard_errors_, rtol=0.15)
+        interval = result.confidence_interval(0.95)
+        self.assertTrue(np.all(interval[:, 0] < self.model.coef_) and np.all(self.model.coef_ < interval[:, 1]))
+        basic = result.confidence_interval(0.95, method="basic")
+        np.testing.assert_allclose(basic.sum(axis=1), 4 * self.model.coef_ - interval.sum(axis=1))
+
+        frame = result.to_frame(0.9)
+        self.assertEqual(list(frame.index), ["a", "b", "c"])
+        np.testing.assert_allclose(frame[["low", "high"]], result.confidence_interval(0.9))
+        np.testing.assert_allclose(frame["coef"], self.model.coef_)
+
+    def test_no_intercept(self):
+        model = OLS(fit_intercept=False).fit(self.X, self.y)
+        weighted = bootstrap_coef(model, self.X.to_numpy(), self.y.to_numpy(), 32, random_state=5)
+        refit = bootstrap_coef(model, self.X.to_numpy(), self.y.to_numpy(), 32, random_state=5, refit=True)
+        np.testing.assert_allclose(weighted.samples, refit.samples, rtol=1e-6)
+        self.assertEqual(weighted.variables, ["x0", "x1", "x2"])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            bootstrap_coef(self.model, self.X, self.y, 0)
+        with self.assertRaises(ValueError):
+            bootstrap_coef(self.model, self.X, self.y[:-1])
+        with self.assertRaises(ValueError):
+            bootstrap_coef(self.model, self.X, self.y, n_jobs=0)
+        result = bootstrap_coef(self.model, self.X, self.y, 10, random_state=0)
+        with self.assertRaises(ValueError):
+            result.confidence_interval(1.5)
+        with self.assertRaises(ValueError):
+            result.confidence_interval(method="bca")
+
+
+if __name__ == '__main__':
+    unittest.main()
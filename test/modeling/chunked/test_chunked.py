@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pythontools.modeling.chunked import read_chunks, write_chunks
+from pythontools.modeling.normalization import ZScoreNormalizer, MinMaxNormalizer
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class TestChunkedPipeline(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        self.data = pd.DataFrame({
+            'A': rng.normal(0, 1, 1000),
+            'B': rng.uniform(0, 10, 1000),
+        })
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_read_write_csv(self):
+        """分块写入再分块读取得到原数据"""
+        source = self.path("data.csv")
+        write_chunks((self.data.iloc[i:i + 300] for i in range(0, 1000, 300)), source)
+        chunks = list(read_chunks(source, chunksize=400))
+        self.assertEqual([len(chunk) for chunk in chunks], [400, 400, 200])
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), self.data)
+
+    def test_fit_transform_file_csv(self):
+        """文件流水线与整体 fit_transform 结果一致"""
+        source, target = self.path("data.csv"), self.path("normalized.csv")
+        self.data.to_csv(source, index=False)
+        for cls in (ZScoreNormalizer, MinMaxNormalizer):
+            with self.subTest(cls=cls.__name__):
+                normalizer = cls.fit_transform_file(source, target, chunksize=128)
+                self.assertEqual(normalizer.statistics.passes, 8)
+                pd.testing.assert_frame_equal(
+                    pd.read_csv(target), cls.fit_transform(self.data),
+                    check_exact=False, atol=1e-10
+                )
+
+    @unittest.skipIf(pyarrow is None, "需要 pyarrow")
+    def test_fit_transform_file_parquet(self):
+        """Parquet 文件流水线"""
+        source, target = self.path("data.parquet"), self.path("normalized.parquet")
+        self.data.to_parquet(source, index=False)
+        ZScoreNormalizer.fit_transform_file(source, target, chunksize=128)
+        pd.testing.assert_frame_equal(
+            pd.read_parquet(target), ZScoreNormalizer.fit_transform(self.data),
+            check_exact=False, atol=1e-10
+        )
+
+    def test_unknown_format(self):
+        """不支持的格式"""
+        with self.assertRaises(ValueError):
+            list(read_chunks(self.path("data.xlsx")))
+
+
+if __name__ == '__main__':
+    unittest.main()
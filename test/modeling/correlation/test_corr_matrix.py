@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from pythontools.modeling import corr, ZScoreNormalizer
+from pythontools.modeling.correlation import corr_matrix
+from pythontools.modeling.statistics import ColumnStatistics
+
+
+class TestCorrMatrix(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(16)
+        values = rng.normal(size=(5_000, 12))
+        values[:, 1] += values[:, 0]
+        values[:, 2] = -2 * values[:, 0] + 1
+        values[:, 5] = 3.0  # 常数列
+        self.frame = pd.DataFrame(values, columns=[f"x{i}" for i in range(12)])
+
+    def test_matches_pairwise_corr(self):
+        result = corr_matrix(self.frame)
+        self.assertIsInstance(result, pd.DataFrame)
+        for a in self.frame.columns:
+            for b in self.frame.columns:
+                self.assertAlmostEqual(result.loc[a, b], corr(self.frame[a], self.frame[b]), places=12)
+
+    def test_constant_column(self):
+        result = corr_matrix(self.frame)
+        self.assertTrue((result["x5"] == 0).all())
+        self.assertTrue((result.loc["x5"] == 0).all())
+        self.assertAlmostEqual(result.loc["x0", "x2"], -1)
+        np.testing.assert_allclose(result.drop(index="x5", columns="x5"), self.frame.drop(columns="x5").corr())
+
+    def test_blocked(self):
+        """分块模式与一次计算的结果相同"""
+        expected = corr_matrix(self.frame.to_numpy())
+        for block_size in (1, 5, 12, 100):
+            with self.subTest(block_size=block_size):
+                np.testing.assert_allclose(corr_matrix(self.frame.to_numpy(), block_size=block_size), expected)
+
+    def test_statistics(self):
+        """可以传入已有的统计量；原地修改数据后重新计算"""
+        statistics = ZScoreNormalizer(self.frame).statistics
+        pd.testing.assert_frame_equal(corr_matrix(self.frame, statistics=statistics), corr_matrix(self.frame))
+        frame = self.frame.copy()
+        corr_matrix(frame)
+        frame["x3"] = frame["x0"]
+        self.assertAlmostEqual(corr_matrix(frame).loc["x0", "x3"], 1)
+
+    def test_invalid_statistics(self):
+        """拒绝有权重、只统计非零元素或行数不同的统计量"""
+        weights = np.random.default_rng(3).uniform(0, 2, len(self.frame))
+        values = np.where(self.frame.to_numpy() > 0, self.frame.to_numpy(), 0)
+        for statistics, data in (
+                (ZScoreNormalizer(self.frame, weights=weights).statistics, self.frame),
+                (ColumnStatistics.from_sparse(sparse.csr_array(values), include_zeros=False), values),
+                (ZScoreNormalizer(self.frame.iloc[1:]).statistics, self.frame),
+                (ZScoreNormalizer(self.frame.iloc[:, 1:]).statistics, self.frame),
+        ):
+            with self.subTest(shape=data.shape), self.assertRaises(ValueError):
+                corr_matrix(data, statistics=statistics)
+
+    def test_out_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "data.npy")
+            target = os.path.join(directory, "corr.npy")
+            np.save(source, self.frame.to_numpy())
+            result = corr_matrix(source, block_size=4, out=target)
+            self.assertIsInstance(result, np.memmap)
+            np.testing.assert_allclose(np.load(target), corr_matrix(self.frame).to_numpy())
+            del result
+
+        with self.assertRaises(ValueError):
+            corr_matrix(self.frame, out=np.empty((3, 3)))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            corr_matrix(self.frame.iloc[:1])
+        frame = self.frame.copy()
+        frame.iloc[3, 2] = np.nan
+        with self.assertRaises(ValueError):
+            corr_matrix(frame)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from pythontools.modeling.correlation import (
+    spearman, spearman_matrix, kendall_tau, kendall_matrix, _count_inversions
+)
+
+
+class TestRankCorrelation(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(17)
+        x = rng.normal(size=2_000)
+        self.frame = pd.DataFrame({
+            "x": x,
+            "y": np.exp(x) + rng.normal(size=2_000),
+            # 大量相同的值
+            "z": rng.integers(0, 5, 2_000) + np.round(x),
+            "c": np.ones(2_000),
+        })
+
+    def test_count_inversions(self):
+        rng = np.random.default_rng(0)
+        for n in (2, 3, 17, 64):
+            ranks = rng.integers(0, 7, n)
+            expected = sum(ranks[i] > ranks[j] for i in range(n) for j in range(i + 1, n))
+            self.assertEqual(_count_inversions(ranks, 7), expected)
+
+    def test_matches_scipy(self):
+        for a, b in (("x", "y"), ("x", "z"), ("y", "z"), ("z", "z")):
+            with self.subTest(pair=(a, b)):
+                x, y = self.frame[a], self.frame[b]
+                self.assertAlmostEqual(spearman(x, y), stats.spearmanr(x, y).statistic, places=12)
+                self.assertAlmostEqual(kendall_tau(x, y), stats.kendalltau(x, y).statistic, places=12)
+
+    def test_monotonic(self):
+        x = np.arange(100.0)
+        self.assertAlmostEqual(spearman(x, x ** 3), 1)
+        self.assertAlmostEqual(kendall_tau(x, -np.exp(x / 10)), -1)
+
+    def test_constant(self):
+        self.assertEqual(spearman(self.frame["x"], self.frame["c"]), 0)
+        self.assertEqual(kendall_tau(self.frame["c"], self.frame["x"]), 0)
+
+    def test_matrix(self):
+        expected_spearman = self.frame.corr(method="spearman").fillna(0)
+        expected_kendall = self.frame.corr(method="kendall").fillna(0)
+        expected_spearman.loc["c", "c"] = expected_kendall.loc["c", "c"] = 0
+        pd.testing.assert_frame_equal(spearman_matrix(self.frame), expected_spearman, atol=1e-12)
+        pd.testing.assert_frame_equal(kendall_matrix(self.frame), expected_kendall, atol=1e-12)
+        np.testing.assert_allclose(
+            spearman_matrix(self.frame.to_numpy(), block_size=2), expected_spearman.to_numpy(), atol=1e-12
+        )
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            kendall_tau([1], [2])
+        with self.assertRaises(ValueError):
+            spearman([1, 2], [1, 2, 3])
+        with self.assertRaises(ValueError):
+            kendall_tau([1, np.nan], [1, 2])
+        with self.assertRaises(ValueError):
+            kendall_matrix(np.array([[1, np.nan], [2, 3]]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pythontools.modeling import corr
+from pythontools.modeling.correlation import RollingCorrelation
+
+
+class TestRollingCorrelation(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(18)
+        n = 3_000
+        # 相关性随时间漂移，均值很大
+        self.x = pd.Series(1e6 + rng.normal(size=n))
+        self.y = pd.Series(1e6 + np.linspace(-1, 1, n) * (self.x - 1e6) + rng.normal(size=n))
+
+    def test_sliding_window_matches_corr(self):
+        window = 50
+        rolling = RollingCorrelation(window=window)
+        result = rolling.extend(self.x, self.y)
+        self.assertTrue(np.isnan(result[0]))
+        self.assertEqual(rolling.count, window)
+        for end in (2, 10, window, window + 1, 777, 1_234, len(self.x)):
+            start = max(0, end - window)
+            expected = corr(self.x[start:end], self.y[start:end])
+            self.assertAlmostEqual(result[end - 1], expected, places=9)
+
+    def test_matches_pandas_rolling(self):
+        result = RollingCorrelation(window=100).extend(self.x, self.y)
+        # pandas 按和的公式计算，均值很大时不准确，先平移（相关系数不变）
+        expected = (self.x - 1e6).rolling(100).corr(self.y - 1e6)
+        np.testing.assert_allclose(result[99:], expected[99:], atol=1e-9)
+
+    def test_decay(self):
+        result = RollingCorrelation(alpha=0.05).extend(self.x, self.y)
+        expected = self.x.ewm(alpha=0.05).corr(self.y)
+        np.testing.assert_allclose(result[1:], expected[1:], atol=1e-9)
+
+    def test_constant(self):
+        rolling = RollingCorrelation(window=5)
+        rolling.extend([1, 2, 3, 4, 5], [2, 2, 2, 2, 2])
+        self.assertEqual(rolling.corr, 0)
+        # 常数值移出窗口后恢复
+        self.assertAlmostEqual(rolling.extend([6, 7, 8, 9, 10], [1, 2, 3, 4, 5])[-1], 1)
+
+    def test_reset(self):
+        rolling = RollingCorrelation(window=10)
+        rolling.extend(self.x[:20], self.y[:20])
+        rolling.reset()
+        self.assertEqual(rolling.count, 0)
+        self.assertTrue(np.isnan(rolling.corr))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            RollingCorrelation()
+        with self.assertRaises(ValueError):
+            RollingCorrelation(window=10, alpha=0.1)
+        with self.assertRaises(ValueError):
+            RollingCorrelation(window=1)
+        with self.assertRaises(ValueError):
+            RollingCorrelation(alpha=0)
+        with self.assertRaises(ValueError):
+            RollingCorrelation(window=3).update(1, np.nan)
+
+
+if __name__ == '__main__':
+    unittest.main()
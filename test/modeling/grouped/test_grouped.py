@@ -0,0 +1,73 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from pythontools.modeling.grouped import GroupedNormalizer
+from pythontools.modeling.normalization import ZScoreNormalizer, MinMaxNormalizer
+
+
+class TestGroupedNormalizer(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(10)
+        n = 600
+        self.data = pd.DataFrame({
+            'customer': rng.choice(['a', 'b', 'c', 'd'], n),
+            'x': rng.normal(0, 1, n),
+            'y': rng.uniform(0, 100, n),
+        })
+        self.data['x'] += self.data['customer'].map({'a': 0, 'b': 10, 'c': 20, 'd': 30})
+        self.data.loc[self.data['customer'] == 'd', 'y'] = 5.0
+
+    def test_matches_per_group_loop(self):
+        """与逐组创建 Normalizer 的结果相同"""
+        for cls, kwargs in ((ZScoreNormalizer, {'ddof': 1}), (MinMaxNormalizer, {'target_range': (-1, 1)})):
+            with self.subTest(cls=cls.__name__):
+                grouped = GroupedNormalizer(self.data, by='customer', normalizer=cls, **kwargs)
+                result = grouped.normalize()
+                self.assertEqual(list(result.columns), list(self.data.columns))
+                pd.testing.assert_series_equal(result['customer'], self.data['customer'])
+                for key, group in self.data.groupby('customer'):
+                    expected = cls(group[['x', 'y']], **kwargs).normalize()
+                    pd.testing.assert_frame_equal(
+                        result.loc[group.index, ['x', 'y']], expected, check_exact=False, atol=1e-10
+                    )
+                pd.testing.assert_frame_equal(
+                    grouped.denormalize(result)[['x']], self.data[['x']], check_exact=False, atol=1e-10
+                )
+
+    def test_statistics(self):
+        """每组的统计量"""
+        grouped = GroupedNormalizer(self.data, by='customer')
+        expected = self.data.groupby('customer').mean()
+        pd.testing.assert_frame_equal(grouped.mean.sort_index(), expected, check_names=False)
+
+    def test_single_pass_blocks(self):
+        """分块扫描一遍数据，结果与 groupby 相同，缺失值单独计数"""
+        data = self.data.copy()
+        data.loc[::7, 'x'] = np.nan
+        with mock.patch('pythontools.modeling.grouped.block_rows', return_value=50):
+            grouped = GroupedNormalizer(data, by='customer')
+        self.assertEqual(grouped.normalizer.statistics.passes, 1)
+        expected = data.groupby('customer')
+        pd.testing.assert_frame_equal(grouped.std.sort_index(), expected.std(ddof=0), check_names=False)
+        pd.testing.assert_frame_equal(grouped.min.sort_index(), expected.min(), check_names=False)
+        pd.testing.assert_frame_equal(grouped.max.sort_index(), expected.max(), check_names=False)
+        missing = pd.DataFrame(grouped.normalizer.statistics.missing, index=grouped.groups, columns=grouped.columns)
+        pd.testing.assert_series_equal(
+            missing['x'].sort_index(), expected['x'].apply(lambda x: x.isna().sum()).astype(float), check_names=False
+        )
+
+    def test_multiple_keys_and_unseen_group(self):
+        """多个分组列，没有出现过的组为 NaN"""
+        data = self.data.assign(region=np.where(self.data.index % 2, 'east', 'west'))
+        grouped = GroupedNormalizer(data, by=['customer', 'region'])
+        new = pd.DataFrame({'customer': ['a', 'z'], 'x': [1.0, 1.0], 'y': [1.0, 1.0], 'region': ['east', 'east']})
+        result = grouped.normalize(new)
+        self.assertFalse(result.loc[0, ['x', 'y']].isna().any())
+        self.assertTrue(result.loc[1, ['x', 'y']].isna().all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pythontools.modeling import OLS, p_values, r_squared, adjusted_r_squared, regression_statistics
+
+
+class TestMultiTarget(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(23)
+        n, p, k = 1_000, 5, 200
+        self.X = pd.DataFrame(rng.normal(size=(n, p)), columns=list("abcde"))
+        coef = rng.normal(size=(p, k)) * (rng.random((p, k)) < 0.5)
+        self.Y = pd.DataFrame(3 + self.X.to_numpy() @ coef + rng.normal(size=(n, k)) * rng.uniform(0.1, 5, k))
+
+    def test_matches_single_target(self):
+        """与逐个因变量计算的结果相同"""
+        statistics = regression_statistics(self.X, self.Y)
+        for j in (0, 57, 199):
+            y = self.Y[j]
+            single = regression_statistics(self.X, y)
+            model = OLS().fit(self.X, y)
+            np.testing.assert_allclose(statistics["coef"][j], model.coef_, rtol=1e-9)
+            self.assertAlmostEqual(statistics["intercept"][j], model.intercept_, places=9)
+            self.assertAlmostEqual(statistics["r2"][j], model.score(self.X, y), places=10)
+            self.assertAlmostEqual(statistics["adjusted_r2"][j], adjusted_r_squared(model.score(self.X, y), self.X))
+            np.testing.assert_allclose(statistics["standard_errors"][j], model.standard_errors_, rtol=1e-8)
+            np.testing.assert_allclose(statistics["p_values"][j], p_values(model, self.X, y), rtol=1e-8, atol=1e-300)
+            for key in ("coef", "r2", "p_values"):
+                np.testing.assert_allclose(statistics[key][j], single[key], rtol=1e-10, atol=1e-300)
+        self.assertEqual(statistics["dof"], len(self.X) - 6)
+
+    def test_shapes(self):
+        statistics = regression_statistics(self.X, self.Y)
+        for key in ("coef", "standard_errors", "t_values", "p_values"):
+            self.assertEqual(statistics[key].shape, (200, 5))
+        for key in ("intercept", "r2", "adjusted_r2"):
+            self.assertEqual(statistics[key].shape, (200,))
+        single = regression_statistics(self.X, self.Y[0])
+        self.assertEqual(single["p_values"].shape, (5,))
+        self.assertEqual(np.ndim(single["r2"]), 0)
+
+    def test_functions(self):
+        """p_values、r_squared 和 adjusted_r_squared 都接受二维的 y"""
+        model = OLS().fit(self.X, self.Y)
+        np.testing.assert_allclose(p_values(model, self.X, self.Y), model.p_values_, rtol=1e-8, atol=1e-300)
+        r2 = r_squared(model, self.X, self.Y)
+        self.assertEqual(r2.shape, (200,))
+        np.testing.assert_allclose(r2, model.r2_, rtol=1e-9)
+        np.testing.assert_allclose(adjusted_r_squared(r2, self.X), model.adjusted_r2_, rtol=1e-9)
+        self.assertAlmostEqual(model.score(self.X, self.Y), r2.mean())
+
+    def test_collinear_targets(self):
+        """相同的因变量不影响结果"""
+        Y = pd.concat([self.Y[[0, 1]], self.Y[[0]]], axis=1)
+        statistics = regression_statistics(self.X, Y)
+        np.testing.assert_allclose(statistics["p_values"][2], statistics["p_values"][0])
+        self.assertTrue(np.isfinite(statistics["p_values"]).all())
+
+    def test_no_intercept(self):
+        model = OLS(fit_intercept=False).fit(self.X, self.Y)
+        statistics = regression_statistics(self.X, self.Y, fit_intercept=False)
+        np.testing.assert_allclose(statistics["coef"], model.coef_, rtol=1e-8)
+        np.testing.assert_allclose(statistics["intercept"], 0)
+        np.testing.assert_allclose(statistics["r2"], model.r2_, rtol=1e-8)
+
+
+if __name__ == '__main__':
+    unittest.main()
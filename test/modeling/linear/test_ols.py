@@ -0,0 +1,124 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+import numpy as np
+import pandas as pd
+
+from pythontools.modeling import OLS, p_values, adjusted_r_squared, print_result_for_lm, regression_statistics
+
+
+class TestOLS(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(21)
+        n = 20_000
+        # 均值很大的自变量，直接累加 X^T X 时误差明显
+        self.X = pd.DataFrame(1e4 + rng.normal(size=(n, 3)), columns=["a", "b", "c"])
+        self.y = 2 + self.X @ [1.5, -2.0, 0.0] + rng.normal(size=n)
+
+    def expected(self):
+        design = np.column_stack([np.ones(len(self.X)), self.X])
+        solution = np.linalg.lstsq(design, self.y, rcond=None)[0]
+        return solution[0], solution[1:]
+
+    def test_fit(self):
+        model = OLS().fit(self.X, self.y)
+        for name in ("fit", "predict", "score", "coef_", "intercept_"):
+            self.assertTrue(hasattr(model, name))
+        intercept, coef = self.expected()
+        np.testing.assert_allclose(model.coef_, coef, rtol=1e-8)
+        self.assertAlmostEqual(model.intercept_, intercept, delta=1e-4 * abs(intercept) + 1e-6)
+        np.testing.assert_allclose(model.predict(self.X), self.X.to_numpy() @ coef + intercept, rtol=1e-9)
+        self.assertAlmostEqual(model.r2_, model.score(self.X, self.y), places=10)
+        self.assertAlmostEqual(model.adjusted_r2_, adjusted_r_squared(model.r2_, self.X.shape), places=12)
+
+    def test_chunks(self):
+        """分块训练与整体训练相同"""
+        whole = OLS().fit(self.X, self.y)
+        chunks = [(self.X.iloc[i:i + 3_000], self.y.iloc[i:i + 3_000]) for i in range(0, len(self.X), 3_000)]
+        chunked = OLS.fit_chunks(chunks)
+        self.assertEqual(chunked.n_samples_, len(self.X))
+        np.testing.assert_allclose(chunked.coef_, whole.coef_, rtol=1e-10)
+        np.testing.assert_allclose(chunked.p_values_, whole.p_values_, rtol=1e-6)
+        self.assertAlmostEqual(chunked.r2_, whole.r2_, places=12)
+
+    def test_p_values(self):
+        """累积的统计量得到的 p 值与 p_values 相同"""
+        # 旧的 p_values 对均值很大的数据不准确，在中心化的数据上比较
+        centered = self.X - 1e4
+        model = OLS().fit(centered, self.y)
+        np.testing.assert_allclose(model.p_values_, p_values(model, centered, self.y), rtol=1e-6, atol=1e-12)
+
+        # 与 QR 分解得到的结果比较
+        model = OLS().fit(self.X, self.y)
+        design = np.column_stack([np.ones(len(self.X)), self.X])
+        q, r = np.linalg.qr(design)
+        solution = np.linalg.solve(r, q.T @ self.y)
+        residuals = self.y - design @ solution
+        dof = len(self.X) - 4
+        r_inverse = np.linalg.inv(r)
+        errors = np.sqrt(residuals @ residuals / dof * np.sum(r_inverse ** 2, axis=1))
+        np.testing.assert_allclose(model.standard_errors_, errors[1:], rtol=1e-6)
+        np.testing.assert_allclose(p_values(model), model.p_values_)
+        self.assertLess(model.p_values_[0], 1e-10)
+        self.assertGreater(model.p_values_[2], 1e-3)
+
+    def test_without_intercept(self):
+        X = self.X - 1e4
+        y = X @ [1.0, 2.0, 3.0] + 0.01 * np.random.default_rng(0).normal(size=len(X))
+        model = OLS(fit_intercept=False).fit(X, y)
+        self.assertEqual(model.intercept_, 0)
+        np.testing.assert_allclose(model.coef_, np.linalg.lstsq(X, y, rcond=None)[0], rtol=1e-10)
+        self.assertEqual(model.dof_, len(X) - 3)
+
+    def test_multi_target(self):
+        targets = np.column_stack([self.y, -self.y, self.X["a"] * 3])
+        model = OLS().fit(self.X, targets)
+        self.assertEqual(model.coef_.shape, (3, 3))
+        np.testing.assert_allclose(model.coef_[0], OLS().fit(self.X, self.y).coef_, rtol=1e-10)
+        np.testing.assert_allclose(model.coef_[1], -model.coef_[0], rtol=1e-10)
+        self.assertEqual(model.predict(self.X).shape, (len(self.X), 3))
+
+    def test_collinear(self):
+        X = self.X.assign(d=self.X["a"] * 2)
+        model = OLS().fit(X, self.y)
+        np.testing.assert_allclose(model.predict(X), OLS().fit(self.X, self.y).predict(self.X), rtol=1e-8)
+
+    def test_collinear_statistics(self):
+        """线性相关时与 regression_statistics 去掉相同的列：系数、标准误差和 p 值（包括 NaN 的位置）都相同"""
+        full = OLS().fit(self.X, self.y)
+        for X, dropped in (
+                (self.X.assign(d=self.X["a"] * 2), 0),
+                (self.X.assign(d=self.X["a"] + self.X["b"]), None),
+                (self.X.assign(d=0.0), 3),
+        ):
+            with self.subTest(columns=list(X.columns)):
+                model = OLS().fit(X, self.y)
+                statistics = regression_statistics(X, self.y)
+                self.assertEqual(model.dof_, full.dof_)
+                self.assertEqual(model.dof_, statistics["dof"])
+                self.assertEqual(np.isnan(model.coef_).sum(), 1)
+                if dropped is not None:
+                    self.assertTrue(np.isnan(model.coef_[dropped]))
+                for name in ("coef", "standard_errors", "p_values"):
+                    np.testing.assert_allclose(getattr(model, f"{name}_"), statistics[name], rtol=1e-6, err_msg=name)
+                np.testing.assert_allclose(model.predict(X), full.predict(self.X), rtol=1e-8)
+
+    def test_print_result(self):
+        model = OLS().fit(self.X, self.y)
+        with redirect_stdout(io.StringIO()) as output:
+            print_result_for_lm(model)
+        self.assertIn("变量: a b c", output.getvalue())
+        self.assertIn(f"决定R方: {model.r2_}", output.getvalue())
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            OLS().coef_
+        with self.assertRaises(ValueError):
+            OLS().fit(self.X, self.y[:10])
+        with self.assertRaises(ValueError):
+            OLS().fit(self.X.assign(a=np.nan), self.y)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from scipy.stats import t
+
+from pythontools.modeling import OLS, p_values, regression_statistics
+
+
+def pinv_p_values(model, X, y):
+    """原来的实现：加一列常数后求 X^T X 的伪逆"""
+    coefficients = model.coef_
+    residuals = y - model.predict(X)
+    dof = len(X) - len(coefficients) - 1
+    mse = np.sum(residuals ** 2) / dof
+    X_with_const = np.column_stack([np.ones(len(X)), X])
+    cov_matrix = np.linalg.pinv(X_with_const.T @ X_with_const) * mse
+    std_errors = np.sqrt(np.diag(cov_matrix))[1:]
+    return 2 * (1 - t.cdf(np.abs(coefficients / std_errors), df=dof))
+
+
+def householder_p_values(X, y):
+    """在中心化的数据上直接做 Householder QR"""
+    x = X - X.mean(axis=0)
+    q, r = np.linalg.qr(x)
+    coefficients = np.linalg.solve(r, q.T @ (y - y.mean()))
+    residuals = y - y.mean() - x @ coefficients
+    dof = len(X) - X.shape[1] - 1
+    r_inverse = np.linalg.inv(r)
+    std_errors = np.sqrt(residuals @ residuals / dof * np.sum(r_inverse ** 2, axis=1))
+    return 2 * t.sf(np.abs(coefficients / std_errors), df=dof)
+
+
+class Shrunk:
+    """系数不是最小二乘解的线性模型（类似岭回归）"""
+
+    fit_intercept = True
+
+    def __init__(self, model, factor=0.8):
+        self.coef_ = model.coef_ * factor
+        self.intercept_ = model.intercept_
+
+    def predict(self, X):
+        return np.asarray(X) @ self.coef_ + self.intercept_
+
+
+class TestPValues(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(22)
+        n = 500
+        self.X = pd.DataFrame(rng.normal(size=(n, 4)), columns=list("abcd"))
+        self.y = 1 + self.X @ [0.3, -0.2, 0.0, 0.05] + rng.normal(size=n)
+
+    def test_matches_pinv(self):
+        """条件良好的数据上与原来的实现相同"""
+        model = OLS().fit(self.X, self.y)
+        np.testing.assert_allclose(
+            p_values(model, self.X, self.y), pinv_p_values(model, self.X, self.y), rtol=1e-8, atol=1e-12
+        )
+        np.testing.assert_allclose(
+            p_values(model, self.X.to_numpy(), self.y.to_numpy()), p_values(model, self.X, self.y)
+        )
+
+    def test_ill_conditioned(self):
+        """均值很大、几乎共线的自变量，与 Householder QR 的结果相同"""
+        rng = np.random.default_rng(0)
+        base = rng.normal(size=2_000)
+        for noise in (1e-2, 1e-5, 1e-9):
+            with self.subTest(noise=noise):
+                X = np.column_stack([
+                    1e6 + base, 1e6 + base + noise * rng.normal(size=2_000), rng.normal(size=2_000)
+                ])
+                y = X @ [1.0, 1.0, 0.5] + rng.normal(size=2_000)
+                result = regression_statistics(X, y)["p_values"]
+                self.assertTrue(np.isfinite(result).all())
+                np.testing.assert_allclose(result, householder_p_values(X, y), rtol=1e-6, atol=1e-12)
+
+    def test_perfect_fit(self):
+        """残差几乎为 0 时残差平方和仍然准确"""
+        y = self.X @ [0.3, -0.2, 0.0, 0.05] + 1e-6 * np.random.default_rng(1).normal(size=len(self.X))
+        np.testing.assert_allclose(
+            regression_statistics(self.X, y)["p_values"], householder_p_values(self.X.to_numpy(), y), rtol=1e-6
+        )
+        model = OLS().fit(self.X, y)
+        np.testing.assert_allclose(p_values(model, self.X, y), model.p_values_, rtol=1e-4)
+
+    def test_model_coefficients(self):
+        """p 值对应模型自己的系数和残差，模型不是普通最小二乘时也是如此"""
+        model = Shrunk(OLS().fit(self.X, self.y))
+        np.testing.assert_allclose(
+            p_values(model, self.X, self.y), pinv_p_values(model, self.X, self.y), rtol=1e-8, atol=1e-12
+        )
+
+    def test_no_intercept(self):
+        model = OLS(fit_intercept=False).fit(self.X, self.y)
+        np.testing.assert_allclose(p_values(model, self.X, self.y), model.p_values_, rtol=1e-8)
+
+    def test_collinear(self):
+        X = self.X.assign(e=self.X["a"] * 2)
+        model = OLS().fit(X, self.y)
+        result = p_values(model, X, self.y)
+        self.assertEqual(np.isnan(result).sum(), 1)
+        self.assertTrue(np.isnan(result[[0, 4]]).any())
+        np.testing.assert_allclose(result, model.p_values_, rtol=1e-8)
+        expected = p_values(OLS().fit(self.X, self.y), self.X, self.y)
+        np.testing.assert_allclose(result[1:4], expected[1:4], rtol=1e-8)
+
+    def test_shape(self):
+        with self.assertRaises(ValueError):
+            p_values(OLS().fit(self.X, self.y), self.X, self.y[:-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
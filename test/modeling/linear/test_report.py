@@ -0,0 +1,136 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from pythontools.modeling import linear
+from pythontools.modeling import OLS, RegressionReport, p_values, adjusted_r_squared, print_result_for_lm
+
+
+class CountingModel:
+    """记录 predict 调用次数的模型"""
+
+    def __init__(self, model):
+        self.model = model
+        self.coef_ = model.coef_
+        self.intercept_ = model.intercept_
+        self.calls = 0
+
+    def predict(self, X):
+        self.calls += 1
+        return self.model.predict(X)
+
+    def score(self, X, y):
+        return self.model.score(X, y)
+
+
+class Shrunk:
+    """系数不是最小二乘解的线性模型（类似岭回归）"""
+
+    def __init__(self, model):
+        self.coef_ = model.coef_ * 0.5
+        self.intercept_ = model.intercept_
+
+    def predict(self, X):
+        return np.asarray(X) @ self.coef_ + self.intercept_
+
+
+class TestRegressionReport(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(24)
+        self.X = pd.DataFrame(rng.normal(size=(300, 3)), columns=["a", "b", "c"])
+        self.y = 1 + self.X @ [0.5, -0.3, 0.0] + rng.normal(size=300)
+        self.model = OLS().fit(self.X, self.y)
+
+    def test_values(self):
+        report = RegressionReport(self.model, self.X, self.y)
+        self.assertAlmostEqual(report.r2, self.model.score(self.X, self.y), places=12)
+        self.assertAlmostEqual(report.adjusted_r2, adjusted_r_squared(report.r2, self.X), places=12)
+        np.testing.assert_allclose(report.p_values, p_values(self.model, self.X, self.y))
+        np.testing.assert_allclose(report.standard_errors, self.model.standard_errors_, rtol=1e-8)
+        np.testing.assert_allclose(report.predictions, self.model.predict(self.X))
+        np.testing.assert_allclose(report.residuals, self.y - self.model.predict(self.X))
+
+    def test_predict_once(self):
+        model = CountingModel(self.model)
+        report = RegressionReport(model, self.X, self.y)
+        str(report)
+        report.to_dict()
+        report.residuals
+        self.assertEqual(model.calls, 1)
+        self.assertIs(report.residuals, report.residuals)
+
+    def test_convert_once(self):
+        """报告只转换一次 X（另一次是 model.predict 自己的）"""
+        report = RegressionReport(self.model, self.X, self.y)
+        report.predictions
+        with mock.patch.object(linear, "_as_matrix", wraps=linear._as_matrix) as as_matrix:
+            str(report)
+            report.to_frame()
+        self.assertEqual(sum(call.args[0] is self.X for call in as_matrix.call_args_list), 1)
+
+    def test_print(self):
+        """打印的格式与原来的 print_result_for_lm 相同"""
+        with redirect_stdout(io.StringIO()) as output:
+            print_result_for_lm(self.model, self.X, self.y)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], "变量: a b c")
+        self.assertEqual(lines[1], "回归系数: " + " ".join(map(str, self.model.coef_)))
+        self.assertEqual(lines[2], f"截距: {self.model.intercept_}")
+        self.assertEqual(lines[3], f"决定R方: {self.model.score(self.X, self.y)}")
+        self.assertTrue(lines[5].startswith("P值: "))
+        np.testing.assert_allclose(
+            [float(value) for value in lines[5].split()[1:]], p_values(self.model, self.X, self.y), rtol=1e-10
+        )
+
+    def test_export(self):
+        report = RegressionReport(self.model, self.X, self.y)
+        result = report.to_dict()
+        self.assertEqual(result["variables"], ["a", "b", "c"])
+        self.assertEqual(result["r2"], report.r2)
+        frame = report.to_frame()
+        self.assertEqual(list(frame.index), ["a", "b", "c"])
+        np.testing.assert_array_equal(frame["p_values"], report.p_values)
+        self.assertEqual(frame.attrs["adjusted_r2"], report.adjusted_r2)
+
+    def test_without_data(self):
+        """不传数据时使用 OLS 累积的统计量"""
+        report = RegressionReport(self.model)
+        self.assertEqual(report.r2, self.model.r2_)
+        np.testing.assert_array_equal(report.p_values, self.model.p_values_)
+        self.assertEqual(report.variables, ["a", "b", "c"])
+        with self.assertRaises(ValueError):
+            report.predictions
+        with self.assertRaises(ValueError):
+            RegressionReport(self.model, self.X)
+
+    def test_collinear(self):
+        """线性相关时有数据和没有数据的报告相同，NaN 的位置也相同"""
+        X = self.X.assign(d=self.X["a"] * 2)
+        model = OLS().fit(X, self.y)
+        with_data = RegressionReport(model, X, self.y).to_frame()
+        without_data = RegressionReport(model).to_frame()
+        pd.testing.assert_frame_equal(with_data, without_data, rtol=1e-8)
+        self.assertTrue(with_data.loc["a"].isna().all())
+        self.assertTrue(with_data.loc[["b", "c", "d"]].notna().all().all())
+
+    def test_coef_matches_statistics(self):
+        """t 值对应报告中的系数，模型不是普通最小二乘时也是如此"""
+        model = Shrunk(OLS().fit(self.X, self.y))
+        frame = RegressionReport(model, self.X, self.y).to_frame()
+        t_values = frame["coef"] / frame["standard_errors"]
+        np.testing.assert_allclose(frame["p_values"], 2 * stats.t.sf(np.abs(t_values), len(self.X) - 4))
+
+    def test_ndarray(self):
+        model = OLS().fit(self.X.to_numpy(), self.y.to_numpy())
+        report = RegressionReport(model, self.X.to_numpy(), self.y.to_numpy())
+        self.assertEqual(report.variables, ["x0", "x1", "x2"])
+        self.assertIn("变量: x0 x1 x2", str(report))
+
+
+if __name__ == '__main__':
+    unittest.main()
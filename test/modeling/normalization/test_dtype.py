@@ -0,0 +1,75 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pythontools.modeling.normalization import ZScoreNormalizer, MinMaxNormalizer
+
+
+class TestFloat32(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(6)
+        # 均值远大于标准差，float32 累加时误差明显
+        self.values = (1e4 + rng.normal(0, 1, (100_000, 3))).astype(np.float32)
+        self.frame = pd.DataFrame(self.values, columns=['A', 'B', 'C'])
+
+    def test_output_dtype(self):
+        """输出为 float32"""
+        for cls in (ZScoreNormalizer, MinMaxNormalizer):
+            with self.subTest(cls=cls.__name__):
+                normalizer = cls(self.values, dtype=np.float32)
+                result = normalizer.normalize()
+                self.assertEqual(result.dtype, np.float32)
+                np.testing.assert_allclose(
+                    result, cls(self.values).normalize(), rtol=1e-4, atol=1e-4
+                )
+                self.assertEqual(normalizer.denormalize(result).dtype, np.float32)
+
+                frame = cls(self.frame, dtype="float32").normalize()
+                self.assertTrue((frame.dtypes == np.float32).all())
+
+    def test_statistics_accumulated_in_float64(self):
+        """统计量用 float64 累加"""
+        normalizer = ZScoreNormalizer(self.values, dtype=np.float32)
+        expected = self.values.astype(np.float64)
+        np.testing.assert_allclose(normalizer.mean, expected.mean(axis=0), rtol=1e-12)
+        np.testing.assert_allclose(normalizer.std, expected.std(axis=0), rtol=1e-9)
+
+    def test_parallel(self):
+        """float32 并行与串行相同"""
+        expected = ZScoreNormalizer(self.frame, dtype=np.float32).normalize()
+        result = ZScoreNormalizer(self.frame, dtype=np.float32, n_jobs=2, backend="process").normalize()
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+    def test_invalid_dtype(self):
+        """只支持浮点类型"""
+        with self.assertRaises(TypeError):
+            ZScoreNormalizer(self.values, dtype=np.int32)
+
+
+class TestFloat64Input(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        # float64 输入、float32 输出：必须先减去 center 再转换精度
+        self.values = 1e6 + rng.normal(0, 1, (20_000, 3))
+        self.frame = pd.DataFrame(self.values, columns=['A', 'B', 'C'])
+        self.expected = ZScoreNormalizer(self.values).normalize()
+
+    def test_frame_matches_array(self):
+        """DataFrame 与 ndarray 的结果相同，误差只来自输出的 float32"""
+        array = ZScoreNormalizer(self.values, dtype=np.float32).normalize()
+        frame = ZScoreNormalizer(self.frame, dtype=np.float32).normalize()
+        np.testing.assert_allclose(array, self.expected, atol=1e-6)
+        np.testing.assert_array_equal(frame.to_numpy(), array)
+
+    def test_parallel(self):
+        """进程并行与串行 ndarray 完全相同"""
+        expected = ZScoreNormalizer(self.values, dtype=np.float32).normalize()
+        for data in (self.values, self.frame):
+            with self.subTest(type=type(data).__name__):
+                result = ZScoreNormalizer(data, dtype=np.float32, n_jobs=2, backend="process").normalize()
+                np.testing.assert_array_equal(np.asarray(result), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pythontools.modeling.normalization import ZScoreNormalizer, MinMaxNormalizer
+
+
+class TestInplace(unittest.TestCase):
+    def setUp(self):
+        self.train = pd.DataFrame({
+            'A': [1.0, 2.0, 3.0, 4.0],
+            'B': [2.0, 2.0, 2.0, 2.0],
+            'C': [10.0, 0.0, 5.0, 5.0],
+        })
+
+    def test_float_frame(self):
+        """浮点 DataFrame 原地标准化与复制的结果相同"""
+        for cls in (ZScoreNormalizer, MinMaxNormalizer):
+            with self.subTest(cls=cls.__name__):
+                normalizer = cls(self.train)
+                expected = normalizer.normalize()
+                data = self.train.copy()
+                result = normalizer.normalize(data, inplace=True)
+                self.assertIs(result, data)
+                pd.testing.assert_frame_equal(data, expected)
+
+                restored = normalizer.denormalize(data, inplace=True)
+                self.assertIs(restored, data)
+                pd.testing.assert_frame_equal(data[['A', 'C']], self.train[['A', 'C']])
+
+    def test_mixed_dtypes(self):
+        """整数列被替换为浮点列"""
+        data = pd.DataFrame({'A': [1, 2, 3], 'B': [0.5, 1.5, 2.5]})
+        normalizer = ZScoreNormalizer(data)
+        expected = normalizer.normalize()
+        normalizer.normalize(data, inplace=True)
+        pd.testing.assert_frame_equal(data, expected)
+
+    def test_ndarray(self):
+        """ndarray 原地标准化"""
+        values = self.train.to_numpy().copy()
+        normalizer = MinMaxNormalizer(values)
+        expected = normalizer.normalize()
+        self.assertIs(normalizer.normalize(values, inplace=True), values)
+        np.testing.assert_allclose(values, expected)
+
+        with self.assertRaises(TypeError):
+            normalizer.normalize(np.ones((2, 3), dtype=int), inplace=True)
+
+    def test_training_data_statistics_kept(self):
+        """原地修改训练数据后统计量不变，新建的实例重新扫描"""
+        data = self.train.copy()
+        normalizer = ZScoreNormalizer(data)
+        mean = normalizer.mean.copy()
+        normalizer.normalize(inplace=True)
+        pd.testing.assert_series_equal(normalizer.mean, mean)
+        self.assertTrue(np.allclose(ZScoreNormalizer(data).mean, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from pythontools.modeling import statistics
+from pythontools.modeling.normalization import ZScoreNormalizer, MinMaxNormalizer
+
+
+class TestMemmap(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.directory.name, "data.npy")
+        self.target = os.path.join(self.directory.name, "normalized.npy")
+        rng = np.random.default_rng(4)
+        self.values = rng.normal(3, 2, (5000, 4))
+        np.save(self.source, self.values)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @patch.object(statistics, "BLOCK_BYTES", 4096)
+    def test_path_to_path(self):
+        """从 .npy 文件训练，按块写入另一个 .npy 文件"""
+        for cls in (ZScoreNormalizer, MinMaxNormalizer):
+            with self.subTest(cls=cls.__name__):
+                normalizer = cls(self.source)
+                self.assertIsInstance(normalizer.data, np.memmap)
+                result = normalizer.normalize(out=self.target)
+                self.assertIsInstance(result, np.memmap)
+                del result
+                np.testing.assert_allclose(np.load(self.target), cls(self.values).normalize())
+
+    def test_memmap_objects(self):
+        """np.memmap 对象作为输入和输出"""
+        data = np.load(self.source, mmap_mode="r")
+        out = np.lib.format.open_memmap(self.target, mode="w+", dtype=np.float64, shape=data.shape)
+        normalizer = ZScoreNormalizer(data)
+        normalizer.normalize(data, out=out)
+        normalizer.denormalize(out, inplace=True)
+        np.testing.assert_allclose(np.asarray(out), self.values)
+        del out
+
+    def test_partial_fit_paths(self):
+        """多个 .npy 文件增量训练"""
+        paths = []
+        for i, part in enumerate(np.array_split(self.values, 3)):
+            paths.append(os.path.join(self.directory.name, f"part{i}.npy"))
+            np.save(paths[-1], part)
+        normalizer = ZScoreNormalizer()
+        for path in paths:
+            normalizer.partial_fit(path)
+        np.testing.assert_allclose(normalizer.mean, self.values.mean(axis=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pythontools.modeling.normalization import Normalizer, ZScoreNormalizer, MinMaxNormalizer
+
+
+class TestNaN(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(9)
+        values = rng.normal(2, 3, (500, 4))
+        values[rng.random(values.shape) < 0.2] = np.nan
+        values[:, 3] = np.nan
+        self.frame = pd.DataFrame(values, columns=list("ABCD"))
+
+    def test_skipna_statistics(self):
+        """统计量只使用有效值，与 pandas 一致"""
+        normalizer = ZScoreNormalizer(self.frame, ddof=1)
+        pd.testing.assert_series_equal(normalizer.mean, self.frame.mean())
+        pd.testing.assert_series_equal(normalizer.std, self.frame.std(ddof=1))
+        pd.testing.assert_series_equal(MinMaxNormalizer(self.frame).min, self.frame.min())
+        np.testing.assert_array_equal(normalizer.statistics.missing, self.frame.isna().sum())
+
+    def test_nan_pass_through(self):
+        """缺失值变换后仍是缺失值，不删除行"""
+        for cls in (ZScoreNormalizer, MinMaxNormalizer):
+            with self.subTest(cls=cls.__name__):
+                normalizer = cls(self.frame)
+                result = normalizer.normalize()
+                self.assertEqual(result.shape, self.frame.shape)
+                pd.testing.assert_frame_equal(result.isna(), self.frame.isna())
+
+                valid = self.frame[['A', 'B', 'C']].dropna()
+                pd.testing.assert_frame_equal(
+                    normalizer.denormalize(result)[['A', 'B', 'C']].loc[valid.index], valid,
+                    check_exact=False, atol=1e-10
+                )
+
+    def test_skipna_false(self):
+        """不跳过时有缺失值的列统计量为 NaN"""
+        frame = self.frame.copy()
+        frame['E'] = np.arange(500.0)
+        normalizer = ZScoreNormalizer(frame, skipna=False)
+        pd.testing.assert_series_equal(normalizer.mean, frame.mean(skipna=False))
+        result = normalizer.normalize()
+        self.assertTrue(result[list("ABCD")].isna().all().all())
+        self.assertFalse(result['E'].isna().any())
+
+    def test_missing_saved(self):
+        """缺失值个数可以保存和合并"""
+        halves = [self.frame.iloc[:250], self.frame.iloc[250:]]
+        normalizer = ZScoreNormalizer.fit_chunks(halves, skipna=False)
+        np.testing.assert_array_equal(normalizer.statistics.missing, self.frame.isna().sum())
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "nan.stat")
+            normalizer.save(path)
+            loaded = Normalizer.load(path, mmap=False)
+        self.assertFalse(loaded.skipna)
+        np.testing.assert_array_equal(loaded.statistics.missing, normalizer.statistics.missing)
+
+
+if __name__ == '__main__':
+    unittest.main()
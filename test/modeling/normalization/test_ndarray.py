@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pythontools.modeling.normalization import ZScoreNormalizer, MinMaxNormalizer
+
+
+class TestNdarrayNormalizer(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.values = np.column_stack([
+            rng.normal(5, 2, 200),
+            rng.uniform(-1, 1, 200),
+            np.full(200, 7.0),
+        ])
+        self.frame = pd.DataFrame(self.values, columns=['A', 'B', 'C'])
+
+    def test_matches_dataframe(self):
+        """ndarray 与 DataFrame 的结果相同"""
+        for cls in (ZScoreNormalizer, MinMaxNormalizer):
+            with self.subTest(cls=cls.__name__):
+                expected = cls(self.frame).normalize().to_numpy()
+                normalizer = cls(self.values)
+                result = normalizer.normalize()
+                self.assertIsInstance(result, np.ndarray)
+                np.testing.assert_allclose(result, expected)
+                np.testing.assert_allclose(normalizer.denormalize(result)[:, :2], self.values[:, :2])
+
+    def test_constant_column(self):
+        """常数列的处理与 DataFrame 相同"""
+        np.testing.assert_array_equal(ZScoreNormalizer(self.values).normalize()[:, 2], 0)
+        np.testing.assert_array_equal(
+            MinMaxNormalizer(self.values, target_range=(-1, 3)).normalize()[:, 2], 1
+        )
+
+    def test_out_buffer(self):
+        """结果写入 out"""
+        normalizer = ZScoreNormalizer(self.values)
+        batch = self.values[:16]
+        out = np.empty_like(batch)
+        result = normalizer.normalize(batch, out=out)
+        self.assertIs(result, out)
+        np.testing.assert_allclose(out, normalizer.normalize(batch))
+
+        with self.assertRaises(ValueError):
+            normalizer.normalize(batch, out=np.empty((3, 3)))
+        with self.assertRaises(ValueError):
+            normalizer.normalize(self.frame, out=out)
+
+    def test_invalid_shape(self):
+        """只支持二维数组"""
+        with self.assertRaises(ValueError):
+            ZScoreNormalizer(np.arange(3.0))
+        with self.assertRaises(ValueError):
+            ZScoreNormalizer(self.values).normalize(np.ones((2, 5)))
+
+    def test_columns_aligned_by_name(self):
+        """DataFrame 按列名对齐"""
+        normalizer = ZScoreNormalizer(self.frame)
+        pd.testing.assert_frame_equal(
+            normalizer.normalize(self.frame[['B', 'A']]),
+            normalizer.normalize()[['B', 'A']]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pythontools.modeling.normalization import ZScoreNormalizer, MinMaxNormalizer
+
+
+class TestColumnParallel(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.values = rng.normal(0, 3, (300, 37))
+        self.values[:, 5] = 1.0
+        self.frame = pd.DataFrame(self.values, columns=[f"c{i}" for i in range(37)])
+
+    def test_thread_matches_serial(self):
+        """线程池的结果与串行完全相同"""
+        for cls in (ZScoreNormalizer, MinMaxNormalizer):
+            with self.subTest(cls=cls.__name__):
+                serial = cls(self.frame)
+                parallel = cls(self.frame, n_jobs=4)
+                pd.testing.assert_frame_equal(parallel.normalize(), serial.normalize(), check_exact=True)
+                np.testing.assert_array_equal(
+                    cls(self.values, n_jobs=4).normalize(), cls(self.values).normalize()
+                )
+
+    def test_process_matches_serial(self):
+        """进程池的结果与串行完全相同"""
+        serial = ZScoreNormalizer(self.frame)
+        parallel = ZScoreNormalizer(self.frame).set_parallel(3, "process")
+        normalized = parallel.normalize()
+        pd.testing.assert_frame_equal(normalized, serial.normalize(), check_exact=True)
+        np.testing.assert_array_equal(
+            parallel.denormalize(normalized.to_numpy()),
+            serial.denormalize(normalized.to_numpy()),
+        )
+
+    def test_inplace(self):
+        """并行原地变换"""
+        values = self.values.copy()
+        normalizer = ZScoreNormalizer(self.values, n_jobs=4)
+        normalizer.normalize(values, inplace=True)
+        np.testing.assert_array_equal(values, ZScoreNormalizer(self.values).normalize())
+
+    def test_invalid(self):
+        """无效的参数"""
+        with self.assertRaises(ValueError):
+            ZScoreNormalizer(self.values, n_jobs=0)
+        with self.assertRaises(ValueError):
+            ZScoreNormalizer(self.values, backend="gpu")
+
+
+if __name__ == '__main__':
+    unittest.main()
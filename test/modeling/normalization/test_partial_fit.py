@@ -0,0 +1,67 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pythontools.modeling.normalization import ZScoreNormalizer, MinMaxNormalizer
+
+
+class TestPartialFit(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.data = pd.DataFrame({
+            'A': rng.normal(100, 5, 3000),
+            'B': rng.exponential(2, 3000),
+            'C': np.ones(3000),
+        })
+        self.chunks = [self.data.iloc[i:i + 700] for i in range(0, 3000, 700)]
+
+    def test_zscore_matches_full_fit(self):
+        """分块训练与整体训练结果一致"""
+        for ddof in (0, 1):
+            with self.subTest(ddof=ddof):
+                full = ZScoreNormalizer(self.data, ddof=ddof)
+                streamed = ZScoreNormalizer.fit_chunks(self.chunks, ddof=ddof)
+                pd.testing.assert_frame_equal(
+                    streamed.normalize(self.data), full.normalize(),
+                    check_exact=False, atol=1e-10, rtol=1e-10
+                )
+                normalized = full.normalize()
+                pd.testing.assert_frame_equal(
+                    streamed.denormalize(normalized), full.denormalize(normalized),
+                    check_exact=False, atol=1e-10, rtol=1e-10
+                )
+
+    def test_minmax_matches_full_fit(self):
+        """分块训练与整体训练结果一致"""
+        full = MinMaxNormalizer(self.data, target_range=(-1, 1))
+        streamed = MinMaxNormalizer(target_range=(-1, 1))
+        for chunk in self.chunks:
+            streamed.partial_fit(chunk)
+        pd.testing.assert_series_equal(streamed.min, full.min)
+        pd.testing.assert_series_equal(streamed.max, full.max)
+        pd.testing.assert_frame_equal(
+            streamed.normalize(self.data), full.normalize(),
+            check_exact=False, atol=1e-10, rtol=1e-10
+        )
+
+    def test_partial_fit_does_not_touch_shared_statistics(self):
+        """增量训练不影响共享统计量的其他实例"""
+        first = ZScoreNormalizer(self.data)
+        second = ZScoreNormalizer(self.data, statistics=first.statistics)
+        mean = first.mean.copy()
+        second.partial_fit(self.data + 10)
+        pd.testing.assert_series_equal(first.mean, mean)
+        pd.testing.assert_series_equal(second.mean, mean + 5)
+
+    def test_unfitted(self):
+        """未训练时报错"""
+        normalizer = ZScoreNormalizer()
+        with self.assertRaises(ValueError):
+            normalizer.normalize(self.data)
+        with self.assertRaises(ValueError):
+            normalizer.partial_fit(self.data).normalize()
+
+
+if __name__ == '__main__':
+    unittest.main()
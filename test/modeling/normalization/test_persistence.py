@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pythontools.modeling.normalization import Normalizer, ZScoreNormalizer, MinMaxNormalizer
+from pythontools.modeling.statistics import ColumnStatistics
+
+
+class TestPersistence(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "normalizer.stat")
+        rng = np.random.default_rng(7)
+        self.data = pd.DataFrame({
+            'A': rng.normal(1, 2, 100),
+            'B': rng.uniform(0, 1, 100),
+            'C': np.full(100, 4.0),
+        })
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        """保存后读取的 Normalizer 结果相同"""
+        for normalizer in (
+                ZScoreNormalizer(self.data, ddof=1),
+                MinMaxNormalizer(self.data, target_range=(-1, 1), dtype=np.float32),
+        ):
+            with self.subTest(cls=type(normalizer).__name__):
+                normalizer.save(self.path)
+                loaded = Normalizer.load(self.path)
+                self.assertIs(type(loaded), type(normalizer))
+                self.assertEqual(loaded.get_params(), normalizer.get_params())
+                self.assertIsNone(loaded.data)
+                pd.testing.assert_frame_equal(loaded.normalize(self.data), normalizer.normalize())
+                del loaded
+
+    def test_memory_mapped(self):
+        """默认以内存映射读取统计量"""
+        ZScoreNormalizer(self.data).save(self.path)
+        statistics = ColumnStatistics.load(self.path)
+        self.assertIsInstance(statistics.mean.base, np.memmap)
+        copied = ColumnStatistics.load(self.path, mmap=False)
+        np.testing.assert_array_equal(copied.m2, statistics.m2)
+        del statistics
+
+    def test_ndarray_columns(self):
+        """ndarray 的位置列名"""
+        ZScoreNormalizer(self.data.to_numpy()).save(self.path)
+        loaded = ZScoreNormalizer.load(self.path, mmap=False)
+        self.assertIsInstance(loaded.statistics.columns, pd.RangeIndex)
+
+    def test_wrong_class(self):
+        """读取为不同的类时报错"""
+        ZScoreNormalizer(self.data).save(self.path)
+        with self.assertRaises(TypeError):
+            MinMaxNormalizer.load(self.path)
+        with open(self.path, "wb") as file:
+            file.write(b"not a statistics file")
+        with self.assertRaises(ValueError):
+            Normalizer.load(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
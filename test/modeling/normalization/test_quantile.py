@@ -0,0 +1,120 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from scipy import sparse, stats
+
+from pythontools.modeling.normalization import QuantileNormalizer
+
+
+class TestQuantileNormalizer(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(14)
+        # 重尾分布
+        self.values = rng.standard_cauchy((2_000, 3))
+        self.frame = pd.DataFrame(self.values, columns=['A', 'B', 'C'])
+
+    def test_simple(self):
+        data = pd.DataFrame({"A": [1, 2, 3, 100], "B": [4, 4, 4, 4]})
+        result = QuantileNormalizer(data).normalize()
+        np.testing.assert_allclose(result["A"], [0, 1 / 3, 2 / 3, 1])
+        # 常数列映射为 0.5
+        np.testing.assert_allclose(result["B"], 0.5)
+
+    def test_matches_empirical_cdf(self):
+        """分位点足够多时与经验分布函数的秩相同"""
+        result = QuantileNormalizer(self.frame, n_quantiles=len(self.frame)).normalize()
+        expected = (self.frame.rank() - 1) / (len(self.frame) - 1)
+        pd.testing.assert_frame_equal(result, expected, atol=1e-12)
+
+    def test_clip_out_of_range(self):
+        normalizer = QuantileNormalizer(self.values)
+        result = normalizer.normalize(np.array([[-1e300, 0, 1e300]]).repeat(3, axis=0).T)
+        np.testing.assert_allclose(result[0], 0)
+        np.testing.assert_allclose(result[2], 1)
+
+    def test_denormalize(self):
+        normalizer = QuantileNormalizer(self.frame, n_quantiles=len(self.frame))
+        restored = normalizer.denormalize(normalizer.normalize())
+        pd.testing.assert_frame_equal(restored, self.frame, atol=1e-9)
+
+    def test_normal_output(self):
+        normalizer = QuantileNormalizer(self.values, output_distribution="normal")
+        result = normalizer.normalize()
+        self.assertTrue(np.isfinite(result).all())
+        uniform = QuantileNormalizer(self.values).normalize()
+        np.testing.assert_allclose(result, stats.norm.ppf(np.clip(uniform, 1e-7, 1 - 1e-7)))
+        self.assertAlmostEqual(np.median(result[:, 0]), 0, delta=0.01)
+
+        normalizer = QuantileNormalizer(self.values, n_quantiles=len(self.values), output_distribution="normal")
+        np.testing.assert_allclose(normalizer.denormalize(normalizer.normalize()), self.values, rtol=1e-3)
+
+    def test_subsample(self):
+        """抽样后的结果接近使用全部数据的结果"""
+        full = QuantileNormalizer(self.values).normalize()
+        sampled = QuantileNormalizer(self.values, subsample=1_000, random_state=0)
+        self.assertEqual(sampled.references.shape, (1_000, 3))
+        np.testing.assert_allclose(sampled.normalize(), full, atol=0.06)
+        # 随机种子相同时结果相同
+        again = QuantileNormalizer(self.values, subsample=1_000, random_state=0)
+        np.testing.assert_array_equal(again.normalize(), sampled.normalize())
+
+    def test_nan(self):
+        values = self.values.copy()
+        values[::10, 0] = np.nan
+        values[:, 2] = np.nan
+        result = QuantileNormalizer(values).normalize()
+        self.assertTrue(np.isnan(result[::10, 0]).all())
+        self.assertFalse(np.isnan(result[1::10, 0]).any())
+        self.assertTrue(np.isnan(result[:, 2]).all())
+        np.testing.assert_allclose(
+            result[:, 1], QuantileNormalizer(self.values[:, [1]]).normalize()[:, 0]
+        )
+        self.assertTrue(np.isnan(QuantileNormalizer(values, skipna=False).normalize()[:, 0]).all())
+
+    def test_columns_aligned_by_name(self):
+        normalizer = QuantileNormalizer(self.frame)
+        shuffled = self.frame[['C', 'A', 'B']]
+        pd.testing.assert_frame_equal(
+            normalizer.normalize(shuffled), normalizer.normalize()[['C', 'A', 'B']]
+        )
+
+    def test_parallel_and_inplace(self):
+        expected = QuantileNormalizer(self.frame).normalize()
+        for backend in ("thread", "process"):
+            with self.subTest(backend=backend):
+                result = QuantileNormalizer(self.frame, n_jobs=2, backend=backend).normalize()
+                pd.testing.assert_frame_equal(result, expected)
+        frame = self.frame.copy()
+        QuantileNormalizer(self.frame).normalize(frame, inplace=True)
+        pd.testing.assert_frame_equal(frame, expected)
+
+    def test_inplace_mixed_dtypes(self):
+        """不是同一块浮点内存的 DataFrame（整数列、逐列添加的列）也可以原地变换"""
+        mixed = self.frame.assign(D=np.arange(len(self.frame)))
+        built = pd.DataFrame(index=self.frame.index)
+        for name in self.frame.columns:
+            built[name] = self.frame[name].to_numpy()
+        for data in (mixed, built):
+            with self.subTest(columns=list(data.columns)):
+                normalizer = QuantileNormalizer(data, output_distribution="normal")
+                expected = normalizer.normalize()
+                frame = data.copy()
+                self.assertIs(normalizer.normalize(frame, inplace=True), frame)
+                pd.testing.assert_frame_equal(frame, expected)
+                self.assertIs(normalizer.denormalize(frame, inplace=True), frame)
+                pd.testing.assert_frame_equal(frame, normalizer.denormalize(expected))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            QuantileNormalizer(self.frame, n_quantiles=1)
+        with self.assertRaises(ValueError):
+            QuantileNormalizer(self.frame, output_distribution="cauchy")
+        with self.assertRaises(NotImplementedError):
+            QuantileNormalizer(sparse.random(10, 3, format="csr"))
+        with self.assertRaises(NotImplementedError):
+            QuantileNormalizer().partial_fit(self.frame)
+
+
+if __name__ == '__main__':
+    unittest.main()
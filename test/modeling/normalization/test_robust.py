@@ -0,0 +1,79 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from pythontools.modeling.normalization import RobustNormalizer
+
+
+class TestRobustNormalizer(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(15)
+        self.values = rng.normal(0, 1, (200_000, 3)) * [1, 10, 100] + [0, 5, -5]
+        # 离群值
+        self.values[::1000] = 1e9
+        self.frame = pd.DataFrame(self.values, columns=['A', 'B', 'C'])
+
+    def chunks(self, n: int) -> list[pd.DataFrame]:
+        size = -(-len(self.frame) // n)
+        return [self.frame.iloc[start:start + size] for start in range(0, len(self.frame), size)]
+
+    def test_simple(self):
+        """数据量小时分位数是精确的"""
+        data = pd.DataFrame({"A": [1, 2, 3, 4, 1000], "B": [5, 5, 5, 5, 5]})
+        normalizer = RobustNormalizer(data)
+        result = normalizer.normalize()
+        np.testing.assert_allclose(result["A"], [-1, -0.5, 0, 0.5, 498.5])
+        np.testing.assert_allclose(result["B"], 0)
+        pd.testing.assert_frame_equal(normalizer.denormalize(result)[["A"]], data[["A"]].astype(float))
+
+    def test_approximate_quantiles(self):
+        normalizer = RobustNormalizer(self.frame, random_state=0)
+        median = self.frame.median()
+        iqr = self.frame.quantile(0.75) - self.frame.quantile(0.25)
+        # 秩误差约 1%，正态分布中位数附近的密度约 0.4
+        np.testing.assert_allclose(normalizer.median, median, atol=0.05 * iqr.max())
+        np.testing.assert_allclose(normalizer.iqr, iqr, rtol=0.05)
+        self.assertTrue((normalizer.rank_error < 0.05).all())
+
+    def test_partial_fit(self):
+        """分块训练与整体训练的结果接近，离群值不影响尺度"""
+        whole = RobustNormalizer(self.frame, random_state=0)
+        chunked = RobustNormalizer.fit_chunks(self.chunks(20), random_state=0)
+        np.testing.assert_allclose((chunked.median - whole.median) / whole.iqr, 0, atol=0.02)
+        np.testing.assert_allclose(chunked.iqr, whole.iqr, rtol=0.05)
+        np.testing.assert_allclose(chunked.iqr, [1.349, 13.49, 134.9], rtol=0.05)
+        np.testing.assert_allclose(chunked.mean, self.frame.mean())
+
+    def test_merge_and_fit_parallel(self):
+        shards = self.chunks(4)
+        parts = [RobustNormalizer.fit_chunks([shard], random_state=i) for i, shard in enumerate(shards)]
+        merged = parts[0].merge(parts[1]).merge(parts[2].merge(parts[3]))
+        self.assertEqual(merged.sketches[0].count, len(self.frame))
+        np.testing.assert_allclose(merged.iqr, [1.349, 13.49, 134.9], rtol=0.05)
+
+        parallel = RobustNormalizer.fit_parallel(shards, max_workers=2, random_state=0)
+        serial = RobustNormalizer.fit_parallel(shards, max_workers=1, random_state=0)
+        pd.testing.assert_series_equal(parallel.median, serial.median)
+        np.testing.assert_allclose(parallel.iqr, merged.iqr, rtol=0.05)
+
+    def test_nan(self):
+        values = self.values.copy()
+        values[::3, 0] = np.nan
+        normalizer = RobustNormalizer(values)
+        self.assertFalse(normalizer.median.isna().any())
+        self.assertTrue(np.isnan(normalizer.normalize()[::3, 0]).all())
+        self.assertTrue(np.isnan(RobustNormalizer(values, skipna=False).median[0]))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            RobustNormalizer(self.frame, quantile_range=(75, 25))
+        with self.assertRaises(NotImplementedError):
+            RobustNormalizer(sparse.random(10, 3, format="csr"))
+        with self.assertRaises(ValueError):
+            RobustNormalizer().median
+
+
+if __name__ == '__main__':
+    unittest.main()
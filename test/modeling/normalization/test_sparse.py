@@ -0,0 +1,90 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from pythontools.modeling.normalization import ZScoreNormalizer, MinMaxNormalizer
+from pythontools.modeling.statistics import ColumnStatistics
+
+
+class TestSparse(unittest.TestCase):
+    def setUp(self):
+        self.matrix = sparse.random_array((200, 6), density=0.1, format="csr", random_state=8)
+        self.matrix.data *= 10
+        self.dense = self.matrix.toarray()
+
+    def test_statistics_match_dense(self):
+        """稀疏矩阵的统计量与稠密矩阵相同"""
+        for matrix in (self.matrix, self.matrix.tocsc(), sparse.csr_matrix(self.matrix)):
+            with self.subTest(format=matrix.format):
+                statistics = ColumnStatistics.from_data(matrix)
+                expected = ColumnStatistics.from_data(self.dense)
+                np.testing.assert_array_equal(statistics.count, expected.count)
+                np.testing.assert_allclose(statistics.mean, expected.mean)
+                np.testing.assert_allclose(statistics.m2, expected.m2)
+                np.testing.assert_array_equal(statistics.min, expected.min)
+                np.testing.assert_array_equal(statistics.max, expected.max)
+
+    def test_nonzero_only(self):
+        """只统计非零元素"""
+        statistics = ColumnStatistics.from_sparse(self.matrix, include_zeros=False)
+        column = self.dense[:, 0]
+        nonzero = column[column != 0]
+        self.assertEqual(statistics.count[0], len(nonzero))
+        self.assertAlmostEqual(statistics.mean[0], nonzero.mean())
+        self.assertEqual(statistics.min[0], nonzero.min())
+
+    def test_normalizer_nonzero_only(self):
+        """Normalizer 的 include_zeros=False 只用非零元素，partial_fit 和保存的参数一致"""
+        normalizer = MinMaxNormalizer(self.matrix, scale_only=True, include_zeros=False)
+        masked = np.where(self.dense != 0, self.dense, np.nan)
+        np.testing.assert_array_equal(normalizer.min, np.nanmin(masked, axis=0))
+        np.testing.assert_array_equal(normalizer.max, np.nanmax(masked, axis=0))
+        self.assertFalse(normalizer.get_params()["include_zeros"])
+        self.assertTrue((MinMaxNormalizer(self.matrix, scale_only=True).min == 0).all())
+
+        chunked = MinMaxNormalizer(scale_only=True, include_zeros=False)
+        chunked.partial_fit(self.matrix[:100]).partial_fit(self.matrix[100:])
+        np.testing.assert_array_equal(chunked.min, normalizer.min)
+        np.testing.assert_allclose(chunked.mean, np.nanmean(masked, axis=0))
+
+    def test_scale_only_keeps_sparse(self):
+        """scale_only 的结果仍是稀疏的，且与稠密计算相同"""
+        for cls in (ZScoreNormalizer, MinMaxNormalizer):
+            with self.subTest(cls=cls.__name__):
+                normalizer = cls(self.matrix, scale_only=True)
+                result = normalizer.normalize()
+                self.assertTrue(sparse.issparse(result))
+                self.assertEqual(result.nnz, self.matrix.nnz)
+                expected = cls(self.dense, scale_only=True).normalize()
+                np.testing.assert_allclose(result.toarray(), expected)
+                np.testing.assert_allclose(normalizer.denormalize(result).toarray(), self.dense)
+
+    def test_inplace(self):
+        """原地缩放存储的元素"""
+        matrix = self.matrix.copy()
+        normalizer = ZScoreNormalizer(self.matrix, scale_only=True)
+        self.assertIs(normalizer.normalize(matrix, inplace=True), matrix)
+        np.testing.assert_allclose(matrix.toarray(), normalizer.normalize(self.dense))
+
+    def test_requires_scale_only(self):
+        """没有 scale_only 时拒绝稀疏数据"""
+        with self.assertRaises(ValueError):
+            ZScoreNormalizer(self.matrix).normalize()
+
+    def test_sparse_dataframe(self):
+        """pandas 稀疏列"""
+        frame = pd.DataFrame.sparse.from_spmatrix(self.matrix, columns=list("ABCDEF"))
+        normalizer = MinMaxNormalizer(frame, scale_only=True)
+        np.testing.assert_allclose(normalizer.max, self.dense.max(axis=0))
+        result = normalizer.normalize()
+        self.assertTrue(all(isinstance(dtype, pd.SparseDtype) for dtype in result.dtypes))
+        np.testing.assert_allclose(
+            result.sparse.to_dense().to_numpy(),
+            MinMaxNormalizer(self.dense, scale_only=True).normalize()
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pythontools.modeling.normalization import Normalizer, ZScoreNormalizer, MinMaxNormalizer, RobustNormalizer
+
+
+class TestWeightedNormalizer(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(20)
+        self.frame = pd.DataFrame(rng.normal(size=(5_000, 3)) * [1, 10, 100], columns=['A', 'B', 'C'])
+        self.frame.iloc[::7, 1] = np.nan
+        self.weights = rng.integers(0, 4, 5_000)
+        self.repeated = self.frame.loc[self.frame.index.repeat(self.weights)].reset_index(drop=True)
+
+    def test_frequency_weights_match_repetition(self):
+        for ddof in (0, 1):
+            with self.subTest(ddof=ddof):
+                weighted = ZScoreNormalizer(self.frame, ddof=ddof, weights=self.weights)
+                expected = ZScoreNormalizer(self.repeated, ddof=ddof)
+                np.testing.assert_allclose(weighted.mean, expected.mean, rtol=1e-12)
+                np.testing.assert_allclose(weighted.std, expected.std, rtol=1e-12)
+                pd.testing.assert_frame_equal(weighted.normalize(), expected.normalize(self.frame), atol=1e-12)
+
+        # 权重为 0 的行不计入最小值和最大值
+        minmax = MinMaxNormalizer(self.frame, weights=self.weights)
+        np.testing.assert_allclose(minmax.min, self.repeated.min())
+        np.testing.assert_allclose(minmax.max, self.repeated.max())
+
+    def test_reliability_weights(self):
+        normalizer = ZScoreNormalizer(self.frame, ddof=1, weights=self.weights * 0.5, weight_type="reliability")
+        scaled = ZScoreNormalizer(self.frame, ddof=1, weights=self.weights * 8, weight_type="reliability")
+        np.testing.assert_allclose(normalizer.std, scaled.std, rtol=1e-12)
+        self.assertFalse(np.allclose(normalizer.std, ZScoreNormalizer(self.frame, ddof=1, weights=self.weights).std))
+
+    def test_partial_fit(self):
+        normalizer = ZScoreNormalizer(ddof=1)
+        for start in range(0, len(self.frame), 1_000):
+            normalizer.partial_fit(self.frame.iloc[start:start + 1_000], weights=self.weights[start:start + 1_000])
+        expected = ZScoreNormalizer(self.repeated, ddof=1)
+        np.testing.assert_allclose(normalizer.std, expected.std, rtol=1e-12)
+
+    def test_save_and_load(self):
+        normalizer = ZScoreNormalizer(self.frame, ddof=1, weights=self.weights, weight_type="reliability")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "weighted.stat")
+            normalizer.save(path)
+            loaded = Normalizer.load(path, mmap=False)
+        self.assertEqual(loaded.weight_type, "reliability")
+        np.testing.assert_allclose(loaded.std, normalizer.std)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            ZScoreNormalizer(self.frame, weights=self.weights[:10]).statistics
+        with self.assertRaises(ValueError):
+            ZScoreNormalizer(weights=self.weights)
+        with self.assertRaises(ValueError):
+            ZScoreNormalizer(self.frame, weight_type="other")
+        with self.assertRaises(NotImplementedError):
+            RobustNormalizer(self.frame, weights=self.weights)
+
+
+if __name__ == '__main__':
+    unittest.main()
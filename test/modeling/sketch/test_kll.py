@@ -0,0 +1,69 @@
+import pickle
+import unittest
+
+import numpy as np
+
+from pythontools.modeling.sketch import KLLSketch
+
+
+def true_rank(values: np.ndarray, x) -> np.ndarray:
+    return np.searchsorted(np.sort(values), x, side="right") / len(values)
+
+
+class TestKLLSketch(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(15)
+        self.values = rng.standard_cauchy(500_000)
+        self.levels = np.linspace(0.01, 0.99, 99)
+
+    def test_exact_without_compaction(self):
+        values = self.values[:100]
+        sketch = KLLSketch(k=200).update(values)
+        self.assertEqual(sketch.rank_error, 0)
+        np.testing.assert_allclose(sketch.quantile(self.levels), np.quantile(values, self.levels))
+
+    def test_error_bound(self):
+        """真实的秩误差不超过 rank_error"""
+        sketch = KLLSketch(k=200, seed=0)
+        for chunk in np.array_split(self.values, 50):
+            sketch.update(chunk)
+        self.assertEqual(sketch.count, len(self.values))
+        self.assertLess(sketch.size, 3 * sketch.k)
+        error = np.abs(true_rank(self.values, sketch.quantile(self.levels)) - self.levels)
+        self.assertLessEqual(error.max(), sketch.rank_error)
+        self.assertLess(error.max(), 0.02)
+
+    def test_merge(self):
+        """合并分片的草图与整体构建的精度相当"""
+        parts = [KLLSketch(seed=i).update(chunk) for i, chunk in enumerate(np.array_split(self.values, 7))]
+        # 草图可以被 pickle，传回主进程
+        parts = [pickle.loads(pickle.dumps(part)) for part in parts]
+        sketch = KLLSketch.merge_all(parts)
+        self.assertEqual(sketch.count, len(self.values))
+        error = np.abs(true_rank(self.values, sketch.quantile(self.levels)) - self.levels)
+        self.assertLessEqual(error.max(), sketch.rank_error)
+        # 合并不修改原来的草图
+        self.assertEqual(parts[0].count, len(np.array_split(self.values, 7)[0]))
+
+        with self.assertRaises(ValueError):
+            KLLSketch(k=100).merge(KLLSketch(k=200))
+
+    def test_rank(self):
+        sketch = KLLSketch(seed=1).update(self.values)
+        x = np.quantile(self.values, self.levels)
+        np.testing.assert_allclose(sketch.rank(x), self.levels, atol=sketch.rank_error)
+
+    def test_nan_and_empty(self):
+        sketch = KLLSketch()
+        self.assertTrue(np.isnan(sketch.quantile(0.5)))
+        sketch.update([np.nan, 1.0, 3.0])
+        self.assertEqual(sketch.count, 2)
+        self.assertEqual(sketch.quantile(0.5), 2.0)
+        with self.assertRaises(ValueError):
+            sketch.quantile(1.5)
+        with self.assertRaises(ValueError):
+            KLLSketch(k=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
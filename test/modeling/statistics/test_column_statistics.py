@@ -0,0 +1,82 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pythontools.modeling.normalization import ZScoreNormalizer, MinMaxNormalizer
+from pythontools.modeling.statistics import ColumnStatistics
+
+
+class TestColumnStatistics(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame({
+            'A': rng.normal(10, 3, 1000),
+            'B': rng.uniform(-5, 5, 1000),
+            'C': np.arange(1000, dtype=float),
+        })
+
+    def test_matches_pandas(self):
+        """统计量与 pandas 的结果一致"""
+        statistics = ColumnStatistics.from_data(self.data, rows=64)
+        np.testing.assert_allclose(statistics.mean, self.data.mean())
+        np.testing.assert_allclose(statistics.std(0), self.data.std(ddof=0))
+        np.testing.assert_allclose(statistics.std(1), self.data.std(ddof=1))
+        np.testing.assert_array_equal(statistics.min, self.data.min())
+        np.testing.assert_array_equal(statistics.max, self.data.max())
+        self.assertEqual(statistics.passes, 1)
+
+    def test_skip_nan(self):
+        """缺失值被跳过，与 pandas 默认行为一致"""
+        data = pd.DataFrame({'A': [1.0, np.nan, 3.0, 8.0], 'B': [np.nan] * 4})
+        statistics = ColumnStatistics.from_data(data, rows=3)
+        np.testing.assert_array_equal(statistics.count, [3, 0])
+        np.testing.assert_allclose(statistics.mean[0], data['A'].mean())
+        np.testing.assert_allclose(statistics.std(1)[0], data['A'].std(ddof=1))
+        self.assertEqual(statistics.max[0], 8.0)
+        self.assertTrue(np.isnan(statistics.mean[1]))
+
+    def test_shared_between_normalizers(self):
+        """显式传入 statistics 时多个 Normalizer 只扫描一次数据"""
+        zscore = ZScoreNormalizer(self.data)
+        minmax = MinMaxNormalizer(self.data, statistics=zscore.statistics)
+        zscore.normalize()
+        minmax.normalize()
+        self.assertIs(zscore.statistics, minmax.statistics)
+        self.assertEqual(zscore.statistics.passes, 1)
+
+    def test_not_shared_implicitly(self):
+        """原地修改数据后，新的 Normalizer 得到新的统计量"""
+        data = pd.DataFrame({'A': [1.0, 2.0, 3.0, 4.0], 'B': [5.0, 5.0, 5.0, 6.0]})
+        first = ZScoreNormalizer(data)
+        first.mean
+        data.iloc[0, 0] = 100
+        self.assertIsNot(ZScoreNormalizer(data).statistics, first.statistics)
+        np.testing.assert_allclose(ZScoreNormalizer(data).mean, [27.25, 5.25])
+
+    def test_merge_all(self):
+        """合并分片统计量与整体计算一致"""
+        shards = [self.data.iloc[i:i + 150] for i in range(0, 1000, 150)]
+        merged = ColumnStatistics.merge_all(ColumnStatistics.from_data(shard) for shard in shards)
+        full = ColumnStatistics.from_data(self.data)
+        np.testing.assert_array_equal(merged.count, full.count)
+        np.testing.assert_allclose(merged.mean, full.mean)
+        np.testing.assert_allclose(merged.m2, full.m2)
+        np.testing.assert_array_equal(merged.min, full.min)
+        np.testing.assert_array_equal(merged.max, full.max)
+        self.assertEqual(merged.passes, len(shards))
+
+    def test_from_shards_process_pool(self):
+        """进程池的结果与单进程相同"""
+        shards = [self.data.iloc[i:i + 250] for i in range(0, 1000, 250)]
+        serial = ColumnStatistics.from_shards(shards, max_workers=1)
+        parallel = ColumnStatistics.from_shards(shards, max_workers=2)
+        np.testing.assert_array_equal(parallel.mean, serial.mean)
+        np.testing.assert_array_equal(parallel.m2, serial.m2)
+
+        normalizer = ZScoreNormalizer.fit_parallel(shards, max_workers=2, ddof=1)
+        np.testing.assert_allclose(normalizer.std, self.data.std(ddof=1))
+
+
+if __name__ == '__main__':
+    unittest.main()